@@ -0,0 +1,53 @@
+"""Add recipe filter indexes
+
+Revision ID: a2d6e8f4b1c7
+Revises: c4f8a1d7e3b9
+Create Date: 2025-11-24 09:52:17.406113
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a2d6e8f4b1c7"
+down_revision: Union[str, Sequence[str], None] = "c4f8a1d7e3b9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LIVE = sa.text("deleted_at IS NULL")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_recipes_user_id_created_at_id",
+        "recipes",
+        ["user_id", "created_at", "id"],
+        unique=False,
+        postgresql_where=LIVE,
+    )
+    op.create_index(
+        "ix_recipes_difficulty_level_cooking_time_id",
+        "recipes",
+        ["difficulty_level", "cooking_time", "id"],
+        unique=False,
+        postgresql_where=LIVE,
+    )
+    op.create_index(
+        "ix_recipes_cooking_time_id",
+        "recipes",
+        ["cooking_time", "id"],
+        unique=False,
+        postgresql_where=LIVE,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_recipes_cooking_time_id", table_name="recipes")
+    op.drop_index("ix_recipes_difficulty_level_cooking_time_id", table_name="recipes")
+    op.drop_index("ix_recipes_user_id_created_at_id", table_name="recipes")
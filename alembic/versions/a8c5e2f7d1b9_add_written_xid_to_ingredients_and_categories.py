@@ -0,0 +1,38 @@
+"""Add written_xid to ingredients and categories
+
+Revision ID: a8c5e2f7d1b9
+Revises: f3b9d6e2a7c4
+Create Date: 2026-01-14 09:12:48.604211
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a8c5e2f7d1b9"
+down_revision: Union[str, Sequence[str], None] = "f3b9d6e2a7c4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Same shape as f3b9d6e2a7c4: no volatile default on ADD COLUMN, so
+    # existing rows stay NULL instead of rewriting the tables.
+    for table in ("ingredients", "categories"):
+        op.execute(f"ALTER TABLE {table} ADD COLUMN written_xid xid8")
+        op.execute(
+            f"ALTER TABLE {table} "
+            "ALTER COLUMN written_xid SET DEFAULT pg_current_xact_id()"
+        )
+        op.create_index(f"ix_{table}_written_xid", table, ["written_xid"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ("categories", "ingredients"):
+        op.drop_index(f"ix_{table}_written_xid", table_name=table)
+        op.drop_column(table, "written_xid")
@@ -0,0 +1,48 @@
+"""Add created_at keyset indexes
+
+Revision ID: b4e1c9a7d2f3
+Revises: 27b20e943a2b
+Create Date: 2025-10-27 21:04:12.418093
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b4e1c9a7d2f3"
+down_revision: Union[str, Sequence[str], None] = "27b20e943a2b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_users_created_at_id", "users", ["created_at", "id"], unique=False
+    )
+    op.create_index(
+        "ix_ingredients_created_at_id",
+        "ingredients",
+        ["created_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_categories_created_at_id",
+        "categories",
+        ["created_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_recipes_created_at_id", "recipes", ["created_at", "id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_recipes_created_at_id", table_name="recipes")
+    op.drop_index("ix_categories_created_at_id", table_name="categories")
+    op.drop_index("ix_ingredients_created_at_id", table_name="ingredients")
+    op.drop_index("ix_users_created_at_id", table_name="users")
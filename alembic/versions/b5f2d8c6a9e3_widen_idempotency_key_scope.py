@@ -0,0 +1,41 @@
+"""Widen idempotency key scope
+
+Revision ID: b5f2d8c6a9e3
+Revises: e9c3b7a5d2f4
+Create Date: 2025-11-28 10:21:05.814362
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b5f2d8c6a9e3"
+down_revision: Union[str, Sequence[str], None] = "e9c3b7a5d2f4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column(
+        "idempotency_keys",
+        "scope",
+        existing_type=sa.String(length=50),
+        type_=sa.String(length=100),
+        existing_nullable=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column(
+        "idempotency_keys",
+        "scope",
+        existing_type=sa.String(length=100),
+        type_=sa.String(length=50),
+        existing_nullable=False,
+    )
@@ -0,0 +1,64 @@
+"""Add recipe search vector
+
+Revision ID: b7e3d9a6c2f8
+Revises: a2d5f8c1e4b7
+Create Date: 2025-11-17 14:08:31.502716
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b7e3d9a6c2f8"
+down_revision: Union[str, Sequence[str], None] = "a2d5f8c1e4b7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("recipes", sa.Column("ingredient_names", sa.Text(), nullable=True))
+    # Same order as ``src.db.search.join_names``: code points, not the
+    # database collation.
+    op.execute(
+        "UPDATE recipes SET ingredient_names = ("
+        "SELECT string_agg(ingredients.name, ' ' "
+        'ORDER BY ingredients.name COLLATE "C") '
+        "FROM recipe_ingredients JOIN ingredients "
+        "ON ingredients.id = recipe_ingredients.ingredient_id "
+        "WHERE recipe_ingredients.recipe_id = recipes.id)"
+    )
+    op.add_column(
+        "recipes",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('english', name), 'A') || "
+                "setweight(to_tsvector('english', coalesce(ingredient_names, '')), "
+                "'B') || setweight(to_tsvector('english', instructions), 'C')",
+                persisted=True,
+            ),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        "ix_recipes_search_vector",
+        "recipes",
+        ["search_vector"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_where=sa.text("deleted_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_recipes_search_vector", table_name="recipes")
+    op.drop_column("recipes", "search_vector")
+    op.drop_column("recipes", "ingredient_names")
@@ -0,0 +1,84 @@
+"""Add name autocomplete indexes
+
+Revision ID: c4f8a1d7e3b9
+Revises: b7e3d9a6c2f8
+Create Date: 2025-11-20 11:36:42.187390
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c4f8a1d7e3b9"
+down_revision: Union[str, Sequence[str], None] = "b7e3d9a6c2f8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LIVE = sa.text("deleted_at IS NULL")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_ingredients_name_pattern",
+        "ingredients",
+        ["name"],
+        unique=False,
+        postgresql_ops={"name": "text_pattern_ops"},
+    )
+    op.create_index(
+        "ix_categories_name_pattern",
+        "categories",
+        ["name"],
+        unique=False,
+        postgresql_ops={"name": "text_pattern_ops"},
+    )
+    op.create_index(
+        "ix_recipes_name_pattern",
+        "recipes",
+        ["name"],
+        unique=False,
+        postgresql_ops={"name": "text_pattern_ops"},
+        postgresql_where=LIVE,
+    )
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        "ix_ingredients_name_trgm",
+        "ingredients",
+        ["name"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_categories_name_trgm",
+        "categories",
+        ["name"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_recipes_name_trgm",
+        "recipes",
+        ["name"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+        postgresql_where=LIVE,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # pg_trgm itself stays: other objects in the database may use it.
+    op.drop_index("ix_recipes_name_trgm", table_name="recipes")
+    op.drop_index("ix_categories_name_trgm", table_name="categories")
+    op.drop_index("ix_ingredients_name_trgm", table_name="ingredients")
+    op.drop_index("ix_recipes_name_pattern", table_name="recipes")
+    op.drop_index("ix_categories_name_pattern", table_name="categories")
+    op.drop_index("ix_ingredients_name_pattern", table_name="ingredients")
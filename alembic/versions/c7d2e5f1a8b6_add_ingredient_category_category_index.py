@@ -0,0 +1,36 @@
+"""Add ingredient_category category index
+
+Revision ID: c7d2e5f1a8b6
+Revises: b4e1c9a7d2f3
+Create Date: 2025-10-28 19:42:37.106512
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c7d2e5f1a8b6"
+down_revision: Union[str, Sequence[str], None] = "b4e1c9a7d2f3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_ingredient_category_category_id_ingredient_id",
+        "ingredient_category",
+        ["category_id", "ingredient_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_ingredient_category_category_id_ingredient_id",
+        table_name="ingredient_category",
+    )
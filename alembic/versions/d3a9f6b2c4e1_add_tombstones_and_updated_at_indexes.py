@@ -0,0 +1,55 @@
+"""Add tombstones and updated_at indexes
+
+Revision ID: d3a9f6b2c4e1
+Revises: c7d2e5f1a8b6
+Create Date: 2025-10-30 18:15:52.734920
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d3a9f6b2c4e1"
+down_revision: Union[str, Sequence[str], None] = "c7d2e5f1a8b6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "tombstones",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("entity", sa.String(length=20), nullable=False),
+        sa.Column("entity_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "deleted_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_tombstones_deleted_at", "tombstones", ["deleted_at"], unique=False
+    )
+    op.create_index("ix_recipes_updated_at", "recipes", ["updated_at"], unique=False)
+    op.create_index(
+        "ix_ingredients_updated_at", "ingredients", ["updated_at"], unique=False
+    )
+    op.create_index(
+        "ix_categories_updated_at", "categories", ["updated_at"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_categories_updated_at", table_name="categories")
+    op.drop_index("ix_ingredients_updated_at", table_name="ingredients")
+    op.drop_index("ix_recipes_updated_at", table_name="recipes")
+    op.drop_index("ix_tombstones_deleted_at", table_name="tombstones")
+    op.drop_table("tombstones")
@@ -0,0 +1,66 @@
+"""Add recipe soft delete
+
+Revision ID: e5b8c1d4f7a2
+Revises: d3a9f6b2c4e1
+Create Date: 2025-11-06 10:42:17.318204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e5b8c1d4f7a2"
+down_revision: Union[str, Sequence[str], None] = "d3a9f6b2c4e1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "recipes", sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=True)
+    )
+    op.drop_constraint("recipes_name_key", "recipes", type_="unique")
+    op.create_index(
+        "uq_recipes_name",
+        "recipes",
+        ["name"],
+        unique=True,
+        postgresql_where=sa.text("deleted_at IS NULL"),
+    )
+    op.drop_index("ix_recipes_created_at_id", table_name="recipes")
+    op.create_index(
+        "ix_recipes_created_at_id",
+        "recipes",
+        ["created_at", "id"],
+        unique=False,
+        postgresql_where=sa.text("deleted_at IS NULL"),
+    )
+    op.create_index(
+        "ix_recipes_deleted_at",
+        "recipes",
+        ["deleted_at"],
+        unique=False,
+        postgresql_where=sa.text("deleted_at IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(
+        "DELETE FROM recipe_ingredients WHERE recipe_id IN "
+        "(SELECT id FROM recipes WHERE deleted_at IS NOT NULL)"
+    )
+    op.execute("DELETE FROM recipes WHERE deleted_at IS NOT NULL")
+    op.drop_index("ix_recipes_deleted_at", table_name="recipes")
+    op.drop_index("ix_recipes_created_at_id", table_name="recipes")
+    op.create_index(
+        "ix_recipes_created_at_id", "recipes", ["created_at", "id"], unique=False
+    )
+    op.drop_index("uq_recipes_name", table_name="recipes")
+    op.create_unique_constraint("recipes_name_key", "recipes", ["name"])
+    op.drop_column("recipes", "deleted_at")
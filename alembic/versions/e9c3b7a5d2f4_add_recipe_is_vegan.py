@@ -0,0 +1,54 @@
+"""Add recipe is_vegan
+
+Revision ID: e9c3b7a5d2f4
+Revises: a2d6e8f4b1c7
+Create Date: 2025-11-26 15:08:43.531620
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e9c3b7a5d2f4"
+down_revision: Union[str, Sequence[str], None] = "a2d6e8f4b1c7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A constant default makes adding the column a catalog-only change; the
+    # backfill then rewrites just the recipes that are not vegan.
+    op.add_column(
+        "recipes",
+        sa.Column("is_vegan", sa.Boolean(), server_default=sa.true(), nullable=False),
+    )
+    op.execute(
+        """
+        UPDATE recipes SET is_vegan = false
+        WHERE EXISTS (
+            SELECT FROM recipe_ingredients
+            JOIN ingredients ON ingredients.id = recipe_ingredients.ingredient_id
+            WHERE recipe_ingredients.recipe_id = recipes.id
+            AND NOT ingredients.is_vegan
+        )
+        """
+    )
+    op.alter_column("recipes", "is_vegan", server_default=None)
+    op.create_index(
+        "ix_recipes_is_vegan_created_at_id",
+        "recipes",
+        ["is_vegan", "created_at", "id"],
+        unique=False,
+        postgresql_where=sa.text("deleted_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_recipes_is_vegan_created_at_id", table_name="recipes")
+    op.drop_column("recipes", "is_vegan")
@@ -0,0 +1,39 @@
+"""Add written_xid to recipes and tombstones
+
+Revision ID: f3b9d6e2a7c4
+Revises: b5f2d8c6a9e3
+Create Date: 2025-12-03 10:41:26.318457
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f3b9d6e2a7c4"
+down_revision: Union[str, Sequence[str], None] = "b5f2d8c6a9e3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Added without a default and given one afterwards: a volatile default
+    # would rewrite the tables, and existing rows can stay NULL since they
+    # predate any reader's watermark.
+    for table in ("recipes", "tombstones"):
+        op.execute(f"ALTER TABLE {table} ADD COLUMN written_xid xid8")
+        op.execute(
+            f"ALTER TABLE {table} "
+            "ALTER COLUMN written_xid SET DEFAULT pg_current_xact_id()"
+        )
+        op.create_index(f"ix_{table}_written_xid", table, ["written_xid"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ("tombstones", "recipes"):
+        op.drop_index(f"ix_{table}_written_xid", table_name=table)
+        op.drop_column(table, "written_xid")
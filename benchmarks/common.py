@@ -0,0 +1,111 @@
+import argparse
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from uuid import uuid4
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+from src.api.recipes.enums import DifficultyLevel
+from src.db.models.ingredients import Ingredient
+from src.db.models.recipes import Recipe, RecipeIngredient
+from src.db.models.users import User
+from src.db.postgresql import database_url
+
+
+def make_parser(description: str) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument(
+        "--url",
+        default=database_url,
+        help="async SQLAlchemy URL (defaults to the app database)",
+    )
+    return parser
+
+
+@asynccontextmanager
+async def rolled_back_connection(url: str) -> AsyncIterator[AsyncConnection]:
+    """
+    Yield a connection inside a transaction that is always rolled back, so
+    benchmarks never leave data behind.
+    """
+    engine = create_async_engine(url, poolclass=NullPool)
+    try:
+        async with engine.connect() as connection:
+            trans = await connection.begin()
+            try:
+                yield connection
+            finally:
+                await trans.rollback()
+    finally:
+        await engine.dispose()
+
+
+def make_session(connection: AsyncConnection) -> AsyncSession:
+    return AsyncSession(
+        bind=connection,
+        expire_on_commit=False,
+        autoflush=False,
+        join_transaction_mode="create_savepoint",
+    )
+
+
+async def seed_recipes(
+    connection: AsyncConnection, recipes: int, ingredients_per_recipe: int
+) -> None:
+    tag = uuid4().hex[:8]
+    user_id = await connection.scalar(
+        insert(User)
+        .values(
+            username=f"bench-{tag}",
+            email=f"bench-{tag}@example.com",
+            hashed_password="x",
+        )
+        .returning(User.id)
+    )
+    ingredient_ids = (
+        await connection.scalars(
+            insert(Ingredient).returning(Ingredient.id),
+            [
+                {"name": f"bench-{tag}-ingredient-{i}", "is_vegan": i % 2 == 0}
+                for i in range(ingredients_per_recipe * 4)
+            ],
+        )
+    ).all()
+    recipe_ids = (
+        await connection.scalars(
+            insert(Recipe).returning(Recipe.id),
+            [
+                {
+                    "name": f"bench-{tag}-recipe-{i}",
+                    "cooking_time": 30,
+                    "difficulty_level": DifficultyLevel.EASY,
+                    "portions": 2,
+                    "instructions": "Mix everything. " * 20,
+                    "user_id": user_id,
+                }
+                for i in range(recipes)
+            ],
+        )
+    ).all()
+    await connection.execute(
+        insert(RecipeIngredient),
+        [
+            {
+                "recipe_id": recipe_id,
+                "ingredient_id": ingredient_ids[(n + k) % len(ingredient_ids)],
+                "quantity": "1 unit",
+            }
+            for n, recipe_id in enumerate(recipe_ids)
+            for k in range(ingredients_per_recipe)
+        ],
+    )
+
+
+class Timer:
+    def __enter__(self) -> "Timer":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.elapsed = time.perf_counter() - self.started
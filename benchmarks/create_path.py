@@ -0,0 +1,182 @@
+"""
+Statements and latency per create: the previous ORM add/commit/reload flow
+versus the single ``INSERT ... ON CONFLICT DO NOTHING RETURNING`` statement.
+
+    python -m benchmarks.create_path --creates 500
+
+Each flow creates new rows, then retries the same names to exercise the
+conflict path. Runs inside a transaction that is rolled back at the end.
+"""
+
+import asyncio
+from uuid import uuid4
+from sqlalchemy import event, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from benchmarks.common import Timer, make_parser, make_session, rolled_back_connection
+from src.api.categories.schemas import CreateCategorySchema, GetCategorySchema
+from src.api.categories.services import CategoryRepository
+from src.api.recipes.enums import DifficultyLevel
+from src.api.recipes.schemas import CreateRecipeSchema, GetRecipeSchema
+from src.api.recipes.services import RecipeRepository
+from src.core.exceptions import ErrorException
+from src.db.models.categories import Category
+from src.db.models.ingredients import Ingredient
+from src.db.models.recipes import Recipe, RecipeIngredient
+from src.db.models.users import User
+
+
+async def orm_create_category(
+    session: AsyncSession, data: CreateCategorySchema
+) -> GetCategorySchema | None:
+    category = Category(name=data.name)
+    session.add(category)
+    try:
+        await session.commit()
+    except IntegrityError:
+        await session.rollback()
+        return None
+    category = await session.get(
+        Category,
+        category.id,
+        options=[selectinload(Category.ingredients)],
+        populate_existing=True,
+    )
+    return GetCategorySchema.model_validate(category)
+
+
+async def orm_create_recipe(
+    session: AsyncSession, data: CreateRecipeSchema
+) -> GetRecipeSchema | None:
+    user = await session.get(User, data.user_id)
+    ingredients = {
+        ingredient.id: ingredient
+        for ingredient in await session.scalars(
+            select(Ingredient).where(
+                Ingredient.id.in_({line.ingredient_id for line in data.ingredients})
+            )
+        )
+    }
+    recipe = Recipe(**data.model_dump(exclude={"ingredients"}), user=user)
+    recipe.recipe_ingredients = [
+        RecipeIngredient(
+            ingredient=ingredients[line.ingredient_id], quantity=line.quantity
+        )
+        for line in data.ingredients
+    ]
+    session.add(recipe)
+    try:
+        await session.commit()
+    except IntegrityError:
+        await session.rollback()
+        return None
+    recipe = await session.get(
+        Recipe,
+        recipe.id,
+        options=[
+            selectinload(Recipe.recipe_ingredients),
+            selectinload(Recipe.ingredients),
+        ],
+        populate_existing=True,
+    )
+    return GetRecipeSchema.model_validate(recipe)
+
+
+async def repository_create_category(
+    session: AsyncSession, data: CreateCategorySchema
+) -> GetCategorySchema | None:
+    try:
+        return await CategoryRepository(session).create_category(data)
+    except ErrorException:
+        return None
+
+
+async def repository_create_recipe(
+    session: AsyncSession, data: CreateRecipeSchema
+) -> GetRecipeSchema | None:
+    try:
+        return await RecipeRepository(session).create_recipe(data)
+    except ErrorException:
+        await session.rollback()
+        return None
+
+
+async def main() -> None:
+    parser = make_parser(__doc__)
+    parser.add_argument("--creates", type=int, default=500)
+    parser.add_argument("--ingredients", type=int, default=8)
+    args = parser.parse_args()
+
+    async with rolled_back_connection(args.url) as connection:
+        tag = uuid4().hex[:8]
+        user_id = await connection.scalar(
+            insert(User)
+            .values(
+                username=f"bench-{tag}",
+                email=f"bench-{tag}@example.com",
+                hashed_password="x",
+            )
+            .returning(User.id)
+        )
+        ingredient_ids = (
+            await connection.scalars(
+                insert(Ingredient).returning(Ingredient.id),
+                [
+                    {"name": f"bench-{tag}-ingredient-{i}", "is_vegan": True}
+                    for i in range(args.ingredients)
+                ],
+            )
+        ).all()
+        statements: list[str] = []
+
+        def record(conn, cursor, statement, *args) -> None:
+            if "SAVEPOINT" not in statement:
+                statements.append(statement)
+
+        event.listen(connection.sync_engine, "before_cursor_execute", record)
+
+        flows = (
+            ("category", "orm", orm_create_category),
+            ("category", "insert", repository_create_category),
+            ("recipe", "orm", orm_create_recipe),
+            ("recipe", "insert", repository_create_recipe),
+        )
+        for entity, label, create in flows:
+            if entity == "category":
+                payloads = [
+                    CreateCategorySchema(name=f"bench-{tag}-{label}-{i}")
+                    for i in range(args.creates)
+                ]
+            else:
+                payloads = [
+                    CreateRecipeSchema(
+                        name=f"bench-{tag}-{label}-{i}",
+                        cooking_time=30,
+                        difficulty_level=DifficultyLevel.EASY,
+                        portions=2,
+                        instructions="Mix everything.",
+                        user_id=user_id,
+                        ingredients=[
+                            {"ingredient_id": ingredient_id, "quantity": "1 unit"}
+                            for ingredient_id in ingredient_ids
+                        ],
+                    )
+                    for i in range(args.creates)
+                ]
+            for path in ("new", "conflict"):
+                session = make_session(connection)
+                statements.clear()
+                with Timer() as timer:
+                    for payload in payloads:
+                        await create(session, payload)
+                await session.close()
+                print(
+                    f"{entity:>8} {label:>6} {path:>8}: "
+                    f"{timer.elapsed / len(payloads) * 1000:.2f} ms/create, "
+                    f"{len(statements) / len(payloads):.1f} statements/create"
+                )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,80 @@
+"""
+Creates per second with one commit per request versus group commit.
+
+    python -m benchmarks.group_commit --creates 2000 --concurrency 64
+
+Concurrent clients create categories through ``CategoryRepository``, first
+each committing its own transaction, then through a ``WriteBatcher``. Unlike
+the other benchmarks this one has to commit for real (the point is the WAL
+flush per commit), so the rows it creates are deleted afterwards.
+"""
+
+import asyncio
+from uuid import uuid4
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from benchmarks.common import Timer, make_parser
+from src.api.categories.schemas import CreateCategorySchema
+from src.api.categories.services import CategoryRepository
+from src.db.batching import WriteBatcher
+from src.db.models.categories import Category
+
+
+async def run_clients(
+    session_factory: async_sessionmaker[AsyncSession],
+    names: list[str],
+    concurrency: int,
+    batcher: WriteBatcher | None = None,
+) -> None:
+    queue = iter(names)
+
+    async def client() -> None:
+        for name in queue:
+            async with session_factory() as db:
+                repository = CategoryRepository(db, batcher=batcher)
+                await repository.create_category(CreateCategorySchema(name=name))
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+
+
+async def main() -> None:
+    parser = make_parser(__doc__)
+    parser.add_argument("--creates", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--max-batch-size", type=int, default=100)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    engine = create_async_engine(args.url, pool_size=args.concurrency + 1)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    tag = uuid4().hex[:8]
+    try:
+        for label in ("per-request", "group"):
+            batcher = (
+                WriteBatcher(
+                    session_factory,
+                    max_batch_size=args.max_batch_size,
+                    max_wait=args.max_wait_ms / 1000,
+                )
+                if label == "group"
+                else None
+            )
+            names = [f"bench-{tag}-{label}-{i}" for i in range(args.creates)]
+            with Timer() as timer:
+                await run_clients(session_factory, names, args.concurrency, batcher)
+                if batcher is not None:
+                    await batcher.close()
+            print(
+                f"{label:>12}: {args.creates / timer.elapsed:,.0f} creates/s "
+                f"({timer.elapsed:.2f}s for {args.creates})"
+            )
+    finally:
+        async with engine.begin() as connection:
+            await connection.execute(
+                delete(Category).where(Category._name.startswith(f"bench-{tag}-"))
+            )
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,57 @@
+"""
+Per-row cost of the ORM read path versus the Core fast read path.
+
+    python -m benchmarks.read_path --recipes 5000
+
+Seeds recipes inside a transaction that is rolled back at the end.
+"""
+
+import asyncio
+from benchmarks.common import (
+    Timer,
+    make_parser,
+    make_session,
+    rolled_back_connection,
+    seed_recipes,
+)
+from src.api.common.schemas import PageParams
+from src.api.recipes.services import RecipeRepository
+
+
+async def read_all(repository: RecipeRepository) -> int:
+    rows, page = 0, PageParams(limit=500)
+    while True:
+        result = await repository.get_all_recipes(page)
+        for item in result.items:
+            item.model_dump_json(by_alias=True)
+        rows += len(result.items)
+        if result.next_cursor is None:
+            return rows
+        page = PageParams(limit=500, cursor=result.next_cursor)
+
+
+async def main() -> None:
+    parser = make_parser(__doc__)
+    parser.add_argument("--recipes", type=int, default=5000)
+    parser.add_argument("--ingredients", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    async with rolled_back_connection(args.url) as connection:
+        await seed_recipes(connection, args.recipes, args.ingredients)
+        for label, fast_reads in (("orm", False), ("core", True)):
+            best = None
+            for _ in range(args.rounds):
+                session = make_session(connection)
+                with Timer() as timer:
+                    rows = await read_all(RecipeRepository(session, fast_reads))
+                await session.close()
+                best = min(best or timer.elapsed, timer.elapsed)
+            print(
+                f"{label:>5}: {rows} rows in {best * 1000:.1f} ms "
+                f"({best / rows * 1e6:.1f} us/row)"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from src.api.users.routes import router as users_router
@@ -5,13 +6,39 @@ from src.api.ingredients.routes import router as ingredients_router
 from src.api.categories.routes import router as categories_router
 from src.api.recipes.routes import router as recipes_router
 from src.api.auth.routes import router as auth_router
+from src.api.sync.routes import router as sync_router
 from src.core.schemas import ErrorSchema
 from src.core.exceptions import ErrorException
 from src.core.logging import setup_logging
+from src.db.postgresql import (
+    SessionLocal,
+    outbox_dispatcher,
+    pantry_index,
+    purger,
+    write_batcher,
+)
 
 setup_logging()
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if purger is not None:
+        purger.start()
+    if outbox_dispatcher is not None:
+        outbox_dispatcher.start()
+    pantry_index.start(SessionLocal)
+    yield
+    await pantry_index.close()
+    if outbox_dispatcher is not None:
+        await outbox_dispatcher.close()
+    if purger is not None:
+        await purger.close()
+    if write_batcher is not None:
+        await write_batcher.close()
+
+
+app = FastAPI(lifespan=lifespan)
 
 
 @app.exception_handler(ErrorException)
@@ -33,6 +60,7 @@ app.include_router(ingredients_router, prefix="/ingredients", tags=["ingredients
 app.include_router(categories_router, prefix="/categories", tags=["categories"])
 app.include_router(recipes_router, prefix="/recipes", tags=["recipes"])
 app.include_router(auth_router, prefix="/auth", tags=["auth"])
+app.include_router(sync_router, prefix="/sync", tags=["sync"])
 
 
 @app.get("/health")
@@ -8,6 +8,6 @@ router = APIRouter()
 
 @router.post("/token", response_model=Token)
 async def login(user: LoginRequest) -> Token:
-    user = authenticate_user(user.username, user.password)
+    user = await authenticate_user(user.username, user.password)
     access_token = create_access_token(user.username)
     return Token(access_token=access_token, token_type="bearer")
@@ -3,8 +3,10 @@ import logging
 from src.api.auth.schemas import JWTData
 from typing import Annotated
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
 import jwt
+from sqlalchemy import select
 from src.api.users.schemas import UserSchema
 from src.core.security import verify_password
 from src.db.models.users import User
@@ -79,27 +81,27 @@ def get_subject_for_token_type(
     return username
 
 
-def get_user(username: str) -> User | None:
+async def get_user(username: str) -> User | None:
     logger.debug("Fetching user from the database", extra={"username": username})
-    with get_db_context() as db:
-        user = db.query(User).filter(User.username == username).first()
+    async with get_db_context() as db:
+        user = await db.scalar(select(User).where(User.username == username))
     if user:
         return user
 
 
-def authenticate_user(username: str, password: str) -> User:
+async def authenticate_user(username: str, password: str) -> User:
     logger.debug("Authenticating user", extra={"username": username})
-    user = get_user(username=username)
+    user = await get_user(username=username)
     if not user:
         raise create_credentials_exception("Invalid username or password")
-    if not verify_password(password, user.hashed_password):
+    if not await run_in_threadpool(verify_password, password, user.hashed_password):
         raise create_credentials_exception("Invalid password")
     return user
 
 
-def get_current_user(token: Annotated[str, Depends(oauth2_scheme)]) -> User:
+async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)]) -> User:
     username = get_subject_for_token_type(token, "access")
-    user = get_user(username=username)
+    user = await get_user(username=username)
     if user is None:
         raise create_credentials_exception("Could not find user for this token")
     return user
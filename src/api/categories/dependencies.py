@@ -1,7 +1,17 @@
-from fastapi import Depends
+from fastapi import Depends, Query
+from src.core.config import config
 from src.core.dependencies import get_db
+from src.db.postgresql import write_batcher
 from src.api.categories.services import CategoryRepository
 
 
 def get_category_repository(db=Depends(get_db)) -> CategoryRepository:
-    return CategoryRepository(db)
+    return CategoryRepository(
+        db, fast_reads=config.FAST_READ_PATH, batcher=write_batcher
+    )
+
+
+def get_ingredients_limit(
+    ingredients_limit: int | None = Query(None, ge=1, le=500, examples=[10]),
+) -> int | None:
+    return ingredients_limit
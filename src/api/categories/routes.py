@@ -1,27 +1,91 @@
-from fastapi import APIRouter, Depends
+from functools import partial
+from typing import Annotated
+from fastapi import APIRouter, Depends, Query, Response
 from src.api.categories.schemas import (
+    CategoryIngredientsResultSchema,
     CreateCategorySchema,
     GetCategorySchema,
     UpdateCategorySchema,
 )
 from src.api.categories.services import CategoryRepository
-from src.api.categories.dependencies import get_category_repository
+from src.api.categories.dependencies import (
+    get_category_repository,
+    get_ingredients_limit,
+)
+from src.api.common.idempotency import Idempotency, get_idempotency
+from src.api.common.fields import Includes, SparseFields, items_include
+from src.api.common.responses import json_response
+from src.api.common.batch import batch_ids
+from src.api.common.autocomplete import (
+    AUTOCOMPLETE_DESCRIPTION,
+    MAX_AUTOCOMPLETE_LIMIT,
+)
+from src.api.common.schemas import (
+    AutocompleteSchema,
+    BatchSchema,
+    IngredientRelationshipSchema,
+    LinkIdsSchema,
+    PageParams,
+    PageSchema,
+)
 from src.core.schemas import ErrorResponse
 
 router = APIRouter()
 
+category_fields = SparseFields(GetCategorySchema)
+category_includes = Includes(
+    GetCategorySchema,
+    allowed={"ingredients", "ingredient_count"},
+    default=frozenset({"ingredients"}),
+)
+
 
 @router.get(
     "/",
-    response_model=list[GetCategorySchema],
+    response_model=PageSchema[GetCategorySchema] | BatchSchema[GetCategorySchema],
     responses={
+        422: {
+            "model": ErrorResponse,
+            "description": "Invalid pagination cursor, ids, fields or include",
+        },
         500: {"model": ErrorResponse, "description": "Internal server error"},
     },
 )
 async def get_categories(
+    page: Annotated[PageParams, Query()],
+    ids: list[int] | None = Depends(batch_ids),
+    fields: set[str] | None = Depends(category_fields),
+    include: frozenset[str] = Depends(category_includes),
+    ingredients_limit: int | None = Depends(get_ingredients_limit),
     category_repository: CategoryRepository = Depends(get_category_repository),
-) -> list[GetCategorySchema]:
-    return category_repository.get_all_categories()
+) -> Response:
+    fields = category_includes.narrow(fields, include)
+    if ids is not None:
+        categories = await category_repository.get_categories_by_ids(
+            ids, fields, include, ingredients_limit
+        )
+    else:
+        categories = await category_repository.get_all_categories(
+            page, fields, include, ingredients_limit
+        )
+    return json_response(categories, include=items_include(fields))
+
+
+@router.get(
+    "/autocomplete",
+    response_model=AutocompleteSchema,
+    responses={
+        200: {"description": AUTOCOMPLETE_DESCRIPTION},
+        422: {"model": ErrorResponse, "description": "Invalid prefix or limit"},
+        500: {"model": ErrorResponse, "description": "Internal server error"},
+    },
+)
+async def autocomplete_categories(
+    prefix: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=MAX_AUTOCOMPLETE_LIMIT),
+    category_repository: CategoryRepository = Depends(get_category_repository),
+) -> Response:
+    return json_response(await category_repository.autocomplete(prefix, limit))
 
 
 @router.get(
@@ -29,15 +93,60 @@ async def get_categories(
     response_model=GetCategorySchema,
     responses={
         404: {"model": ErrorResponse, "description": "Category not found"},
+        422: {"model": ErrorResponse, "description": "Unknown fields or include"},
         500: {"model": ErrorResponse, "description": "Internal server error"},
     },
 )
 async def get_category(
     category_id: int,
+    fields: set[str] | None = Depends(category_fields),
+    include: frozenset[str] = Depends(category_includes),
+    ingredients_limit: int | None = Depends(get_ingredients_limit),
+    category_repository: CategoryRepository = Depends(get_category_repository),
+) -> Response:
+    fields = category_includes.narrow(fields, include)
+    category = await category_repository.get_category_by_id(
+        category_id, fields, include, ingredients_limit
+    )
+    return json_response(category, include=fields)
+
+
+@router.get(
+    "/{category_id}/ingredients",
+    response_model=PageSchema[IngredientRelationshipSchema],
+    responses={
+        404: {"model": ErrorResponse, "description": "Category not found"},
+        422: {"model": ErrorResponse, "description": "Invalid pagination cursor"},
+        500: {"model": ErrorResponse, "description": "Internal server error"},
+    },
+)
+async def get_category_ingredients(
+    category_id: int,
+    page: Annotated[PageParams, Query()],
     category_repository: CategoryRepository = Depends(get_category_repository),
-):
-    category = category_repository.get_category_by_id(category_id)
-    return category
+) -> Response:
+    ingredients = await category_repository.get_category_ingredients(category_id, page)
+    return json_response(ingredients)
+
+
+@router.post(
+    "/{category_id}/ingredients",
+    response_model=CategoryIngredientsResultSchema,
+    responses={
+        404: {
+            "model": ErrorResponse,
+            "description": "Category or ingredient not found",
+        },
+        422: {"model": ErrorResponse, "description": "Invalid ids"},
+        500: {"model": ErrorResponse, "description": "Internal server error"},
+    },
+)
+async def add_category_ingredients(
+    category_id: int,
+    ingredients: LinkIdsSchema,
+    category_repository: CategoryRepository = Depends(get_category_repository),
+) -> CategoryIngredientsResultSchema:
+    return await category_repository.add_ingredients(category_id, ingredients.ids)
 
 
 @router.post(
@@ -56,8 +165,9 @@ async def get_category(
 async def create_category(
     category: CreateCategorySchema,
     category_repository: CategoryRepository = Depends(get_category_repository),
-) -> GetCategorySchema:
-    return category_repository.create_category(category)
+    idempotency: Idempotency = Depends(get_idempotency),
+) -> Response:
+    return await idempotency.run(partial(category_repository.create_category, category))
 
 
 @router.put(
@@ -77,4 +187,4 @@ async def update_category(
     category: UpdateCategorySchema,
     category_repository: CategoryRepository = Depends(get_category_repository),
 ) -> GetCategorySchema:
-    return category_repository.update_category(category_id, category)
+    return await category_repository.update_category(category_id, category)
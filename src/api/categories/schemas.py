@@ -1,6 +1,9 @@
+from collections.abc import Mapping
 from datetime import datetime
+from typing import Any, Self
 from pydantic import Field, field_validator, field_serializer
-from src.api.schemas import BaseSchema
+from sqlalchemy import Row
+from src.api.schemas import BaseSchema, ExpandableSchema
 from src.api.common.schemas import IngredientRelationshipSchema
 
 
@@ -17,7 +20,9 @@ class CategorySchema(BaseSchema):
         return value.capitalize()
 
 
-class GetCategorySchema(CategorySchema):
+class GetCategorySchema(CategorySchema, ExpandableSchema):
+    expansions = frozenset({"ingredient_count", "ingredients_next_cursor"})
+
     id: int = Field(..., examples=[1])
     created_at: datetime = Field(..., examples=["2023-10-01T12:00:00Z"])
     updated_at: datetime | None = Field(..., examples=["2023-10-01T12:00:00Z"])
@@ -25,6 +30,41 @@ class GetCategorySchema(CategorySchema):
         default_factory=list,
         examples=[[{"id": 1, "name": "Broccoli"}]],
     )
+    ingredient_count: int | None = Field(None, examples=[12])
+    # Set when ``ingredients`` was cut at ``ingredients_limit``; continue with
+    # GET /categories/{id}/ingredients?cursor=...
+    ingredients_next_cursor: str | None = Field(None, examples=["eyJpZCI6MTJ9"])
+
+    @classmethod
+    def from_values(cls, values: Mapping[str, Any]) -> Self:
+        """
+        Build a possibly partial schema (sparse fieldsets) from loaded values.
+        """
+        values = dict(values)
+        if "ingredients" in values:
+            values["ingredients"] = [
+                IngredientRelationshipSchema.model_validate(item)
+                for item in values["ingredients"]
+            ]
+        return cls.model_construct(**values)
+
+    @classmethod
+    def from_row(cls, row: Row) -> Self:
+        """
+        Build the schema from a trusted Core row without running validators.
+        """
+        values = dict(row._mapping)
+        if "ingredients" in values:
+            values["ingredients"] = [
+                IngredientRelationshipSchema.model_construct(**item)
+                for item in values["ingredients"]
+            ]
+        return cls.model_construct(**values)
+
+
+class CategoryIngredientsResultSchema(BaseSchema):
+    added: int = Field(..., examples=[2])
+    ingredient_count: int = Field(..., examples=[14])
 
 
 class CreateCategorySchema(CategorySchema):
@@ -1,7 +1,23 @@
-from fastapi import status
+from collections import defaultdict
+from functools import partial
+from fastapi import Response, status
+from sqlalchemy import (
+    ARRAY,
+    Integer,
+    ScalarSelect,
+    Select,
+    any_,
+    func,
+    literal,
+    select,
+    true,
+)
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only, selectinload, with_expression
 from src.api.categories.schemas import (
+    CategoryIngredientsResultSchema,
     CreateCategorySchema,
     GetCategorySchema,
     UpdateCategorySchema,
@@ -9,77 +25,368 @@ from src.api.categories.schemas import (
 from src.api.common.schemas import IngredientRelationshipSchema
 from src.db.models.ingredients import Ingredient
 from src.db.models.categories import Category
+from src.api.common.batch import build_batch
+from src.api.common.fields import make_item, pick
+from src.api.common.pagination import build_page, encode_cursor, paginate
+from src.api.common.autocomplete import Autocomplete
+from src.api.common.schemas import (
+    AutocompleteSchema,
+    BatchSchema,
+    PageParams,
+    PageSchema,
+)
 from src.core.exceptions import ErrorException
-from src.core.enums import ErrorKind
-from src.core.logging import logger
+from src.core.enums import ErrorKind, EventType, LoadProfile, PageOrder
+from src.db.batching import WriteBatcher, run_write
+from src.db.functions import json_list
+from src.db.links import add_links
+from src.db.outbox import event, record_events
+from src.db.models.ingredients import IngredientCategory
+
+category_names = Autocomplete(Category)
 
 
 class CategoryRepository:
-    def __init__(self, db: Session):
+    load_profiles = {
+        LoadProfile.LIST: (selectinload(Category.ingredients),),
+        LoadProfile.DETAIL: (selectinload(Category.ingredients),),
+    }
+    # Sparse fieldsets (``?fields=``): response field -> column / loader.
+    field_columns = {
+        "id": Category.id,
+        "name": Category._name,
+        "created_at": Category.created_at,
+        "updated_at": Category.updated_at,
+    }
+    field_loaders = {"ingredients": selectinload(Category.ingredients)}
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        fast_reads: bool = False,
+        batcher: WriteBatcher | None = None,
+    ):
         self.db = db
+        self.fast_reads = fast_reads
+        self.batcher = batcher
 
     @property
     def repo_name(self) -> str:
         return "CategoryRepository"
 
-    def get_all_categories(self) -> list[GetCategorySchema]:
-        categories = self.db.query(Category).all()
-        return [GetCategorySchema.model_validate(category) for category in categories]
+    def query(
+        self,
+        profile: LoadProfile,
+        fields: set[str] | None = None,
+        include: frozenset[str] = frozenset(),
+    ) -> Select:
+        if fields is None:
+            options = self.load_profiles[profile]
+        else:
+            options = (
+                load_only(Category.created_at, *pick(self.field_columns, fields)),
+                *pick(self.field_loaders, fields),
+            )
+        if "ingredient_count" in include:
+            count = with_expression(Category.ingredient_count, self.ingredient_count())
+            options = (*options, count)
+        return select(Category).options(*options)
 
-    def get_ingredients(
-        self, ingredients: list[IngredientRelationshipSchema]
-    ) -> list[Ingredient]:
-        if not ingredients:
-            return []
-        ingredients_ids = [ing.id for ing in ingredients]
+    @staticmethod
+    def ingredient_count() -> ScalarSelect:
+        """
+        Links per category, correlated to the outer category row so only the
+        categories being returned are counted (an index-only scan each).
+        """
+        return (
+            select(func.count())
+            .where(IngredientCategory.category_id == Category.id)
+            .scalar_subquery()
+        )
+
+    def item_factory(
+        self, fields: set[str] | None = None, include: frozenset[str] = frozenset()
+    ):
+        if fields is not None:
+            # Expansions are only read from the row when they were loaded.
+            fields = fields - (GetCategorySchema.expansions - include)
+        return make_item(GetCategorySchema, fields)
+
+    def rows_query(
+        self, fields: set[str] | None = None, include: frozenset[str] = frozenset()
+    ) -> Select:
+        """
+        Core select of exactly the GetCategorySchema columns, with
+        ingredients aggregated in SQL, for the ORM-free read path.
+        """
         ingredients = (
-            self.db.query(Ingredient).filter(Ingredient.id.in_(ingredients_ids)).all()
+            select(json_list(id=Ingredient.id, name=Ingredient._name))
+            .join(IngredientCategory, IngredientCategory.ingredient_id == Ingredient.id)
+            .where(IngredientCategory.category_id == Category.id)
+            .scalar_subquery()
+        )
+        columns = {**self.field_columns, "ingredients": ingredients}
+        if "ingredient_count" in include:
+            columns["ingredient_count"] = self.ingredient_count()
+        if fields is not None:
+            fields = fields | {"id", "created_at"}
+        return select(
+            *(
+                column.label(name)
+                for name, column in columns.items()
+                if fields is None or name in fields
+            )
         )
 
-    def get_category_by_id(self, category_id: int) -> GetCategorySchema | None:
-        category = self.db.query(Category).filter(Category.id == category_id).first()
-        if category:
-            return GetCategorySchema.model_validate(category)
+    @staticmethod
+    def load_fields(
+        fields: set[str] | None, ingredients_limit: int | None
+    ) -> set[str] | None:
+        """
+        Fields to read with the categories themselves: when ingredients are
+        cut at ``ingredients_limit`` they come from ``attach_first_ingredients``.
+        """
+        if ingredients_limit is None or (
+            fields is not None and "ingredients" not in fields
+        ):
+            return fields
+        return (fields or set(GetCategorySchema.model_fields)) - {"ingredients"} | {
+            "id"
+        }
+
+    async def attach_first_ingredients(
+        self,
+        items: list[GetCategorySchema],
+        fields: set[str] | None,
+        ingredients_limit: int | None,
+    ) -> None:
+        """
+        Fill each category with its first ``ingredients_limit`` ingredients
+        (by id) in one LATERAL query, plus a cursor when more remain.
+        """
+        if not items or self.load_fields(fields, ingredients_limit) == fields:
+            return
+        first = (
+            select(Ingredient.id, Ingredient._name.label("name"))
+            .join(IngredientCategory, IngredientCategory.ingredient_id == Ingredient.id)
+            .where(IngredientCategory.category_id == Category.id)
+            .order_by(IngredientCategory.ingredient_id)
+            .limit(ingredients_limit + 1)
+            .lateral()
+        )
+        query = (
+            select(Category.id.label("category_id"), first.c.id, first.c.name)
+            .join(first, true())
+            .where(Category.id.in_([item.id for item in items]))
+            .order_by(Category.id, first.c.id)
+        )
+        by_category = defaultdict(list)
+        for row in await self.db.execute(query):
+            by_category[row.category_id].append(row)
+        for item in items:
+            rows = by_category[item.id]
+            item.ingredients = [
+                IngredientRelationshipSchema.model_construct(id=row.id, name=row.name)
+                for row in rows[:ingredients_limit]
+            ]
+            if len(rows) > ingredients_limit:
+                last = rows[ingredients_limit - 1]
+                item.ingredients_next_cursor = encode_cursor(last, PageOrder.ID)
+
+    async def get_category(self, category_id: int) -> Category | None:
+        query = self.query(LoadProfile.DETAIL).where(Category.id == category_id)
+        return await self.db.scalar(query.execution_options(populate_existing=True))
+
+    async def get_all_categories(
+        self,
+        page: PageParams,
+        fields: set[str] | None = None,
+        include: frozenset[str] = frozenset(),
+        ingredients_limit: int | None = None,
+    ) -> PageSchema[GetCategorySchema]:
+        load = self.load_fields(fields, ingredients_limit)
+        if self.fast_reads:
+            query = paginate(self.rows_query(load, include), Category, page)
+            rows = (await self.db.execute(query)).all()
+            result = build_page(rows, page, GetCategorySchema.from_row)
         else:
+            query = paginate(
+                self.query(LoadProfile.LIST, load, include), Category, page
+            )
+            categories = (await self.db.scalars(query)).all()
+            result = build_page(categories, page, self.item_factory(load, include))
+        await self.attach_first_ingredients(result.items, fields, ingredients_limit)
+        return result
+
+    async def get_category_ingredients(
+        self, category_id: int, page: PageParams
+    ) -> PageSchema[IngredientRelationshipSchema]:
+        query = (
+            select(Ingredient.id, Ingredient._name.label("name"), Ingredient.created_at)
+            .join(IngredientCategory, IngredientCategory.ingredient_id == Ingredient.id)
+            .where(IngredientCategory.category_id == category_id)
+        )
+        rows = (await self.db.execute(paginate(query, Ingredient, page))).all()
+        if not rows and page.cursor is None:
+            if await self.db.get(Category, category_id) is None:
+                raise ErrorException(
+                    code=status.HTTP_404_NOT_FOUND,
+                    message="Category not found",
+                    kind=ErrorKind.NOT_FOUND,
+                    source=f"{self.repo_name}.get_category_ingredients",
+                )
+        return build_page(
+            rows,
+            page,
+            lambda row: IngredientRelationshipSchema.model_construct(
+                id=row.id, name=row.name
+            ),
+        )
+
+    async def get_ingredients(self, ingredient_ids: list[int]) -> set[int]:
+        """
+        The existing ids among ``ingredient_ids``; raises a 404 listing the
+        ones that do not exist.
+        """
+        found = set(
+            await self.db.scalars(
+                select(Ingredient.id).where(
+                    Ingredient.id == any_(literal(ingredient_ids, ARRAY(Integer)))
+                )
+            )
+        )
+        missing_ids = [ing_id for ing_id in ingredient_ids if ing_id not in found]
+        if missing_ids:
+            raise ErrorException(
+                code=status.HTTP_404_NOT_FOUND,
+                message=f"Ingredients not found: {missing_ids}",
+                kind=ErrorKind.NOT_FOUND,
+                source=f"{self.repo_name}.get_ingredients",
+            )
+        return found
+
+    async def add_ingredients(
+        self, category_id: int, ingredient_ids: list[int]
+    ) -> CategoryIngredientsResultSchema:
+        """
+        Attach many ingredients to the category with one set-based insert;
+        already linked ingredients are skipped.
+        """
+        ingredient_count = await self.db.scalar(
+            select(self.ingredient_count()).where(Category.id == category_id)
+        )
+        if ingredient_count is None:
             raise ErrorException(
                 code=status.HTTP_404_NOT_FOUND,
                 message="Category not found",
                 kind=ErrorKind.NOT_FOUND,
-                source=f"{self.repo_name}.get_category_by_id",
+                source=f"{self.repo_name}.add_ingredients",
             )
+        found = await self.get_ingredients(ingredient_ids)
+        pairs = select(Ingredient.id, literal(category_id, Integer)).where(
+            Ingredient.id == any_(literal(list(found), ARRAY(Integer)))
+        )
+        added = await self.db.scalar(add_links(pairs))
+        await self.db.commit()
+        return CategoryIngredientsResultSchema(
+            added=added, ingredient_count=ingredient_count + added
+        )
 
-    def add_category(self, category: Category) -> GetCategorySchema:
-        self.db.add(category)
-        self.db.commit()
-        self.db.refresh(category)
-        return GetCategorySchema.model_validate(category)
+    async def autocomplete(self, prefix: str, limit: int) -> AutocompleteSchema:
+        return await category_names.complete(self.db, prefix, limit)
 
-    def create_category(self, category_data: CreateCategorySchema) -> GetCategorySchema:
-        try:
-            new_category = Category(
-                name=category_data.name,
+    async def get_categories_by_ids(
+        self,
+        category_ids: list[int],
+        fields: set[str] | None = None,
+        include: frozenset[str] = frozenset(),
+        ingredients_limit: int | None = None,
+    ) -> BatchSchema[GetCategorySchema]:
+        load = self.load_fields(fields, ingredients_limit)
+        if self.fast_reads:
+            query = self.rows_query(load, include).where(Category.id.in_(category_ids))
+            rows = (await self.db.execute(query)).all()
+            result = build_batch(category_ids, rows, GetCategorySchema.from_row)
+        else:
+            query = self.query(LoadProfile.LIST, load, include).where(
+                Category.id.in_(category_ids)
             )
-            return self.add_category(new_category)
-        except IntegrityError:
+            categories = (await self.db.scalars(query)).all()
+            result = build_batch(
+                category_ids, categories, self.item_factory(load, include)
+            )
+        await self.attach_first_ingredients(result.items, fields, ingredients_limit)
+        return result
+
+    async def get_category_by_id(
+        self,
+        category_id: int,
+        fields: set[str] | None = None,
+        include: frozenset[str] = frozenset(),
+        ingredients_limit: int | None = None,
+    ) -> GetCategorySchema | None:
+        load = self.load_fields(fields, ingredients_limit)
+        category = None
+        if self.fast_reads:
+            query = self.rows_query(load, include).where(Category.id == category_id)
+            row = (await self.db.execute(query)).first()
+            if row:
+                category = GetCategorySchema.from_row(row)
+        else:
+            query = self.query(LoadProfile.DETAIL, load, include).where(
+                Category.id == category_id
+            )
+            row = await self.db.scalar(query)
+            if row:
+                category = self.item_factory(load, include)(row)
+        if category:
+            await self.attach_first_ingredients([category], fields, ingredients_limit)
+            return category
+        raise ErrorException(
+            code=status.HTTP_404_NOT_FOUND,
+            message="Category not found",
+            kind=ErrorKind.NOT_FOUND,
+            source=f"{self.repo_name}.get_category_by_id",
+        )
+
+    async def create_category(
+        self, category_data: CreateCategorySchema
+    ) -> GetCategorySchema | Response:
+        """
+        Insert the category with ``ON CONFLICT DO NOTHING RETURNING``, so a
+        taken name comes back as no row instead of an ``IntegrityError``.
+        """
+        category = await run_write(
+            self.db, partial(self.insert_category, category_data), self.batcher
+        )
+        category_names.invalidate()
+        return category
+
+    async def insert_category(
+        self, category_data: CreateCategorySchema, db: AsyncSession
+    ) -> GetCategorySchema:
+        new = (
+            insert(Category.__table__)
+            .values(name=category_data.name)
+            .on_conflict_do_nothing(index_elements=["name"])
+            .returning(*(col.label(name) for name, col in self.field_columns.items()))
+            .cte("new_category")
+        )
+        query = select(new).add_cte(record_events(EventType.CATEGORY_CREATED, new.c.id))
+        row = (await db.execute(query)).one_or_none()
+        if not row:
             raise ErrorException(
                 code=status.HTTP_409_CONFLICT,
                 message="Category name already exists",
                 kind=ErrorKind.CONFLICT,
                 source=f"{self.repo_name}.create_category",
             )
-        except Exception as e:
-            logger.error(f"Unexpected error in create_category: {e}")
-            raise ErrorException(
-                code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                message="Internal server error",
-                kind=ErrorKind.INTERNAL,
-                source=f"{self.repo_name}.create_category",
-            )
+        return GetCategorySchema.model_validate({**row._mapping, "ingredients": []})
 
-    def update_category(
+    async def update_category(
         self, category_id: int, category_data: UpdateCategorySchema
     ) -> GetCategorySchema:
-        category = self.db.query(Category).filter(Category.id == category_id).first()
+        category = await self.get_category(category_id)
         if not category:
             raise ErrorException(
                 code=status.HTTP_404_NOT_FOUND,
@@ -90,8 +397,11 @@ class CategoryRepository:
         try:
             if category_data.name is not None:
                 category.name = category_data.name
-            self.db.commit()
-            self.db.refresh(category)
+            self.db.add(event(EventType.CATEGORY_UPDATED, category.id))
+            await self.db.commit()
+            if category_data.name is not None:
+                category_names.invalidate()
+            category = await self.get_category(category.id)
             return GetCategorySchema.model_validate(category)
         except IntegrityError:
             raise ErrorException(
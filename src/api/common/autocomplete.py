@@ -0,0 +1,163 @@
+"""
+Type-ahead over the unique, lowercase ``name`` columns.
+
+Prefix matches are a range scan on a ``text_pattern_ops`` btree,
+``name ~>=~ prefix AND name ~<~ successor(prefix)``, which unlike
+``LIKE 'prefix%'`` with a bound pattern stays indexable in the generic plans
+of prepared statements. When they do not fill the limit, names within
+``pg_trgm`` word similarity of the input (typos) follow, from a GIN trigram
+index, in the same statement.
+
+Answers are cached per process for a few seconds: a handful of short
+prefixes make up most of the type-ahead traffic. Writes that add, rename or
+remove names clear their process's cache after committing; other processes
+catch up when their entries expire.
+"""
+
+from collections import OrderedDict
+from time import monotonic
+from typing import Any
+from sqlalchemy import ColumnElement, Float, Select, and_, literal, select, union_all
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import UnaryExpression
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.api.common.schemas import AutocompleteItemSchema, AutocompleteSchema
+from src.core.config import config
+from src.db.base import normalize_name
+
+MAX_AUTOCOMPLETE_LIMIT = 25
+# Only inputs this long get fuzzy matches; shorter ones have too few trigrams
+# to tell a typo from a different word.
+MIN_FUZZY_LENGTH = 3
+# OpenAPI description of the autocomplete responses.
+AUTOCOMPLETE_DESCRIPTION = (
+    "Names starting with the prefix, then close misspellings of it. Answers "
+    "are cached per worker: a write shows up at once on the worker that made "
+    f"it and within {config.AUTOCOMPLETE_CACHE_TTL_SECONDS:g} seconds on the "
+    "others."
+)
+
+
+def successor(prefix: str) -> str:
+    """
+    Smallest string greater than every string starting with ``prefix`` in
+    code point (and so UTF-8 byte) order.
+    """
+    code = ord(prefix[-1]) + 1
+    if 0xD800 <= code < 0xE000:
+        code = 0xE000
+    return prefix[:-1] + chr(code)
+
+
+def pattern_order(name: ColumnElement[str]) -> UnaryExpression:
+    """
+    ``name USING ~<~``: code point order, which the ``text_pattern_ops``
+    index can return directly. Plain ``ORDER BY name`` lets the planner walk
+    the unique index in collation order and filter, which for a rare prefix
+    reads most of it.
+    """
+    return UnaryExpression(name, modifier=operators.custom_op("USING ~<~"))
+
+
+class TTLCache:
+    """
+    Least-recently-used cache whose entries also expire after ``ttl`` seconds.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Any) -> Any | None:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= monotonic():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return entry[1]
+
+    def set(self, key: Any, value: Any) -> None:
+        self.entries[key] = (monotonic() + self.ttl, value)
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+
+class Autocomplete:
+    def __init__(self, model: Any, *criteria: ColumnElement[bool]):
+        self.model = model
+        self.criteria = criteria
+        self.cache = TTLCache(
+            config.AUTOCOMPLETE_CACHE_SIZE, config.AUTOCOMPLETE_CACHE_TTL_SECONDS
+        )
+
+    async def complete(
+        self, db: AsyncSession, prefix: str, limit: int
+    ) -> AutocompleteSchema:
+        prefix = normalize_name(prefix)
+        key = (prefix, limit)
+        result = self.cache.get(key)
+        if result is None:
+            rows = (await db.execute(self.query(prefix, limit))).all()
+            result = AutocompleteSchema.model_construct(
+                items=[
+                    AutocompleteItemSchema.model_construct(**row._mapping)
+                    for row in rows
+                ]
+            )
+            self.cache.set(key, result)
+        return result
+
+    def invalidate(self) -> None:
+        """
+        Forget every cached answer. A new or renamed name can show up in the
+        fuzzy matches of almost any prefix, so there is no narrower set of
+        entries to drop.
+        """
+        self.cache.clear()
+
+    def query(self, prefix: str, limit: int) -> Select:
+        name = self.model._name
+        prefixed = and_(
+            name.bool_op("~>=~")(prefix), name.bool_op("~<~")(successor(prefix))
+        )
+        matches = (
+            select(
+                self.model.id,
+                name.label("name"),
+                literal(False).label("fuzzy"),
+                literal(0.0).label("distance"),
+            )
+            .where(prefixed, *self.criteria)
+            .order_by(pattern_order(name))
+            .limit(limit)
+        )
+        if len(prefix) < MIN_FUZZY_LENGTH:
+            found = matches.subquery("found")
+        else:
+            distance = literal(prefix).op("<<->", return_type=Float)(name)
+            typos = (
+                select(
+                    self.model.id,
+                    name.label("name"),
+                    literal(True).label("fuzzy"),
+                    distance.label("distance"),
+                )
+                .where(literal(prefix).bool_op("<%")(name), ~prefixed, *self.criteria)
+                .order_by(distance)
+                .limit(limit)
+            )
+            found = union_all(
+                select(matches.subquery()), select(typos.subquery())
+            ).subquery("found")
+        return (
+            select(found.c.id, found.c.name, found.c.fuzzy)
+            .order_by(found.c.fuzzy, found.c.distance, pattern_order(found.c.name))
+            .limit(limit)
+        )
@@ -0,0 +1,47 @@
+from collections.abc import Callable, Sequence
+from typing import Any, TypeVar
+from fastapi import Query, status
+from pydantic import BaseModel
+from src.api.common.schemas import BatchSchema
+from src.core.enums import ErrorKind
+from src.core.exceptions import ErrorException
+
+S = TypeVar("S", bound=BaseModel)
+
+MAX_BATCH_IDS = 500
+
+
+def batch_ids(ids: str | None = Query(None, examples=["1,2,3"])) -> list[int] | None:
+    """
+    ``?ids=1,2,3`` dependency: the requested ids, de-duplicated in request
+    order, or ``None`` when the parameter is absent.
+    """
+    if ids is None:
+        return None
+    try:
+        parsed = [int(value) for value in ids.split(",") if value.strip()]
+    except ValueError:
+        parsed = []
+    parsed = list(dict.fromkeys(parsed))
+    if not parsed or len(parsed) > MAX_BATCH_IDS:
+        raise ErrorException(
+            code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            message=f"ids must be 1 to {MAX_BATCH_IDS} comma-separated integers",
+            kind=ErrorKind.VALIDATION,
+            source="batch.batch_ids",
+        )
+    return parsed
+
+
+def build_batch(
+    ids: list[int], rows: Sequence, make_item: Callable[[Any], S]
+) -> BatchSchema[S]:
+    """
+    Order the rows of a single ``IN`` query by ``ids`` and list the ids that
+    matched nothing.
+    """
+    by_id = {row.id: row for row in rows}
+    return BatchSchema.model_construct(
+        items=[make_item(by_id[id_]) for id_ in ids if id_ in by_id],
+        missing_ids=[id_ for id_ in ids if id_ not in by_id],
+    )
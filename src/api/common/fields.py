@@ -0,0 +1,118 @@
+from collections.abc import Callable, Mapping
+from typing import Any, TypeVar
+from fastapi import Query, status
+from pydantic import BaseModel
+from src.core.enums import ErrorKind
+from src.core.exceptions import ErrorException
+
+S = TypeVar("S", bound=BaseModel)
+
+
+class SparseFields:
+    """
+    ``?fields=a,b`` dependency resolving to the requested response fields of
+    ``schema``, or ``None`` when the client wants the full representation.
+    """
+
+    def __init__(self, schema: type[BaseModel]):
+        self.schema = schema
+
+    def __call__(
+        self,
+        fields: str | None = Query(None, examples=["id,name,cooking_time"]),
+    ) -> set[str] | None:
+        if fields is None:
+            return None
+        selected = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = selected - self.schema.model_fields.keys()
+        if not selected or unknown:
+            raise ErrorException(
+                code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                message=f"Unknown fields: {', '.join(sorted(unknown)) or fields}",
+                kind=ErrorKind.VALIDATION,
+                source="SparseFields",
+            )
+        return selected
+
+
+class Includes:
+    """
+    ``?include=a,b.c`` dependency resolving to the requested relationship
+    paths (parents implied), or ``default`` when the parameter is absent.
+    """
+
+    def __init__(
+        self,
+        schema: type[BaseModel],
+        allowed: set[str],
+        default: frozenset[str] = frozenset(),
+    ):
+        self.schema = schema
+        self.allowed = allowed
+        self.default = default
+
+    def __call__(
+        self,
+        include: str | None = Query(None, examples=["user,ingredients.categories"]),
+    ) -> frozenset[str]:
+        if include is None:
+            return self.default
+        paths = {path.strip() for path in include.split(",") if path.strip()}
+        unknown = paths - self.allowed
+        if unknown:
+            raise ErrorException(
+                code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                message=f"Unknown include paths: {', '.join(sorted(unknown))}",
+                kind=ErrorKind.VALIDATION,
+                source="Includes",
+            )
+        parents = {
+            path.rsplit(".", depth)[0]
+            for path in paths
+            for depth in range(1, path.count(".") + 1)
+        }
+        return frozenset(paths | parents)
+
+    def narrow(
+        self, fields: set[str] | None, include: frozenset[str]
+    ) -> set[str] | None:
+        """
+        Drop the relationships embedded by default that were not included.
+        """
+        dropped = self.default - include
+        if not dropped:
+            return fields
+        return (fields or set(self.schema.model_fields)) - dropped
+
+
+def pick(mapping: Mapping[str, Any], fields: set[str] | None) -> list[Any]:
+    """
+    Values of ``mapping`` whose key is one of ``fields`` (all when ``None``).
+    """
+    return [value for key, value in mapping.items() if fields is None or key in fields]
+
+
+def make_item(
+    schema: type[S],
+    fields: set[str] | None,
+    attributes: Mapping[str, str] | None = None,
+) -> Callable[[Any], S]:
+    """
+    Item builder for ORM rows: full validation, or a partial schema holding
+    only ``fields`` (read through ``attributes`` where the ORM name differs).
+    """
+    if fields is None:
+        return schema.model_validate
+    attributes = attributes or {}
+    return lambda row: schema.from_values(
+        {name: getattr(row, attributes.get(name, name)) for name in fields}
+    )
+
+
+def items_include(fields: set[str] | None) -> dict | None:
+    """
+    ``include`` for a page or batch envelope restricting each item to ``fields``.
+    """
+    if fields is None:
+        return None
+    return {"items": {"__all__": fields}, "next_cursor": True, "missing_ids": True}
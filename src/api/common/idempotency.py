@@ -0,0 +1,216 @@
+import hashlib
+from collections.abc import Awaitable, Callable
+from datetime import timedelta
+from functools import partial
+from fastapi import Depends, Header, HTTPException, Request, Response, status
+from pydantic import BaseModel
+from sqlalchemy import Row, Select, func, select, true, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.api.auth.services import get_subject_for_token_type
+from src.core.config import config
+from src.core.dependencies import get_db
+from src.core.enums import ErrorKind
+from src.core.exceptions import ErrorException
+from src.db.batching import Write, write_wrapper
+from src.db.models.idempotency_keys import IdempotencyKey
+
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+class Idempotency:
+    """
+    ``Idempotency-Key`` handling for a create route.
+
+    The route's write (see ``run_write``) is wrapped so that the key is
+    claimed and the response stored in the write's own transaction, batched
+    or not: the three commit together or not at all, and a concurrent
+    duplicate waits on the key's row lock instead of running the write a
+    second time. A retry of a finished request is served from the stored
+    response in one statement, before the route does any work of its own
+    (such as hashing a password).
+    """
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        request: Request,
+        key: str | None,
+        scope: str,
+        ttl: timedelta,
+    ):
+        self.db = db
+        self.request = request
+        self.key = key
+        self.scope = scope
+        self.ttl = ttl
+
+    @property
+    def source(self) -> str:
+        return "Idempotency.run"
+
+    async def fingerprint(self) -> str:
+        digest = hashlib.sha256()
+        for part in (self.request.method, self.request.url.path):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        digest.update(await self.request.body())
+        return digest.hexdigest()
+
+    async def run(self, create: Callable[[], Awaitable[BaseModel | Response]]):
+        if self.key is None:
+            return await create()
+        fingerprint = await self.fingerprint()
+        stored = (await self.db.execute(self.stored())).first()
+        if stored is not None:
+            return self.replay(stored, fingerprint)
+        token = write_wrapper.set(partial(self.guard, fingerprint))
+        try:
+            return self.to_response(await create())
+        except Exception:
+            # Releases a claim made in the request's transaction, so a retry
+            # runs the request again.
+            await self.db.rollback()
+            raise
+        finally:
+            write_wrapper.reset(token)
+
+    def guard(self, fingerprint: str, write: Write) -> Write:
+        async def guarded(db: AsyncSession) -> Response:
+            stored = await self.claim(db, fingerprint)
+            if stored is not None:
+                return self.replay(stored, fingerprint)
+            response = self.to_response(await write(db))
+            await db.execute(
+                update(IdempotencyKey)
+                .where(
+                    IdempotencyKey.scope == self.scope, IdempotencyKey.key == self.key
+                )
+                .values(status_code=response.status_code, body=response.body.decode())
+            )
+            return response
+
+        return guarded
+
+    def stored(self) -> Select:
+        keys = IdempotencyKey.__table__
+        return select(keys.c.fingerprint, keys.c.status_code, keys.c.body).where(
+            keys.c.scope == self.scope,
+            keys.c.key == self.key,
+            keys.c.expires_at > func.now(),
+        )
+
+    async def claim(self, db: AsyncSession, fingerprint: str) -> Row | None:
+        """
+        Claim the key in one statement; returns the stored entry instead when
+        the key is already taken. Expired entries are taken over, which is
+        ``ON CONFLICT DO UPDATE ... WHERE expires_at <= now()``.
+        """
+        keys = IdempotencyKey.__table__
+        identity = (keys.c.scope == self.scope, keys.c.key == self.key)
+        claim = insert(keys).values(
+            scope=self.scope,
+            key=self.key,
+            fingerprint=fingerprint,
+            expires_at=func.now() + self.ttl,
+        )
+        claimed = (
+            claim.on_conflict_do_update(
+                index_elements=[keys.c.scope, keys.c.key],
+                set_={
+                    "fingerprint": claim.excluded.fingerprint,
+                    "status_code": None,
+                    "body": None,
+                    "created_at": func.now(),
+                    "expires_at": claim.excluded.expires_at,
+                },
+                where=keys.c.expires_at <= func.now(),
+            )
+            .returning(keys.c.key)
+            .cte("claimed")
+        )
+        # Read from the snapshot taken before the insert: a live entry shows
+        # up here exactly when the insert above did nothing.
+        stored = self.stored().subquery("stored")
+        query = select(
+            claimed.c.key.label("claimed"),
+            stored.c.fingerprint,
+            stored.c.status_code,
+            stored.c.body,
+        ).select_from(claimed.join(stored, true(), full=True))
+        row = (await db.execute(query)).first()
+        if row is None:
+            # Neither: a concurrent request held the key and finished while
+            # the insert waited on it, after this statement's snapshot.
+            # Committed, it shows up now; rolled back, the key is free again.
+            latest = select(keys.c.fingerprint, keys.c.status_code, keys.c.body)
+            row = (await db.execute(latest.where(*identity))).first()
+            return row or await self.claim(db, fingerprint)
+        return None if row.claimed else row
+
+    def replay(self, stored: Row, fingerprint: str) -> Response:
+        if stored.fingerprint != fingerprint:
+            raise ErrorException(
+                code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                message="Idempotency-Key was already used for a different request",
+                kind=ErrorKind.VALIDATION,
+                source=self.source,
+            )
+        if stored.body is None:
+            raise ErrorException(
+                code=status.HTTP_409_CONFLICT,
+                message="A request with this Idempotency-Key is still in progress",
+                kind=ErrorKind.CONFLICT,
+                source=self.source,
+            )
+        return Response(
+            content=stored.body,
+            status_code=stored.status_code,
+            media_type="application/json",
+            headers={REPLAYED_HEADER: "true"},
+        )
+
+    def to_response(self, result: BaseModel | Response) -> Response:
+        """
+        Serialize a route result once, so the first response and its replays
+        are byte-identical.
+        """
+        if isinstance(result, Response):
+            return result
+        route = self.request.scope.get("route")
+        return Response(
+            content=result.model_dump_json(by_alias=True),
+            status_code=getattr(route, "status_code", None) or status.HTTP_200_OK,
+            media_type="application/json",
+        )
+
+
+def idempotency_scope(request: Request, authorization: str | None) -> str:
+    """
+    Keys are scoped per user: the username of a valid bearer token, or for
+    anonymous requests the client address, so unrelated clients neither
+    collide on a key nor replay each other's responses.
+    """
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            return f"user:{get_subject_for_token_type(token, 'access')}"
+        except HTTPException:
+            pass
+    host = request.client.host if request.client else ""
+    return f"anonymous:{host}"
+
+
+def get_idempotency(
+    request: Request,
+    idempotency_key: str | None = Header(None, min_length=1, max_length=255),
+    authorization: str | None = Header(None, include_in_schema=False),
+    db: AsyncSession = Depends(get_db),
+) -> Idempotency:
+    return Idempotency(
+        db,
+        request,
+        idempotency_key,
+        idempotency_scope(request, authorization),
+        timedelta(seconds=config.IDEMPOTENCY_KEY_TTL_SECONDS),
+    )
@@ -0,0 +1,100 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from collections.abc import Callable, Sequence
+from typing import Any, TypeVar
+from fastapi import status
+from pydantic import BaseModel
+from sqlalchemy import Select, tuple_
+from src.api.common.schemas import PageParams, PageSchema
+from src.core.enums import ErrorKind, PageOrder
+from src.core.exceptions import ErrorException
+
+S = TypeVar("S", bound=BaseModel)
+
+
+def encode_payload(payload: dict[str, Any]) -> str:
+    """
+    Encode a JSON sort key into an opaque cursor.
+    """
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_payload(cursor: str) -> Any:
+    """
+    Inverse of ``encode_payload``; raises ``ValueError`` or ``binascii.Error``
+    on malformed input.
+    """
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded))
+
+
+def invalid_cursor(source: str) -> ErrorException:
+    return ErrorException(
+        code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        message="Invalid pagination cursor",
+        kind=ErrorKind.VALIDATION,
+        source=source,
+    )
+
+
+def encode_cursor(row: Any, order_by: str) -> str:
+    """
+    Encode the sort key of the last row of a page into an opaque cursor.
+    """
+    payload: dict[str, Any] = {"id": row.id}
+    if order_by != PageOrder.ID:
+        value = getattr(row, order_by)
+        payload[order_by] = value.isoformat() if isinstance(value, datetime) else value
+    return encode_payload(payload)
+
+
+def decode_cursor(cursor: str, order_by: str) -> tuple:
+    """
+    Decode a cursor produced by ``encode_cursor`` into its sort key values.
+    """
+    try:
+        payload = decode_payload(cursor)
+        if order_by == PageOrder.ID:
+            return (int(payload["id"]),)
+        if order_by == PageOrder.CREATED_AT:
+            value = datetime.fromisoformat(payload[order_by])
+        else:
+            # The other sort keys (e.g. ``RecipeOrder``'s) are integer columns.
+            value = int(payload[order_by])
+        return (value, int(payload["id"]))
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise invalid_cursor("pagination.decode_cursor")
+
+
+def paginate(statement: Select, model: Any, page: PageParams) -> Select:
+    """
+    Apply keyset filtering, ordering and limit to a select.
+
+    One extra row is fetched so ``build_page`` can tell whether a next page
+    exists without issuing a count query.
+    """
+    if page.order_by == PageOrder.ID:
+        order_columns = (model.id,)
+    else:
+        order_columns = (getattr(model, page.order_by), model.id)
+    if page.cursor is not None:
+        values = decode_cursor(page.cursor, page.order_by)
+        statement = statement.where(tuple_(*order_columns) > tuple_(*values))
+    return statement.order_by(*order_columns).limit(page.limit + 1)
+
+
+def build_page(
+    rows: Sequence, page: PageParams, make_item: Callable[[Any], S]
+) -> PageSchema[S]:
+    """
+    Turn the ``limit + 1`` rows fetched by ``paginate`` into a page envelope.
+    """
+    has_more = len(rows) > page.limit
+    rows = rows[: page.limit]
+    return PageSchema.model_construct(
+        items=[make_item(row) for row in rows],
+        next_cursor=encode_cursor(rows[-1], page.order_by) if has_more else None,
+    )
@@ -0,0 +1,18 @@
+from fastapi import Response, status
+from pydantic import BaseModel
+
+
+def json_response(
+    content: BaseModel,
+    status_code: int = status.HTTP_200_OK,
+    include: set[str] | dict | None = None,
+) -> Response:
+    """
+    Serialize an already-built schema directly, skipping the second
+    validation pass FastAPI runs against ``response_model``.
+    """
+    return Response(
+        content=content.model_dump_json(by_alias=True, include=include),
+        status_code=status_code,
+        media_type="application/json",
+    )
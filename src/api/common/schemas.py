@@ -1,5 +1,11 @@
-from pydantic import Field
+from typing import Generic, TypeVar
+from pydantic import BaseModel, Field, field_serializer, field_validator
 from src.api.schemas import BaseSchema
+from src.core.enums import PageOrder
+
+T = TypeVar("T")
+
+MAX_LINK_IDS = 10_000
 
 
 class IngredientRelationshipSchema(BaseSchema):
@@ -10,3 +16,51 @@ class IngredientRelationshipSchema(BaseSchema):
 class CategoryRelationshipSchema(BaseSchema):
     id: int = Field(..., examples=[1])
     name: str = Field(max_length=50, examples=["Veggies"])
+
+
+class UserRelationshipSchema(BaseSchema):
+    id: int = Field(..., examples=[1])
+    username: str = Field(..., examples=["johndoe"])
+    full_name: str | None = Field(..., examples=["John Doe"])
+
+
+class LinkIdsSchema(BaseSchema):
+    ids: list[int] = Field(
+        ..., min_length=1, max_length=MAX_LINK_IDS, examples=[[1, 2]]
+    )
+
+    @field_validator("ids")
+    @classmethod
+    def dedupe_ids(cls, value: list[int]) -> list[int]:
+        return list(dict.fromkeys(value))
+
+
+class PageParams(BaseModel):
+    limit: int = Field(50, ge=1, le=500, examples=[50])
+    cursor: str | None = Field(None, examples=["eyJpZCI6IDUwfQ"])
+    order_by: PageOrder = Field(PageOrder.ID, examples=["id", "created_at"])
+
+
+class PageSchema(BaseSchema, Generic[T]):
+    items: list[T] = Field(default_factory=list)
+    next_cursor: str | None = Field(None, examples=["eyJpZCI6IDUwfQ"])
+
+
+class BatchSchema(BaseSchema, Generic[T]):
+    items: list[T] = Field(default_factory=list)
+    missing_ids: list[int] = Field(default_factory=list, examples=[[3]])
+
+
+class AutocompleteItemSchema(BaseSchema):
+    id: int = Field(..., examples=[1])
+    name: str = Field(..., examples=["Broccoli"])
+    # True for a typo-tolerant match rather than a prefix match.
+    fuzzy: bool = Field(False, examples=[False])
+
+    @field_serializer("name")
+    def serialize_name(self, value: str) -> str:
+        return value.capitalize()
+
+
+class AutocompleteSchema(BaseSchema):
+    items: list[AutocompleteItemSchema] = Field(default_factory=list)
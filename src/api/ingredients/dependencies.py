@@ -1,7 +1,11 @@
 from fastapi import Depends
+from src.core.config import config
 from src.core.dependencies import get_db
+from src.db.postgresql import write_batcher
 from src.api.ingredients.services import IngredientRepository
 
 
 def get_ingredient_repository(db=Depends(get_db)) -> IngredientRepository:
-    return IngredientRepository(db)
+    return IngredientRepository(
+        db, fast_reads=config.FAST_READ_PATH, batcher=write_batcher
+    )
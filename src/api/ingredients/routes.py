@@ -1,27 +1,81 @@
-from fastapi import APIRouter, Depends
+from functools import partial
+from typing import Annotated
+from fastapi import APIRouter, Depends, Query, Response
 from src.api.ingredients.schemas import (
     CreateIngredientSchema,
     GetIngredientSchema,
+    ResolveIngredientsSchema,
+    ResolvedIngredientsSchema,
     UpdateIngredientSchema,
 )
 from src.api.ingredients.services import IngredientRepository
 from src.api.ingredients.dependencies import get_ingredient_repository
+from src.api.common.idempotency import Idempotency, get_idempotency
+from src.api.common.fields import Includes, SparseFields, items_include
+from src.api.common.responses import json_response
+from src.api.common.batch import batch_ids
+from src.api.common.autocomplete import (
+    AUTOCOMPLETE_DESCRIPTION,
+    MAX_AUTOCOMPLETE_LIMIT,
+)
+from src.api.common.schemas import (
+    AutocompleteSchema,
+    BatchSchema,
+    LinkIdsSchema,
+    PageParams,
+    PageSchema,
+)
 from src.core.schemas import ErrorResponse
 
 router = APIRouter()
 
+ingredient_fields = SparseFields(GetIngredientSchema)
+ingredient_includes = Includes(
+    GetIngredientSchema, allowed={"categories"}, default=frozenset({"categories"})
+)
+
 
 @router.get(
     "/",
-    response_model=list[GetIngredientSchema],
+    response_model=PageSchema[GetIngredientSchema] | BatchSchema[GetIngredientSchema],
     responses={
+        422: {
+            "model": ErrorResponse,
+            "description": "Invalid pagination cursor, ids, fields or include",
+        },
         500: {"model": ErrorResponse, "description": "Internal server error"},
     },
 )
 async def get_ingredients(
+    page: Annotated[PageParams, Query()],
+    ids: list[int] | None = Depends(batch_ids),
+    fields: set[str] | None = Depends(ingredient_fields),
+    include: frozenset[str] = Depends(ingredient_includes),
+    ingredient_repository: IngredientRepository = Depends(get_ingredient_repository),
+) -> Response:
+    fields = ingredient_includes.narrow(fields, include)
+    if ids is not None:
+        ingredients = await ingredient_repository.get_ingredients_by_ids(ids, fields)
+    else:
+        ingredients = await ingredient_repository.get_all_ingredients(page, fields)
+    return json_response(ingredients, include=items_include(fields))
+
+
+@router.get(
+    "/autocomplete",
+    response_model=AutocompleteSchema,
+    responses={
+        200: {"description": AUTOCOMPLETE_DESCRIPTION},
+        422: {"model": ErrorResponse, "description": "Invalid prefix or limit"},
+        500: {"model": ErrorResponse, "description": "Internal server error"},
+    },
+)
+async def autocomplete_ingredients(
+    prefix: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=MAX_AUTOCOMPLETE_LIMIT),
     ingredient_repository: IngredientRepository = Depends(get_ingredient_repository),
-) -> list[GetIngredientSchema]:
-    return ingredient_repository.get_all_ingredients()
+) -> Response:
+    return json_response(await ingredient_repository.autocomplete(prefix, limit))
 
 
 @router.get(
@@ -29,15 +83,19 @@ async def get_ingredients(
     response_model=GetIngredientSchema,
     responses={
         404: {"model": ErrorResponse, "description": "Ingredient not found"},
+        422: {"model": ErrorResponse, "description": "Unknown fields or include"},
         500: {"model": ErrorResponse, "description": "Internal server error"},
     },
 )
 async def get_ingredient(
     ingredient_id: int,
+    fields: set[str] | None = Depends(ingredient_fields),
+    include: frozenset[str] = Depends(ingredient_includes),
     ingredient_repository: IngredientRepository = Depends(get_ingredient_repository),
-):
-    ingredient = ingredient_repository.get_ingredient_by_id(ingredient_id)
-    return ingredient
+) -> Response:
+    fields = ingredient_includes.narrow(fields, include)
+    ingredient = await ingredient_repository.get_ingredient_by_id(ingredient_id, fields)
+    return json_response(ingredient, include=fields)
 
 
 @router.post(
@@ -53,8 +111,26 @@ async def get_ingredient(
 async def create_ingredient(
     ingredient: CreateIngredientSchema,
     ingredient_repository: IngredientRepository = Depends(get_ingredient_repository),
-) -> GetIngredientSchema:
-    return ingredient_repository.create_ingredient(ingredient)
+    idempotency: Idempotency = Depends(get_idempotency),
+) -> Response:
+    return await idempotency.run(
+        partial(ingredient_repository.create_ingredient, ingredient)
+    )
+
+
+@router.post(
+    "/resolve",
+    response_model=ResolvedIngredientsSchema,
+    responses={
+        422: {"model": ErrorResponse, "description": "Invalid names"},
+        500: {"model": ErrorResponse, "description": "Internal server error"},
+    },
+)
+async def resolve_ingredients(
+    names: ResolveIngredientsSchema,
+    ingredient_repository: IngredientRepository = Depends(get_ingredient_repository),
+) -> Response:
+    return json_response(await ingredient_repository.resolve_ingredients(names))
 
 
 @router.put(
@@ -71,4 +147,41 @@ async def update_ingredient(
     ingredient: UpdateIngredientSchema,
     ingredient_repository: IngredientRepository = Depends(get_ingredient_repository),
 ) -> GetIngredientSchema:
-    return ingredient_repository.update_ingredient(ingredient_id, ingredient)
+    return await ingredient_repository.update_ingredient(ingredient_id, ingredient)
+
+
+@router.post(
+    "/{ingredient_id}/categories",
+    response_model=GetIngredientSchema,
+    responses={
+        404: {
+            "model": ErrorResponse,
+            "description": "Ingredient or category not found",
+        },
+        422: {"model": ErrorResponse, "description": "Invalid ids"},
+        500: {"model": ErrorResponse, "description": "Internal server error"},
+    },
+)
+async def add_ingredient_categories(
+    ingredient_id: int,
+    categories: LinkIdsSchema,
+    ingredient_repository: IngredientRepository = Depends(get_ingredient_repository),
+) -> GetIngredientSchema:
+    return await ingredient_repository.add_categories(ingredient_id, categories.ids)
+
+
+@router.delete(
+    "/{ingredient_id}/categories",
+    response_model=GetIngredientSchema,
+    responses={
+        404: {"model": ErrorResponse, "description": "Ingredient not found"},
+        422: {"model": ErrorResponse, "description": "Invalid ids"},
+        500: {"model": ErrorResponse, "description": "Internal server error"},
+    },
+)
+async def remove_ingredient_categories(
+    ingredient_id: int,
+    categories: LinkIdsSchema,
+    ingredient_repository: IngredientRepository = Depends(get_ingredient_repository),
+) -> GetIngredientSchema:
+    return await ingredient_repository.remove_categories(ingredient_id, categories.ids)
@@ -1,7 +1,13 @@
+from collections.abc import Mapping
 from datetime import datetime
-from pydantic import Field, field_validator, field_serializer
+from typing import Annotated, Any, Self
+from pydantic import Field, StringConstraints, field_validator, field_serializer
+from sqlalchemy import Row
 from src.api.schemas import BaseSchema
 from src.api.common.schemas import CategoryRelationshipSchema
+from src.db.base import normalize_name
+
+MAX_RESOLVE_NAMES = 1000
 
 
 class IngredientSchema(BaseSchema):
@@ -27,6 +33,32 @@ class GetIngredientSchema(IngredientSchema):
     created_at: datetime = Field(..., examples=["2023-10-01T12:00:00Z"])
     updated_at: datetime | None = Field(..., examples=["2023-10-01T12:00:00Z"])
 
+    @classmethod
+    def from_values(cls, values: Mapping[str, Any]) -> Self:
+        """
+        Build a possibly partial schema (sparse fieldsets) from loaded values.
+        """
+        values = dict(values)
+        if "categories" in values:
+            values["categories"] = [
+                CategoryRelationshipSchema.model_validate(item)
+                for item in values["categories"]
+            ]
+        return cls.model_construct(**values)
+
+    @classmethod
+    def from_row(cls, row: Row) -> Self:
+        """
+        Build the schema from a trusted Core row without running validators.
+        """
+        values = dict(row._mapping)
+        if "categories" in values:
+            values["categories"] = [
+                CategoryRelationshipSchema.model_construct(**item)
+                for item in values["categories"]
+            ]
+        return cls.model_construct(**values)
+
 
 class CreateIngredientSchema(IngredientSchema):
     pass
@@ -39,3 +71,32 @@ class UpdateIngredientSchema(IngredientSchema):
         default_factory=list,
         examples=[[{"id": 1, "name": "Veggies"}]],
     )
+
+
+class ResolveIngredientsSchema(BaseSchema):
+    names: list[Annotated[str, StringConstraints(min_length=1, max_length=50)]] = Field(
+        ..., min_length=1, max_length=MAX_RESOLVE_NAMES, examples=[["Leek"]]
+    )
+    is_vegan: bool = Field(
+        False, description="is_vegan of the ingredients that get created"
+    )
+
+    @field_validator("names")
+    @classmethod
+    def normalize_names(cls, value: list[str]) -> list[str]:
+        return list(dict.fromkeys(normalize_name(name) for name in value))
+
+
+class ResolvedIngredientSchema(BaseSchema):
+    id: int = Field(..., examples=[1])
+    name: str = Field(..., examples=["Leek"])
+    created: bool = Field(..., examples=[False])
+
+    @field_serializer("name")
+    def serialize_name(self, value: str) -> str:
+        return value.capitalize()
+
+
+class ResolvedIngredientsSchema(BaseSchema):
+    created: int = Field(..., examples=[1])
+    items: list[ResolvedIngredientSchema] = Field(default_factory=list)
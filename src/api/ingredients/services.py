@@ -1,60 +1,179 @@
-from fastapi import HTTPException, status
+from functools import partial
+from fastapi import HTTPException, Response, status
+from sqlalchemy import (
+    ARRAY,
+    Integer,
+    Select,
+    String,
+    any_,
+    exists,
+    func,
+    literal,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only, selectinload
 from src.db.models.ingredients import Ingredient
 from src.db.models.categories import Category
 from src.api.ingredients.schemas import (
     GetIngredientSchema,
     CreateIngredientSchema,
+    ResolveIngredientsSchema,
+    ResolvedIngredientSchema,
+    ResolvedIngredientsSchema,
     UpdateIngredientSchema,
 )
-from src.api.common.schemas import CategoryRelationshipSchema
+from src.api.common.fields import make_item, pick
+from src.api.common.batch import build_batch
+from src.api.common.pagination import build_page, paginate
+from src.api.common.autocomplete import Autocomplete
+from src.api.common.schemas import (
+    AutocompleteSchema,
+    BatchSchema,
+    CategoryRelationshipSchema,
+    PageParams,
+    PageSchema,
+)
 from src.core.exceptions import ErrorException
-from src.core.enums import ErrorKind
+from src.core.enums import ErrorKind, EventType, LoadProfile
+from src.db.batching import WriteBatcher, run_write
+from src.db.functions import json_list
+from src.db.links import add_links, links, remove_links
+from src.db.outbox import event, record_events
+from src.db.vegan import refresh_recipes_using
+from src.db.models.ingredients import IngredientCategory
+
+ingredient_names = Autocomplete(Ingredient)
 
 
 class IngredientRepository:
-    def __init__(self, db: Session):
+    load_profiles = {
+        LoadProfile.LIST: (selectinload(Ingredient.categories),),
+        LoadProfile.DETAIL: (selectinload(Ingredient.categories),),
+    }
+    # Sparse fieldsets (``?fields=``): response field -> column / loader.
+    field_columns = {
+        "id": Ingredient.id,
+        "name": Ingredient._name,
+        "is_vegan": Ingredient.is_vegan,
+        "created_at": Ingredient.created_at,
+        "updated_at": Ingredient.updated_at,
+    }
+    field_loaders = {"categories": selectinload(Ingredient.categories)}
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        fast_reads: bool = False,
+        batcher: WriteBatcher | None = None,
+    ):
         self.db = db
+        self.fast_reads = fast_reads
+        self.batcher = batcher
 
     @property
     def repo_name(self) -> str:
         return "IngredientRepository"
 
-    def get_all_ingredients(self) -> list[GetIngredientSchema]:
-        ingredients = self.db.query(Ingredient).all()
-        return [GetIngredientSchema.model_validate(ing) for ing in ingredients]
+    def query(self, profile: LoadProfile, fields: set[str] | None = None) -> Select:
+        if fields is None:
+            return select(Ingredient).options(*self.load_profiles[profile])
+        return select(Ingredient).options(
+            load_only(Ingredient.created_at, *pick(self.field_columns, fields)),
+            *pick(self.field_loaders, fields),
+        )
+
+    def item_factory(self, fields: set[str] | None = None):
+        return make_item(GetIngredientSchema, fields)
 
-    def get_ingredient_by_id(self, ingredient_id: int) -> GetIngredientSchema | None:
-        ingredient = (
-            self.db.query(Ingredient).filter(Ingredient.id == ingredient_id).first()
+    def rows_query(self, fields: set[str] | None = None) -> Select:
+        """
+        Core select of exactly the GetIngredientSchema columns, with
+        categories aggregated in SQL, for the ORM-free read path.
+        """
+        categories = (
+            select(json_list(id=Category.id, name=Category._name))
+            .join(IngredientCategory, IngredientCategory.category_id == Category.id)
+            .where(IngredientCategory.ingredient_id == Ingredient.id)
+            .scalar_subquery()
         )
-        if ingredient:
-            return GetIngredientSchema.model_validate(ingredient)
-        else:
-            raise ErrorException(
-                code=status.HTTP_404_NOT_FOUND,
-                message="Ingredient not found",
-                kind=ErrorKind.NOT_FOUND,
-                source=f"{self.repo_name}.get_ingredient_by_id",
+        columns = {**self.field_columns, "categories": categories}
+        if fields is not None:
+            fields = fields | {"id", "created_at"}
+        return select(
+            *(
+                column.label(name)
+                for name, column in columns.items()
+                if fields is None or name in fields
             )
+        )
+
+    async def get_ingredient(self, ingredient_id: int) -> Ingredient | None:
+        query = self.query(LoadProfile.DETAIL).where(Ingredient.id == ingredient_id)
+        return await self.db.scalar(query.execution_options(populate_existing=True))
+
+    async def get_all_ingredients(
+        self, page: PageParams, fields: set[str] | None = None
+    ) -> PageSchema[GetIngredientSchema]:
+        if self.fast_reads:
+            query = paginate(self.rows_query(fields), Ingredient, page)
+            rows = (await self.db.execute(query)).all()
+            return build_page(rows, page, GetIngredientSchema.from_row)
+        query = paginate(self.query(LoadProfile.LIST, fields), Ingredient, page)
+        ingredients = (await self.db.scalars(query)).all()
+        return build_page(ingredients, page, self.item_factory(fields))
 
-    def add_ingredient(self, ingredient: Ingredient) -> GetIngredientSchema:
-        self.db.add(ingredient)
-        self.db.commit()
-        self.db.refresh(ingredient)
-        return GetIngredientSchema.model_validate(ingredient)
+    async def autocomplete(self, prefix: str, limit: int) -> AutocompleteSchema:
+        return await ingredient_names.complete(self.db, prefix, limit)
 
-    def get_categories(
+    async def get_ingredients_by_ids(
+        self, ingredient_ids: list[int], fields: set[str] | None = None
+    ) -> BatchSchema[GetIngredientSchema]:
+        if self.fast_reads:
+            query = self.rows_query(fields).where(Ingredient.id.in_(ingredient_ids))
+            rows = (await self.db.execute(query)).all()
+            return build_batch(ingredient_ids, rows, GetIngredientSchema.from_row)
+        query = self.query(LoadProfile.LIST, fields).where(
+            Ingredient.id.in_(ingredient_ids)
+        )
+        ingredients = (await self.db.scalars(query)).all()
+        return build_batch(ingredient_ids, ingredients, self.item_factory(fields))
+
+    async def get_ingredient_by_id(
+        self, ingredient_id: int, fields: set[str] | None = None
+    ) -> GetIngredientSchema | None:
+        if self.fast_reads:
+            query = self.rows_query(fields).where(Ingredient.id == ingredient_id)
+            row = (await self.db.execute(query)).first()
+            if row:
+                return GetIngredientSchema.from_row(row)
+        else:
+            query = self.query(LoadProfile.DETAIL, fields).where(
+                Ingredient.id == ingredient_id
+            )
+            ingredient = await self.db.scalar(query)
+            if ingredient:
+                return self.item_factory(fields)(ingredient)
+        raise ErrorException(
+            code=status.HTTP_404_NOT_FOUND,
+            message="Ingredient not found",
+            kind=ErrorKind.NOT_FOUND,
+            source=f"{self.repo_name}.get_ingredient_by_id",
+        )
+
+    async def get_categories(
         self, categories: list[CategoryRelationshipSchema]
     ) -> list[Category]:
         if not categories:
             return []
         categories_ids = [cat.id for cat in categories]
-        categories = (
-            self.db.query(Category).filter(Category.id.in_(categories_ids)).all()
+        categories = await self.db.scalars(
+            select(Category).where(Category.id.in_(categories_ids))
         )
-        return categories
+        return list(categories)
         # exist_categories = {cat.id for cat in categories}
         # missing_ids = set(categories) - exist_categories
         # if missing_ids:
@@ -65,41 +184,230 @@ class IngredientRepository:
         #         source=f"{self.repo_name}.get_categories",
         #     )
 
-    def create_ingredient(
+    async def create_ingredient(
         self, ingredient_data: CreateIngredientSchema
+    ) -> GetIngredientSchema | Response:
+        """
+        Insert the ingredient and its category links in one statement.
+
+        The insert uses ``ON CONFLICT DO NOTHING RETURNING``, so a taken name
+        yields no row instead of an ``IntegrityError``; the links are inserted
+        from that row in a data-modifying CTE (unknown category ids are
+        skipped) and the linked categories get their ``updated_at`` bumped.
+        """
+        ingredient = await run_write(
+            self.db, partial(self.insert_ingredient, ingredient_data), self.batcher
+        )
+        ingredient_names.invalidate()
+        return ingredient
+
+    async def insert_ingredient(
+        self, ingredient_data: CreateIngredientSchema, db: AsyncSession
     ) -> GetIngredientSchema:
-        try:
-            new_ingredient = Ingredient(
-                name=ingredient_data.name,
-                is_vegan=ingredient_data.is_vegan,
-                categories=self.get_categories(ingredient_data.categories),
+        category_ids = {category.id for category in ingredient_data.categories}
+        new = (
+            insert(Ingredient.__table__)
+            .values(name=ingredient_data.name, is_vegan=ingredient_data.is_vegan)
+            .on_conflict_do_nothing(index_elements=["name"])
+            .returning(*(col.label(name) for name, col in self.field_columns.items()))
+            .cte("new_ingredient")
+        )
+        categories = (
+            select(json_list(id=Category.id, name=Category._name))
+            .where(Category.id.in_(category_ids))
+            .scalar_subquery()
+        )
+        query = select(new, categories.label("categories")).add_cte(
+            record_events(EventType.INGREDIENT_CREATED, new.c.id)
+        )
+        if category_ids:
+            linked = (
+                insert(IngredientCategory.__table__)
+                .from_select(
+                    ["ingredient_id", "category_id"],
+                    select(new.c.id, Category.id)
+                    .select_from(new)
+                    .join(Category, Category.id.in_(category_ids)),
+                )
+                .returning(IngredientCategory.category_id)
+                .cte("linked")
             )
-            return self.add_ingredient(new_ingredient)
-        except IntegrityError:
+            bumped = (
+                update(Category)
+                .where(Category.id.in_(select(linked.c.category_id)))
+                .values(updated_at=func.now())
+                .cte("bumped_categories")
+            )
+            query = query.add_cte(
+                linked,
+                bumped,
+                record_events(EventType.CATEGORY_UPDATED, linked.c.category_id),
+            )
+        row = (await db.execute(query)).one_or_none()
+        if not row:
             raise ErrorException(
                 code=status.HTTP_409_CONFLICT,
                 message="Ingredient name already exists",
                 kind=ErrorKind.CONFLICT,
                 source=f"{self.repo_name}.create_ingredient",
             )
+        return GetIngredientSchema.from_row(row)
 
-    def update_ingredient(
-        self, ingredient_id: int, ingredient_data: UpdateIngredientSchema
+    async def resolve_ingredients(
+        self, resolve_data: ResolveIngredientsSchema
+    ) -> ResolvedIngredientsSchema:
+        """
+        Ids for ``names`` (already normalised), creating the missing ones.
+
+        One ``INSERT ... SELECT unnest(names) ON CONFLICT DO NOTHING
+        RETURNING`` creates what is missing; one select then picks up the
+        names that already existed, including any created concurrently.
+        """
+        ingredients = Ingredient.__table__
+        names = literal(resolve_data.names, ARRAY(String))
+        new = (
+            insert(ingredients)
+            .from_select(
+                ["name", "is_vegan"],
+                select(func.unnest(names), literal(resolve_data.is_vegan)),
+            )
+            .on_conflict_do_nothing(index_elements=["name"])
+            .returning(ingredients.c.name, ingredients.c.id)
+            .cte("new_ingredients")
+        )
+        query = select(new.c.name, new.c.id).add_cte(
+            record_events(EventType.INGREDIENT_CREATED, new.c.id)
+        )
+        created = dict((await self.db.execute(query)).all())
+        existing = {}
+        if len(created) < len(resolve_data.names):
+            missing = [name for name in resolve_data.names if name not in created]
+            query = select(Ingredient._name, Ingredient.id).where(
+                Ingredient._name == any_(literal(missing, ARRAY(String)))
+            )
+            existing = dict((await self.db.execute(query)).all())
+        await self.db.commit()
+        if created:
+            ingredient_names.invalidate()
+        return ResolvedIngredientsSchema.model_construct(
+            created=len(created),
+            items=[
+                ResolvedIngredientSchema.model_construct(
+                    id=created.get(name) or existing[name],
+                    name=name,
+                    created=name in created,
+                )
+                for name in resolve_data.names
+            ],
+        )
+
+    async def check_links(
+        self, ingredient_id: int, category_ids: list[int], source: str
+    ) -> list[int]:
+        """
+        404 unless the ingredient exists; returns the requested category ids
+        that do not exist.
+        """
+        found, category_ids_found = (
+            await self.db.execute(
+                select(
+                    exists().where(Ingredient.id == ingredient_id),
+                    select(func.array_agg(Category.id))
+                    .where(Category.id == any_(literal(category_ids, ARRAY(Integer))))
+                    .scalar_subquery(),
+                )
+            )
+        ).one()
+        if not found:
+            raise ErrorException(
+                code=status.HTTP_404_NOT_FOUND,
+                message="Ingredient not found",
+                kind=ErrorKind.NOT_FOUND,
+                source=source,
+            )
+        existing = set(category_ids_found or ())
+        return [cat_id for cat_id in category_ids if cat_id not in existing]
+
+    async def add_categories(
+        self, ingredient_id: int, category_ids: list[int]
+    ) -> GetIngredientSchema:
+        """
+        Link the ingredient to ``category_ids`` with one set-based insert,
+        leaving existing links and the rest of the collection untouched.
+        """
+        source = f"{self.repo_name}.add_categories"
+        missing_ids = await self.check_links(ingredient_id, category_ids, source)
+        if missing_ids:
+            raise ErrorException(
+                code=status.HTTP_404_NOT_FOUND,
+                message=f"Categories not found: {missing_ids}",
+                kind=ErrorKind.NOT_FOUND,
+                source=source,
+            )
+        pairs = select(literal(ingredient_id, Integer), Category.id).where(
+            Category.id == any_(literal(category_ids, ARRAY(Integer)))
+        )
+        await self.db.execute(add_links(pairs))
+        await self.db.commit()
+        return GetIngredientSchema.model_validate(
+            await self.get_ingredient(ingredient_id)
+        )
+
+    async def remove_categories(
+        self, ingredient_id: int, category_ids: list[int]
     ) -> GetIngredientSchema:
-        ingredient = (
-            self.db.query(Ingredient).filter(Ingredient.id == ingredient_id).first()
+        """
+        Unlink ``category_ids`` with one set-based delete; ids that are not
+        linked are ignored.
+        """
+        source = f"{self.repo_name}.remove_categories"
+        await self.check_links(ingredient_id, category_ids, source)
+        await self.db.execute(
+            remove_links(
+                links.c.ingredient_id == ingredient_id,
+                links.c.category_id == any_(literal(category_ids, ARRAY(Integer))),
+            )
         )
+        await self.db.commit()
+        return GetIngredientSchema.model_validate(
+            await self.get_ingredient(ingredient_id)
+        )
+
+    async def update_ingredient(
+        self, ingredient_id: int, ingredient_data: UpdateIngredientSchema
+    ) -> GetIngredientSchema:
+        ingredient = await self.get_ingredient(ingredient_id)
         if not ingredient:
             raise HTTPException(status_code=404, detail="Ingredient not found")
         try:
             if ingredient_data.name is not None:
                 ingredient.name = ingredient_data.name
-            if ingredient_data.is_vegan is not None:
+            flipped = (
+                ingredient_data.is_vegan is not None
+                and ingredient_data.is_vegan != ingredient.is_vegan
+            )
+            if flipped:
                 ingredient.is_vegan = ingredient_data.is_vegan
             if ingredient_data.categories is not None:
-                ingredient.categories = self.get_categories(ingredient_data.categories)
-            self.db.commit()
-            self.db.refresh(ingredient)
+                old_ids = {category.id for category in ingredient.categories}
+                ingredient.categories = await self.get_categories(
+                    ingredient_data.categories
+                )
+                new_ids = {category.id for category in ingredient.categories}
+                self.db.add_all(
+                    event(EventType.CATEGORY_UPDATED, category_id)
+                    for category_id in old_ids ^ new_ids
+                )
+            self.db.add(event(EventType.INGREDIENT_UPDATED, ingredient.id))
+            if flipped:
+                # The flush takes the ingredient's row lock before the
+                # recipes using it are read (see ``src.db.vegan``).
+                await self.db.flush()
+                await self.db.execute(refresh_recipes_using([ingredient.id]))
+            await self.db.commit()
+            if ingredient_data.name is not None:
+                ingredient_names.invalidate()
+            ingredient = await self.get_ingredient(ingredient.id)
             return GetIngredientSchema.model_validate(ingredient)
         except IntegrityError:
             raise ErrorException(
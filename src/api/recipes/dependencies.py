@@ -1,7 +1,14 @@
 from fastapi import Depends
+from src.core.config import config
 from src.core.dependencies import get_db
+from src.db.postgresql import pantry_index, write_batcher
 from src.api.recipes.services import RecipeRepository
 
 
 def get_recipe_repository(db=Depends(get_db)) -> RecipeRepository:
-    return RecipeRepository(db)
+    return RecipeRepository(
+        db,
+        fast_reads=config.FAST_READ_PATH,
+        batcher=write_batcher,
+        pantry_index=pantry_index,
+    )
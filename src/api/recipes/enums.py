@@ -5,3 +5,13 @@ class DifficultyLevel(StrEnum):
     EASY = "EASY"
     MEDIUM = "MEDIUM"
     HARD = "HARD"
+
+
+class RecipeOrder(StrEnum):
+    """
+    ``PageOrder`` plus the recipe-only sort keys.
+    """
+
+    ID = "id"
+    CREATED_AT = "created_at"
+    COOKING_TIME = "cooking_time"
@@ -1,27 +1,122 @@
-from fastapi import APIRouter, Depends
+from datetime import datetime
+from functools import partial
+from typing import Annotated
+from fastapi import APIRouter, Body, Depends, Query, Response
+from fastapi.responses import StreamingResponse
 from src.api.recipes.schemas import (
+    BulkRecipesResultSchema,
     CreateRecipeSchema,
     GetRecipeSchema,
     DeleteRecipeSchema,
+    PantryMatchSchema,
+    PantrySearchSchema,
+    RecipeListParams,
+    RecipeSearchHitSchema,
+    SearchRecipesParams,
+    UpdateRecipeSchema,
 )
-from src.api.recipes.services import RecipeRepository
+from src.api.recipes.services import MAX_BULK_RECIPES, RecipeRepository
 from src.api.recipes.dependencies import get_recipe_repository
+from src.api.common.idempotency import Idempotency, get_idempotency
+from src.api.common.fields import Includes, SparseFields, items_include
+from src.api.common.responses import json_response
+from src.api.common.batch import batch_ids
+from src.api.common.autocomplete import (
+    AUTOCOMPLETE_DESCRIPTION,
+    MAX_AUTOCOMPLETE_LIMIT,
+)
+from src.api.common.schemas import (
+    AutocompleteSchema,
+    BatchSchema,
+    PageParams,
+    PageSchema,
+)
 from src.core.schemas import ErrorResponse
 
 router = APIRouter()
 
+recipe_fields = SparseFields(GetRecipeSchema)
+recipe_includes = Includes(
+    GetRecipeSchema, allowed={"user", "ingredients", "ingredients.categories"}
+)
+
 
 @router.get(
     "/",
-    response_model=list[GetRecipeSchema],
+    response_model=PageSchema[GetRecipeSchema] | BatchSchema[GetRecipeSchema],
     responses={
+        422: {
+            "model": ErrorResponse,
+            "description": "Invalid pagination cursor, ids, fields or include",
+        },
         500: {"model": ErrorResponse, "description": "Internal server error"},
     },
 )
 async def get_recipes(
+    page: Annotated[RecipeListParams, Query()],
+    ids: list[int] | None = Depends(batch_ids),
+    fields: set[str] | None = Depends(recipe_fields),
+    include: frozenset[str] = Depends(recipe_includes),
     recipe_repository: RecipeRepository = Depends(get_recipe_repository),
-) -> list[GetRecipeSchema]:
-    return recipe_repository.get_all_recipes()
+) -> Response:
+    if ids is not None:
+        recipes = await recipe_repository.get_recipes_by_ids(ids, fields, include)
+    else:
+        recipes = await recipe_repository.get_all_recipes(page, fields, include)
+    return json_response(recipes, include=items_include(fields))
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "content": {"application/x-ndjson": {}},
+            "description": "One GetRecipeSchema JSON document per line",
+        },
+        500: {"model": ErrorResponse, "description": "Internal server error"},
+    },
+)
+async def export_recipes(
+    user_id: int | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    recipe_repository: RecipeRepository = Depends(get_recipe_repository),
+) -> StreamingResponse:
+    lines = recipe_repository.export_recipes(user_id, created_from, created_to)
+    return StreamingResponse(lines, media_type="application/x-ndjson")
+
+
+@router.get(
+    "/autocomplete",
+    response_model=AutocompleteSchema,
+    responses={
+        200: {"description": AUTOCOMPLETE_DESCRIPTION},
+        422: {"model": ErrorResponse, "description": "Invalid prefix or limit"},
+        500: {"model": ErrorResponse, "description": "Internal server error"},
+    },
+)
+async def autocomplete_recipes(
+    prefix: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=MAX_AUTOCOMPLETE_LIMIT),
+    recipe_repository: RecipeRepository = Depends(get_recipe_repository),
+) -> Response:
+    return json_response(await recipe_repository.autocomplete(prefix, limit))
+
+
+@router.get(
+    "/search",
+    response_model=PageSchema[RecipeSearchHitSchema],
+    responses={
+        422: {"model": ErrorResponse, "description": "Invalid query or cursor"},
+        500: {"model": ErrorResponse, "description": "Internal server error"},
+    },
+)
+async def search_recipes(
+    params: Annotated[SearchRecipesParams, Query()],
+    recipe_repository: RecipeRepository = Depends(get_recipe_repository),
+) -> Response:
+    return json_response(await recipe_repository.search_recipes(params))
 
 
 @router.get(
@@ -29,30 +124,43 @@ async def get_recipes(
     response_model=GetRecipeSchema,
     responses={
         404: {"model": ErrorResponse, "description": "Recipe not found"},
+        422: {"model": ErrorResponse, "description": "Unknown fields or include"},
         500: {"model": ErrorResponse, "description": "Internal server error"},
     },
 )
 async def get_recipe(
     recipe_id: int,
+    fields: set[str] | None = Depends(recipe_fields),
+    include: frozenset[str] = Depends(recipe_includes),
     recipe_repository: RecipeRepository = Depends(get_recipe_repository),
-):
-    recipe = recipe_repository.get_recipe_by_id(recipe_id)
-    return recipe
+) -> Response:
+    recipe = await recipe_repository.get_recipe_by_id(recipe_id, fields, include)
+    return json_response(recipe, include=fields)
 
 
 @router.get(
     "/user/{user_id}",
-    response_model=list[GetRecipeSchema],
+    response_model=PageSchema[GetRecipeSchema],
     responses={
         404: {"model": ErrorResponse, "description": "Recipe not found"},
+        422: {
+            "model": ErrorResponse,
+            "description": "Invalid pagination cursor, fields or include",
+        },
         500: {"model": ErrorResponse, "description": "Internal server error"},
     },
 )
 async def get_recipes_user(
     user_id: int,
+    page: Annotated[PageParams, Query()],
+    fields: set[str] | None = Depends(recipe_fields),
+    include: frozenset[str] = Depends(recipe_includes),
     recipe_repository: RecipeRepository = Depends(get_recipe_repository),
-) -> list[GetRecipeSchema]:
-    return recipe_repository.get_recipes_by_user(user_id)
+) -> Response:
+    recipes = await recipe_repository.get_recipes_by_user(
+        user_id, page, fields, include
+    )
+    return json_response(recipes, include=items_include(fields))
 
 
 @router.post(
@@ -68,8 +176,60 @@ async def get_recipes_user(
 async def create_recipe(
     recipe: CreateRecipeSchema,
     recipe_repository: RecipeRepository = Depends(get_recipe_repository),
+    idempotency: Idempotency = Depends(get_idempotency),
+) -> Response:
+    return await idempotency.run(partial(recipe_repository.create_recipe, recipe))
+
+
+@router.post(
+    "/bulk",
+    response_model=BulkRecipesResultSchema,
+    responses={
+        422: {"model": ErrorResponse, "description": "Invalid recipe input format"},
+        500: {"model": ErrorResponse, "description": "Internal server error"},
+    },
+)
+async def create_recipes(
+    recipes: Annotated[
+        list[CreateRecipeSchema], Body(min_length=1, max_length=MAX_BULK_RECIPES)
+    ],
+    recipe_repository: RecipeRepository = Depends(get_recipe_repository),
+    idempotency: Idempotency = Depends(get_idempotency),
+) -> Response:
+    return await idempotency.run(partial(recipe_repository.create_recipes, recipes))
+
+
+@router.post(
+    "/pantry-search",
+    response_model=PageSchema[PantryMatchSchema],
+    responses={
+        422: {"model": ErrorResponse, "description": "Invalid pantry or cursor"},
+        500: {"model": ErrorResponse, "description": "Internal server error"},
+    },
+)
+async def pantry_search(
+    params: PantrySearchSchema,
+    recipe_repository: RecipeRepository = Depends(get_recipe_repository),
+) -> Response:
+    return json_response(await recipe_repository.pantry_search(params))
+
+
+@router.patch(
+    "/{recipe_id}",
+    response_model=GetRecipeSchema,
+    responses={
+        404: {"model": ErrorResponse, "description": "Recipe or ingredient not found"},
+        409: {"model": ErrorResponse, "description": "Recipe name already exists"},
+        422: {"model": ErrorResponse, "description": "Invalid recipe input format"},
+        500: {"model": ErrorResponse, "description": "Internal server error"},
+    },
+)
+async def update_recipe(
+    recipe_id: int,
+    recipe: UpdateRecipeSchema,
+    recipe_repository: RecipeRepository = Depends(get_recipe_repository),
 ) -> GetRecipeSchema:
-    return recipe_repository.create_recipe(recipe)
+    return await recipe_repository.update_recipe(recipe_id, recipe)
 
 
 @router.delete(
@@ -84,4 +244,4 @@ async def delete_recipe(
     recipe_id: int,
     recipe_repository: RecipeRepository = Depends(get_recipe_repository),
 ) -> DeleteRecipeSchema:
-    return recipe_repository.delete_recipe_by_id(recipe_id)
+    return await recipe_repository.delete_recipe_by_id(recipe_id)
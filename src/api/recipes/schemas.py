@@ -1,7 +1,18 @@
+from collections.abc import Mapping
 from datetime import datetime
-from pydantic import Field, field_serializer, field_validator
-from src.api.recipes.enums import DifficultyLevel
-from src.api.schemas import BaseSchema
+from typing import Any, Self
+from pydantic import BaseModel, Field, field_serializer, field_validator
+from sqlalchemy import Row
+from src.api.recipes.enums import DifficultyLevel, RecipeOrder
+from src.api.common.schemas import (
+    CategoryRelationshipSchema,
+    PageParams,
+    UserRelationshipSchema,
+)
+from src.api.schemas import BaseSchema, ExpandableSchema
+from src.core.schemas import ErrorSchema
+
+MAX_PANTRY_INGREDIENTS = 500
 
 
 class RecipeIngredientPayload(BaseSchema):
@@ -9,6 +20,21 @@ class RecipeIngredientPayload(BaseSchema):
     quantity: str = Field(..., examples=["100 grams"])
 
 
+class RecipeIngredientSchema(RecipeIngredientPayload, ExpandableSchema):
+    # Filled from the ingredient on ``?include=ingredients[.categories]``.
+    expansions = frozenset({"name", "is_vegan", "categories"})
+
+    name: str | None = Field(None, examples=["Broccoli"])
+    is_vegan: bool | None = Field(None, examples=[True])
+    categories: list[CategoryRelationshipSchema] | None = Field(
+        None, examples=[[{"id": 1, "name": "Veggies"}]]
+    )
+
+    @field_serializer("name")
+    def serialize_name(self, value: str | None) -> str | None:
+        return value.capitalize() if value is not None else None
+
+
 class RecipeBaseSchema(BaseSchema):
     name: str = Field(max_length=183, examples=["Tzatziki"])
     cooking_time: int = Field(..., examples=[30], ge=1)
@@ -34,16 +60,147 @@ class CreateRecipeSchema(RecipeBaseSchema):
     )
 
 
-class GetRecipeSchema(RecipeBaseSchema):
+class UpdateRecipeSchema(BaseSchema):
+    """
+    Partial update: omitted or null fields are left unchanged, and
+    ``ingredients``, when given, becomes the recipe's full ingredient list.
+    """
+
+    name: str | None = Field(None, max_length=183, examples=["Tzatziki"])
+    cooking_time: int | None = Field(None, examples=[30], ge=1)
+    difficulty_level: DifficultyLevel | None = Field(None, examples=["EASY"])
+    portions: int | None = Field(None, examples=[4], ge=1)
+    instructions: str | None = Field(None, examples=["Mix all ingredients."])
+    ingredients: list[RecipeIngredientPayload] | None = Field(
+        None, examples=[[{"ingredient_id": 1, "quantity": "100 grams"}]]
+    )
+
+    @field_validator("name")
+    @classmethod
+    def validate_name(cls, value: str | None) -> str | None:
+        return value.lower() if value is not None else None
+
+
+class GetRecipeSchema(RecipeBaseSchema, ExpandableSchema):
+    expansions = frozenset({"user"})
+
     is_vegan: bool = Field(..., examples=[False])
     id: int = Field(..., examples=[1])
     created_at: datetime = Field(..., examples=["2023-10-01T12:00:00Z"])
-    ingredients: list[RecipeIngredientPayload] = Field(
+    ingredients: list[RecipeIngredientSchema] = Field(
         default_factory=list,
         alias="recipe_ingredients_payload",
         serialization_alias="ingredients",
     )
+    # Set by the repository on ``?include=user``; the validation alias keeps
+    # model_validate from touching a possibly unloaded ``Recipe.user``.
+    user: UserRelationshipSchema | None = Field(None, validation_alias="author")
+
+    @classmethod
+    def from_values(cls, values: Mapping[str, Any]) -> Self:
+        """
+        Build a possibly partial schema (sparse fieldsets) from loaded values.
+        """
+        values = dict(values)
+        if "ingredients" in values:
+            values["ingredients"] = [
+                RecipeIngredientSchema.model_validate(item)
+                for item in values["ingredients"]
+            ]
+        return cls.model_construct(**values)
+
+    @classmethod
+    def from_row(cls, row: Row) -> Self:
+        """
+        Build the schema from a trusted Core row without running validators.
+        """
+        values = dict(row._mapping)
+        if "ingredients" in values:
+            values["ingredients"] = [
+                RecipeIngredientSchema.model_construct(**item)
+                for item in values["ingredients"]
+            ]
+        return cls.model_construct(**values)
 
 
 class DeleteRecipeSchema(GetRecipeSchema):
     pass
+
+
+class BulkRecipeResultSchema(BaseSchema):
+    index: int = Field(..., examples=[0])
+    recipe: GetRecipeSchema | None = None
+    error: ErrorSchema | None = None
+
+
+class BulkRecipesResultSchema(BaseSchema):
+    created: int = Field(..., examples=[2])
+    failed: int = Field(..., examples=[1])
+    results: list[BulkRecipeResultSchema] = Field(default_factory=list)
+
+
+class RecipeListParams(PageParams):
+    """
+    Page of recipes with optional filters; a filter left out adds no
+    predicate.
+    """
+
+    order_by: RecipeOrder = Field(
+        RecipeOrder.ID, examples=["id", "created_at", "cooking_time"]
+    )
+    difficulty_level: DifficultyLevel | None = Field(None, examples=["EASY"])
+    max_cooking_time: int | None = Field(None, ge=1, examples=[30])
+    min_portions: int | None = Field(None, ge=1, examples=[2])
+    max_portions: int | None = Field(None, ge=1, examples=[6])
+    user_id: int | None = Field(None, examples=[1])
+    vegan: bool = Field(False, description="Only vegan recipes", examples=[True])
+
+
+class SearchRecipesParams(BaseModel):
+    q: str = Field(
+        ...,
+        min_length=1,
+        max_length=200,
+        description='Web search syntax: words, "quoted phrases", -excluded, or',
+        examples=["spinach pie -feta"],
+    )
+    limit: int = Field(20, ge=1, le=100, examples=[20])
+    cursor: str | None = Field(None, examples=["eyJyYW5rIjowLjEsImlkIjo1fQ"])
+
+
+class RecipeSearchHitSchema(BaseSchema):
+    id: int = Field(..., examples=[1])
+    name: str = Field(..., examples=["Spanakopita"])
+    rank: float = Field(..., examples=[0.67])
+    headline: str = Field(
+        ..., examples=["Layer the <b>spinach</b> filling between the sheets"]
+    )
+
+    @field_serializer("name")
+    def serialize_name(self, value: str) -> str:
+        return value.capitalize()
+
+
+class PantrySearchSchema(BaseSchema):
+    ingredient_ids: list[int] = Field(
+        ..., min_length=1, max_length=MAX_PANTRY_INGREDIENTS, examples=[[1, 2, 3]]
+    )
+    max_missing: int = Field(2, ge=0, le=3, examples=[2])
+    limit: int = Field(20, ge=1, le=100, examples=[20])
+    cursor: str | None = Field(None, examples=["eyJtaXNzaW5nIjoxLCJpZCI6NX0"])
+
+    @field_validator("ingredient_ids")
+    @classmethod
+    def dedupe_ingredient_ids(cls, value: list[int]) -> list[int]:
+        return list(dict.fromkeys(value))
+
+
+class PantryMatchSchema(BaseSchema):
+    id: int = Field(..., examples=[1])
+    name: str = Field(..., examples=["Tzatziki"])
+    missing: int = Field(..., examples=[1])
+    missing_ingredient_ids: list[int] = Field(default_factory=list, examples=[[4]])
+
+    @field_serializer("name")
+    def serialize_name(self, value: str) -> str:
+        return value.capitalize()
@@ -1,47 +1,334 @@
-from fastapi import status
-from src.db.models.recipes import Recipe, RecipeIngredient
+import binascii
+from collections.abc import AsyncIterator
+from datetime import datetime
+from functools import partial
+from itertools import batched
+from fastapi import Response, status
+from src.db.models.recipes import LIVE, SEARCH_CONFIG, Recipe, RecipeIngredient
 from src.db.models.ingredients import Ingredient
 from src.db.models.users import User
+from src.db.models.tombstones import Tombstone
 from src.api.recipes.schemas import (
+    BulkRecipeResultSchema,
+    BulkRecipesResultSchema,
     GetRecipeSchema,
     CreateRecipeSchema,
     DeleteRecipeSchema,
+    PantryMatchSchema,
+    PantrySearchSchema,
     RecipeIngredientPayload,
+    RecipeIngredientSchema,
+    RecipeListParams,
+    RecipeSearchHitSchema,
+    SearchRecipesParams,
+    UpdateRecipeSchema,
 )
+from sqlalchemy import (
+    ARRAY,
+    Float,
+    Integer,
+    Row,
+    Select,
+    String,
+    all_,
+    any_,
+    bindparam,
+    delete,
+    exists,
+    func,
+    literal,
+    select,
+    true,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import REGCONFIG, insert
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defaultload, joinedload, load_only, selectinload
+from src.api.common.fields import make_item, pick
+from src.api.common.batch import build_batch
+from src.api.common.pagination import (
+    build_page,
+    decode_payload,
+    encode_payload,
+    invalid_cursor,
+    paginate,
+)
+from src.api.common.autocomplete import Autocomplete
+from src.api.common.schemas import (
+    AutocompleteSchema,
+    BatchSchema,
+    CategoryRelationshipSchema,
+    PageParams,
+    PageSchema,
+    UserRelationshipSchema,
+)
 from src.core.exceptions import ErrorException
-from src.core.enums import ErrorKind
+from src.core.schemas import ErrorSchema
+from src.core.enums import ErrorKind, EventType, LoadProfile, SyncEntity
+from src.db.base import normalize_name
+from src.db.batching import WriteBatcher, run_write
+from src.db.functions import json_list
+from src.db.outbox import record_events
+from src.db.pantry import PantryIndex
+from src.db.search import join_names, recipe_ingredient_names
+from src.db.vegan import has_non_vegan_ingredient
+
+
+EXPORT_BATCH_SIZE = 500
+MAX_BULK_RECIPES = 5000
+# Rows per multi-row INSERT, well below the 32767 bind parameter limit.
+BULK_INSERT_CHUNK_SIZE = 1000
+SEARCH_HEADLINE_OPTIONS = "MaxFragments=2, MaxWords=20, MinWords=5"
+
+recipe_names = Autocomplete(Recipe, Recipe.deleted_at.is_(None))
 
 
 class RecipeRepository:
-    def __init__(self, db: Session):
+    # GetRecipeSchema reads ``recipe_ingredients`` for its ingredients
+    # payload, so every profile loads them up front.
+    load_profiles = {
+        LoadProfile.LIST: (selectinload(Recipe.recipe_ingredients),),
+        LoadProfile.DETAIL: (joinedload(Recipe.recipe_ingredients),),
+    }
+    # Sparse fieldsets (``?fields=``): response field -> column, and the
+    # relationship loaders only needed when their field is requested.
+    field_columns = {
+        "id": Recipe.id,
+        "name": Recipe._name,
+        "cooking_time": Recipe.cooking_time,
+        "difficulty_level": Recipe.difficulty_level,
+        "portions": Recipe.portions,
+        "instructions": Recipe.instructions,
+        "user_id": Recipe.user_id,
+        "is_vegan": Recipe.is_vegan,
+        "created_at": Recipe.created_at,
+    }
+    field_loaders = {"ingredients": selectinload(Recipe.recipe_ingredients)}
+    field_attributes = {"ingredients": "recipe_ingredients_payload"}
+    # ``?include=`` expansions: each level is one batched selectin query.
+    include_loaders = {
+        "user": selectinload(Recipe.user).load_only(User.username, User.full_name),
+        "ingredients": defaultload(Recipe.recipe_ingredients).selectinload(
+            RecipeIngredient.ingredient
+        ),
+        "ingredients.categories": defaultload(Recipe.recipe_ingredients)
+        .defaultload(RecipeIngredient.ingredient)
+        .selectinload(Ingredient.categories),
+    }
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        fast_reads: bool = False,
+        batcher: WriteBatcher | None = None,
+        pantry_index: PantryIndex | None = None,
+    ):
         self.db = db
+        self.fast_reads = fast_reads
+        self.batcher = batcher
+        # Without a shared index (scripts, tests) each search loads its own.
+        self.pantry_index = pantry_index
 
     @property
     def repo_name(self) -> str:
         return "RecipeRepository"
 
-    def get_all_recipes(self) -> list[GetRecipeSchema]:
-        recipes = self.db.query(Recipe).all()
-        return [GetRecipeSchema.model_validate(recipe) for recipe in recipes]
+    def query(
+        self,
+        profile: LoadProfile,
+        fields: set[str] | None = None,
+        include: frozenset[str] = frozenset(),
+    ) -> Select:
+        if fields is None:
+            options = self.load_profiles[profile]
+        else:
+            # created_at always rides along: the keyset cursor is built from it;
+            # user_id too when the author is expanded.
+            columns = pick(self.field_columns, fields)
+            if "user" in include:
+                columns.append(Recipe.user_id)
+            options = (
+                load_only(Recipe.created_at, *columns),
+                *pick(self.field_loaders, fields),
+            )
+        return (
+            select(Recipe)
+            .options(*options, *pick(self.include_loaders, include))
+            .where(Recipe.deleted_at.is_(None))
+        )
+
+    def rows_query(self, fields: set[str] | None = None) -> Select:
+        """
+        Core select of exactly the GetRecipeSchema columns, with ingredients
+        aggregated in SQL, for the ORM-free read path.
+        """
+        ingredients = (
+            select(
+                json_list(
+                    ingredient_id=RecipeIngredient.ingredient_id,
+                    quantity=RecipeIngredient.quantity,
+                )
+            )
+            .where(RecipeIngredient.recipe_id == Recipe.id)
+            .scalar_subquery()
+        )
+        columns = {**self.field_columns, "ingredients": ingredients}
+        if fields is not None:
+            fields = fields | {"id", "created_at"}
+        return select(
+            *(
+                column.label(name)
+                for name, column in columns.items()
+                if fields is None or name in fields
+            )
+        ).where(Recipe.deleted_at.is_(None))
 
-    def get_recipe_by_id(self, recipe_id: int) -> GetRecipeSchema | None:
-        recipe = self.db.query(Recipe).filter(Recipe.id == recipe_id).first()
-        if recipe:
-            return GetRecipeSchema.model_validate(recipe)
+    def item_factory(
+        self, fields: set[str] | None = None, include: frozenset[str] = frozenset()
+    ):
+        if fields is not None:
+            fields = fields - GetRecipeSchema.expansions
+        build = make_item(GetRecipeSchema, fields, self.field_attributes)
+        if not include:
+            return build
+
+        def build_expanded(recipe: Recipe) -> GetRecipeSchema:
+            item = build(recipe)
+            if "user" in include:
+                item.user = UserRelationshipSchema.model_validate(recipe.user)
+            if "ingredients" in include and "ingredients" in item.model_fields_set:
+                item.ingredients = [
+                    self.expand_line(line, include)
+                    for line in recipe.recipe_ingredients
+                ]
+            return item
+
+        return build_expanded
+
+    @staticmethod
+    def expand_line(
+        line: RecipeIngredient, include: frozenset[str]
+    ) -> RecipeIngredientSchema:
+        values = {
+            "ingredient_id": line.ingredient_id,
+            "quantity": line.quantity,
+            "name": line.ingredient.name,
+            "is_vegan": line.ingredient.is_vegan,
+        }
+        if "ingredients.categories" in include:
+            values["categories"] = [
+                CategoryRelationshipSchema.model_validate(category)
+                for category in line.ingredient.categories
+            ]
+        return RecipeIngredientSchema.model_construct(**values)
+
+    async def get_recipe(self, recipe_id: int) -> Recipe | None:
+        query = self.query(LoadProfile.DETAIL).where(Recipe.id == recipe_id)
+        result = await self.db.execute(query.execution_options(populate_existing=True))
+        return result.unique().scalar_one_or_none()
+
+    @staticmethod
+    def filter(query: Select, params: RecipeListParams) -> Select:
+        """
+        Add a predicate for each filter set in ``params``, and only for
+        those, so the planner sees just the combination in use and can pick
+        the composite index made for it.
+        """
+        criteria = []
+        if params.difficulty_level is not None:
+            criteria.append(Recipe.difficulty_level == params.difficulty_level)
+        if params.max_cooking_time is not None:
+            criteria.append(Recipe.cooking_time <= params.max_cooking_time)
+        if params.min_portions is not None:
+            criteria.append(Recipe.portions >= params.min_portions)
+        if params.max_portions is not None:
+            criteria.append(Recipe.portions <= params.max_portions)
+        if params.user_id is not None:
+            criteria.append(Recipe.user_id == params.user_id)
+        if params.vegan:
+            criteria.append(Recipe.is_vegan.is_(True))
+        return query.where(*criteria)
+
+    async def get_all_recipes(
+        self,
+        page: RecipeListParams,
+        fields: set[str] | None = None,
+        include: frozenset[str] = frozenset(),
+    ) -> PageSchema[GetRecipeSchema]:
+        # The sort key is read back for the cursor; the route drops it from
+        # the response when it was not asked for.
+        loaded = fields if fields is None else fields | {page.order_by}
+        # Expansions are served by the ORM's batched loaders.
+        if self.fast_reads and not include:
+            query = paginate(self.filter(self.rows_query(loaded), page), Recipe, page)
+            rows = (await self.db.execute(query)).all()
+            return build_page(rows, page, GetRecipeSchema.from_row)
+        query = self.filter(self.query(LoadProfile.LIST, loaded, include), page)
+        recipes = (await self.db.scalars(paginate(query, Recipe, page))).all()
+        return build_page(recipes, page, self.item_factory(fields, include))
+
+    async def get_recipes_by_ids(
+        self,
+        recipe_ids: list[int],
+        fields: set[str] | None = None,
+        include: frozenset[str] = frozenset(),
+    ) -> BatchSchema[GetRecipeSchema]:
+        if self.fast_reads and not include:
+            query = self.rows_query(fields).where(Recipe.id.in_(recipe_ids))
+            rows = (await self.db.execute(query)).all()
+            return build_batch(recipe_ids, rows, GetRecipeSchema.from_row)
+        query = self.query(LoadProfile.LIST, fields, include).where(
+            Recipe.id.in_(recipe_ids)
+        )
+        recipes = (await self.db.scalars(query)).all()
+        return build_batch(recipe_ids, recipes, self.item_factory(fields, include))
+
+    async def get_recipe_by_id(
+        self,
+        recipe_id: int,
+        fields: set[str] | None = None,
+        include: frozenset[str] = frozenset(),
+    ) -> GetRecipeSchema | None:
+        if self.fast_reads and not include:
+            query = self.rows_query(fields).where(Recipe.id == recipe_id)
+            row = (await self.db.execute(query)).first()
+            if row:
+                return GetRecipeSchema.from_row(row)
         else:
-            raise ErrorException(
-                code=status.HTTP_404_NOT_FOUND,
-                message="Recipe not found",
-                kind=ErrorKind.NOT_FOUND,
-                source=f"{self.repo_name}.get_recipe_by_id",
+            query = self.query(LoadProfile.DETAIL, fields, include).where(
+                Recipe.id == recipe_id
             )
+            recipe = (await self.db.execute(query)).unique().scalar_one_or_none()
+            if recipe:
+                return self.item_factory(fields, include)(recipe)
+        raise ErrorException(
+            code=status.HTTP_404_NOT_FOUND,
+            message="Recipe not found",
+            kind=ErrorKind.NOT_FOUND,
+            source=f"{self.repo_name}.get_recipe_by_id",
+        )
 
-    def get_recipes_by_user(self, recipe_user_id: int) -> list[GetRecipeSchema]:
-        recipes = self.db.query(Recipe).filter(Recipe.user_id == recipe_user_id).all()
-        if recipes:
-            return [GetRecipeSchema.model_validate(recipe) for recipe in recipes]
+    async def get_recipes_by_user(
+        self,
+        recipe_user_id: int,
+        page: PageParams,
+        fields: set[str] | None = None,
+        include: frozenset[str] = frozenset(),
+    ) -> PageSchema[GetRecipeSchema]:
+        if self.fast_reads and not include:
+            query = self.rows_query(fields).where(Recipe.user_id == recipe_user_id)
+            recipes = (await self.db.execute(paginate(query, Recipe, page))).all()
+            make_item = GetRecipeSchema.from_row
+        else:
+            query = self.query(LoadProfile.LIST, fields, include).where(
+                Recipe.user_id == recipe_user_id
+            )
+            recipes = (await self.db.scalars(paginate(query, Recipe, page))).all()
+            make_item = self.item_factory(fields, include)
+        if recipes or page.cursor is not None:
+            return build_page(recipes, page, make_item)
         raise ErrorException(
             code=status.HTTP_404_NOT_FOUND,
             message="Recipe not found for the user",
@@ -49,85 +336,618 @@ class RecipeRepository:
             source=f"{self.repo_name}.get_recipes_by_user",
         )
 
-    def add_recipe(self, recipe: Recipe) -> GetRecipeSchema:
-        self.db.add(recipe)
-        self.db.commit()
-        self.db.refresh(recipe)
-        return GetRecipeSchema.model_validate(recipe)
+    async def autocomplete(self, prefix: str, limit: int) -> AutocompleteSchema:
+        return await recipe_names.complete(self.db, prefix, limit)
 
-    def make_recipe_ingredients(
-        self, items: list[RecipeIngredientPayload]
-    ) -> list[RecipeIngredient]:
-        if not items:
-            return []
+    async def search_recipes(
+        self, params: SearchRecipesParams
+    ) -> PageSchema[RecipeSearchHitSchema]:
+        """
+        Rank live recipes matching ``params.q`` against the generated
+        ``search_vector``, best first, with keyset pagination on
+        ``(rank, id)``.
 
-        ingredient_ids = [item.ingredient_id for item in items]
+        The GIN index finds the matches; only the page that is returned
+        gets a ``ts_headline``, which re-parses the instructions and is far
+        more expensive than ranking.
+        """
+        source = f"{self.repo_name}.search_recipes"
+        tsquery = func.websearch_to_tsquery(literal(SEARCH_CONFIG, REGCONFIG), params.q)
+        rank = func.ts_rank(Recipe.search_vector, tsquery, type_=Float)
+        hits = select(Recipe.id, rank.label("rank")).where(
+            Recipe.search_vector.bool_op("@@")(tsquery), Recipe.deleted_at.is_(None)
+        )
+        if params.cursor is not None:
+            try:
+                payload = decode_payload(params.cursor)
+                after = (float(payload["rank"]), int(payload["id"]))
+            except (binascii.Error, ValueError, KeyError, TypeError):
+                raise invalid_cursor(source)
+            hits = hits.where(
+                tuple_(rank, Recipe.id) < tuple_(literal(after[0], Float), after[1])
+            )
+        hits = (
+            hits.order_by(rank.desc(), Recipe.id.desc())
+            .limit(params.limit + 1)
+            .subquery("hits")
+        )
+        headline = func.ts_headline(
+            literal(SEARCH_CONFIG, REGCONFIG),
+            Recipe.instructions,
+            tsquery,
+            SEARCH_HEADLINE_OPTIONS,
+        )
+        query = (
+            select(
+                hits.c.id,
+                Recipe._name.label("name"),
+                hits.c.rank,
+                headline.label("headline"),
+            )
+            .join(Recipe, Recipe.id == hits.c.id)
+            .order_by(hits.c.rank.desc(), hits.c.id.desc())
+        )
+        rows = (await self.db.execute(query)).all()
+        has_more = len(rows) > params.limit
+        rows = rows[: params.limit]
+        return PageSchema.model_construct(
+            items=[
+                RecipeSearchHitSchema.model_construct(**row._mapping) for row in rows
+            ],
+            next_cursor=(
+                encode_payload({"rank": rows[-1].rank, "id": rows[-1].id})
+                if has_more
+                else None
+            ),
+        )
 
-        ingredients = (
-            self.db.query(Ingredient)
-            .filter(Ingredient.id.in_(set(ingredient_ids)))
-            .all()
+    async def pantry_search(
+        self, params: PantrySearchSchema
+    ) -> PageSchema[PantryMatchSchema]:
+        """
+        Recipes cookable from ``params.ingredient_ids``, fully cookable first,
+        then those missing one ingredient and so on up to ``max_missing``;
+        newest first within each group. Matching runs on the in-process
+        ``PantryIndex``; only the returned page is read from the database.
+        """
+        source = f"{self.repo_name}.pantry_search"
+        after = None
+        if params.cursor is not None:
+            try:
+                payload = decode_payload(params.cursor)
+                after = (int(payload["missing"]), int(payload["id"]))
+            except (binascii.Error, ValueError, KeyError, TypeError):
+                raise invalid_cursor(source)
+        index = self.pantry_index or PantryIndex(max_staleness=0)
+        await index.sync(self.db)
+        found = index.search(
+            params.ingredient_ids, params.max_missing, params.limit + 1, after
         )
-        ingredient_map = {ingredient.id: ingredient for ingredient in ingredients}
-        missing_ids = [
-            ing_id for ing_id in ingredient_ids if ing_id not in ingredient_map
+        has_more = len(found) > params.limit
+        found = found[: params.limit]
+
+        pantry = literal(params.ingredient_ids, ARRAY(Integer))
+        missing_ids = (
+            select(func.array_agg(RecipeIngredient.ingredient_id))
+            .where(
+                RecipeIngredient.recipe_id == Recipe.id,
+                RecipeIngredient.ingredient_id != all_(pantry),
+            )
+            .scalar_subquery()
+        )
+        ids = literal([recipe_id for _, recipe_id in found], ARRAY(Integer))
+        rows = await self.db.execute(
+            select(Recipe.id, Recipe._name, missing_ids).where(
+                Recipe.id == any_(ids), Recipe.deleted_at.is_(None)
+            )
+        )
+        recipes = {recipe_id: (name, missing) for recipe_id, name, missing in rows}
+        # A recipe deleted since the index last caught up is left out.
+        items = [
+            PantryMatchSchema.model_construct(
+                id=recipe_id,
+                name=recipes[recipe_id][0],
+                missing=missing,
+                missing_ingredient_ids=sorted(recipes[recipe_id][1] or ()),
+            )
+            for missing, recipe_id in found
+            if recipe_id in recipes
         ]
+        return PageSchema.model_construct(
+            items=items,
+            next_cursor=(
+                encode_payload({"missing": found[-1][0], "id": found[-1][1]})
+                if has_more
+                else None
+            ),
+        )
+
+    async def export_recipes(
+        self,
+        user_id: int | None = None,
+        created_from: datetime | None = None,
+        created_to: datetime | None = None,
+    ) -> AsyncIterator[str]:
+        """
+        Yield the catalog as NDJSON lines, streaming rows from a server-side
+        cursor in batches of ``EXPORT_BATCH_SIZE``.
+        """
+        query = self.query(LoadProfile.LIST)
+        if user_id is not None:
+            query = query.where(Recipe.user_id == user_id)
+        if created_from is not None:
+            query = query.where(Recipe.created_at >= created_from)
+        if created_to is not None:
+            query = query.where(Recipe.created_at < created_to)
+        query = query.order_by(Recipe.id).execution_options(yield_per=EXPORT_BATCH_SIZE)
+        async for recipe in await self.db.stream_scalars(query):
+            schema = GetRecipeSchema.model_validate(recipe)
+            yield schema.model_dump_json(by_alias=True) + "\n"
+
+    async def create_recipe(
+        self, recipe_data: CreateRecipeSchema
+    ) -> GetRecipeSchema | Response:
+        """
+        Create a recipe and its ingredient lines in one statement.
+
+        The insert only selects its row when the user and every ingredient
+        exist and skips name conflicts with ``ON CONFLICT DO NOTHING``; the
+        lines are inserted from the returned row in a data-modifying CTE.
+        When no row comes back, one more query works out which check failed.
+        """
+        source = f"{self.repo_name}.create_recipe"
+        line_ids = {line.ingredient_id for line in recipe_data.ingredients}
+        if len(line_ids) != len(recipe_data.ingredients):
+            raise ErrorException(**self.duplicate_lines_error(source).model_dump())
+        recipe = await run_write(
+            self.db, partial(self.insert_recipe, recipe_data), self.batcher
+        )
+        recipe_names.invalidate()
+        return recipe
+
+    async def insert_recipe(
+        self, recipe_data: CreateRecipeSchema, db: AsyncSession
+    ) -> GetRecipeSchema:
+        source = f"{self.repo_name}.create_recipe"
+
+        recipes = Recipe.__table__
+        data = {
+            "name": normalize_name(recipe_data.name),
+            "cooking_time": recipe_data.cooking_time,
+            "difficulty_level": recipe_data.difficulty_level,
+            "portions": recipe_data.portions,
+            "instructions": recipe_data.instructions,
+            "user_id": recipe_data.user_id,
+        }
+        # Lines travel as two array parameters so the statement has one shape
+        # (and one cached compilation) whatever the number of ingredients.
+        ingredient_ids = literal(
+            [line.ingredient_id for line in recipe_data.ingredients], ARRAY(Integer)
+        )
+        quantities = literal(
+            [line.quantity for line in recipe_data.ingredients], ARRAY(String)
+        )
+        requested = Ingredient.id == any_(ingredient_ids)
+        # Share-locked, so a concurrent flip of an ingredient's is_vegan and
+        # this recipe cannot miss each other (see ``src.db.vegan``).
+        ingredients = Ingredient.__table__
+        found = (
+            select(ingredients.c.id, ingredients.c.name, ingredients.c.is_vegan)
+            .where(requested)
+            .with_for_update(read=True)
+            .cte("found_ingredients")
+        )
+        derived = select(
+            func.coalesce(func.bool_and(found.c.is_vegan), True),
+            join_names(found.c.name),
+        ).subquery("derived")
+        guarded = select(
+            *(literal(value, recipes.c[key].type) for key, value in data.items()),
+            *derived.c,
+        ).where(
+            exists().where(User.id == recipe_data.user_id),
+            select(func.count()).select_from(found).scalar_subquery()
+            == func.cardinality(ingredient_ids),
+        )
+        new = (
+            insert(recipes)
+            .from_select([*data, "is_vegan", "ingredient_names"], guarded)
+            .on_conflict_do_nothing(index_elements=[recipes.c.name], index_where=LIVE)
+            .returning(recipes.c.id, recipes.c.created_at, recipes.c.is_vegan)
+            .cte("new_recipe")
+        )
+        lines = (
+            func.unnest(ingredient_ids, quantities)
+            .table_valued("ingredient_id", "quantity")
+            .render_derived(name="lines")
+        )
+        new_lines = (
+            insert(RecipeIngredient.__table__)
+            .from_select(
+                ["recipe_id", "ingredient_id", "quantity"],
+                select(new.c.id, lines.c.ingredient_id, lines.c.quantity)
+                .select_from(new)
+                .join(lines, true()),
+            )
+            .cte("new_lines")
+        )
+        query = select(new.c.id, new.c.created_at, new.c.is_vegan).add_cte(
+            new_lines, record_events(EventType.RECIPE_CREATED, new.c.id)
+        )
+        row = (await db.execute(query)).one_or_none()
+        if not row:
+            found_user_ids, found_ingredient_ids = (
+                await db.execute(
+                    select(
+                        select(func.array_agg(User.id))
+                        .where(User.id == recipe_data.user_id)
+                        .scalar_subquery(),
+                        select(func.array_agg(Ingredient.id))
+                        .where(requested)
+                        .scalar_subquery(),
+                    )
+                )
+            ).one()
+            error = self.creation_error(
+                recipe_data,
+                set(found_user_ids or ()),
+                set(found_ingredient_ids or ()),
+                {data["name"]},
+                source,
+            )
+            raise ErrorException(**error.model_dump())
+        return self.created_recipe(recipe_data, row, row.is_vegan)
+
+    @staticmethod
+    def created_recipe(
+        recipe_data: CreateRecipeSchema, row: Row, is_vegan: bool
+    ) -> GetRecipeSchema:
+        """
+        Response for a freshly inserted recipe, built from the validated input
+        and the ``RETURNING`` row instead of reloading it.
+        """
+        return GetRecipeSchema.model_construct(
+            **recipe_data.model_dump(exclude={"name", "ingredients"}),
+            name=normalize_name(recipe_data.name),
+            id=row.id,
+            created_at=row.created_at,
+            is_vegan=is_vegan,
+            ingredients=[
+                RecipeIngredientSchema.model_construct(**line.model_dump())
+                for line in recipe_data.ingredients
+            ],
+        )
+
+    @staticmethod
+    def duplicate_lines_error(source: str) -> ErrorSchema:
+        return ErrorSchema(
+            code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            message="Ingredients are listed more than once",
+            kind=ErrorKind.VALIDATION,
+            source=source,
+        )
+
+    def creation_error(
+        self,
+        item: CreateRecipeSchema,
+        user_ids: set[int],
+        ingredient_ids: set[int],
+        names: set[str],
+        source: str,
+    ) -> ErrorSchema | None:
+        """
+        First reason ``item`` cannot be created, given the existing users,
+        ingredients and taken names.
+        """
+        if item.user_id not in user_ids:
+            return ErrorSchema(
+                code=status.HTTP_404_NOT_FOUND,
+                message="User not found",
+                kind=ErrorKind.NOT_FOUND,
+                source=source,
+            )
+        line_ids = [line.ingredient_id for line in item.ingredients]
+        missing_ids = [ing_id for ing_id in line_ids if ing_id not in ingredient_ids]
         if missing_ids:
-            raise ErrorException(
+            return ErrorSchema(
                 code=status.HTTP_404_NOT_FOUND,
                 message=f"Ingredients not found: {missing_ids}",
                 kind=ErrorKind.NOT_FOUND,
-                source=f"{self.repo_name}.make_recipe_ingredients",
+                source=source,
+            )
+        if len(set(line_ids)) != len(line_ids):
+            return self.duplicate_lines_error(source)
+        if normalize_name(item.name) in names:
+            return ErrorSchema(
+                code=status.HTTP_409_CONFLICT,
+                message="Recipe name already exists",
+                kind=ErrorKind.CONFLICT,
+                source=source,
+            )
+        return None
+
+    async def create_recipes(
+        self, items: list[CreateRecipeSchema]
+    ) -> BulkRecipesResultSchema | Response:
+        """
+        Create many recipes in one transaction.
+
+        Users and ingredients are resolved with one query each, recipes are
+        written with multi-row ``INSERT ... ON CONFLICT DO NOTHING RETURNING``
+        and their ingredient lines with a single executemany, so a name
+        conflict fails only its own item.
+        """
+        # Under an Idempotency-Key the result is the stored Response, so
+        # the cache is cleared whether or not anything was created.
+        result = await run_write(self.db, partial(self.write_recipes, items))
+        recipe_names.invalidate()
+        return result
+
+    async def write_recipes(
+        self, items: list[CreateRecipeSchema], db: AsyncSession
+    ) -> BulkRecipesResultSchema:
+        user_ids = set(
+            await db.scalars(
+                select(User.id).where(User.id.in_({item.user_id for item in items}))
             )
-        return [
-            RecipeIngredient(
-                ingredient=ingredient_map[item.ingredient_id],
-                quantity=item.quantity,
+        )
+        line_ids = {line.ingredient_id for item in items for line in item.ingredients}
+        ingredients = Ingredient.__table__
+        found = {
+            row.id: row
+            for row in await db.execute(
+                select(ingredients.c.id, ingredients.c.name, ingredients.c.is_vegan)
+                .where(ingredients.c.id.in_(line_ids))
+                # Share-locked like in ``insert_recipe``.
+                .with_for_update(read=True)
             )
-            for item in items
+        }
+
+        source = f"{self.repo_name}.create_recipes"
+        errors: dict[int, ErrorSchema] = {}
+        pending: dict[str, int] = {}
+        for index, item in enumerate(items):
+            error = self.creation_error(
+                item, user_ids, found.keys(), pending.keys(), source
+            )
+            if error:
+                errors[index] = error
+            else:
+                pending[normalize_name(item.name)] = index
+
+        recipes = Recipe.__table__
+        created = {}
+        is_vegan = {}
+        names = {}
+        for index in pending.values():
+            used = [found[line.ingredient_id] for line in items[index].ingredients]
+            is_vegan[index] = all(row.is_vegan for row in used)
+            # Same text as ``join_names`` renders in SQL.
+            names[index] = " ".join(sorted(row.name for row in used)) or None
+        for chunk in batched(pending.values(), BULK_INSERT_CHUNK_SIZE):
+            new = (
+                insert(recipes)
+                .values(
+                    [
+                        {
+                            "name": normalize_name(items[index].name),
+                            "cooking_time": items[index].cooking_time,
+                            "difficulty_level": items[index].difficulty_level,
+                            "portions": items[index].portions,
+                            "instructions": items[index].instructions,
+                            "user_id": items[index].user_id,
+                            "is_vegan": is_vegan[index],
+                            "ingredient_names": names[index],
+                        }
+                        for index in chunk
+                    ]
+                )
+                .on_conflict_do_nothing(
+                    index_elements=[recipes.c.name], index_where=LIVE
+                )
+                .returning(recipes.c.id, recipes.c.name, recipes.c.created_at)
+                .cte("new_recipes")
+            )
+            query = select(new).add_cte(
+                record_events(EventType.RECIPE_CREATED, new.c.id)
+            )
+            for row in await db.execute(query):
+                created[pending[row.name]] = row
+        lines = [
+            {
+                "recipe_id": row.id,
+                "ingredient_id": line.ingredient_id,
+                "quantity": line.quantity,
+            }
+            for index, row in created.items()
+            for line in items[index].ingredients
         ]
+        if lines:
+            await db.execute(insert(RecipeIngredient.__table__), lines)
 
-    def create_recipe(self, recipe_data: CreateRecipeSchema) -> GetRecipeSchema:
-        user = self.db.query(User).filter(User.id == recipe_data.user_id).first()
-        if not user:
-            raise ErrorException(
-                code=status.HTTP_404_NOT_FOUND,
-                message="User not found",
-                kind=ErrorKind.NOT_FOUND,
-                source=f"{self.repo_name}.create_recipe",
+        results = []
+        for index, item in enumerate(items):
+            if index in created:
+                recipe = self.created_recipe(item, created[index], is_vegan[index])
+                results.append(BulkRecipeResultSchema(index=index, recipe=recipe))
+                continue
+            error = errors.get(index) or self.creation_error(
+                item, user_ids, found.keys(), {normalize_name(item.name)}, source
             )
+            results.append(BulkRecipeResultSchema(index=index, error=error))
+        return BulkRecipesResultSchema.model_construct(
+            created=len(created), failed=len(items) - len(created), results=results
+        )
+
+    async def update_recipe(
+        self, recipe_id: int, recipe_data: UpdateRecipeSchema
+    ) -> GetRecipeSchema:
+        """
+        Apply a partial update in one transaction.
+
+        The recipe row is updated first, which also locks it against
+        concurrent edits. When ``ingredients`` is given it is diffed against
+        the stored lines, so only added lines are inserted, removed lines
+        deleted and lines whose quantity changed updated.
+        """
+        source = f"{self.repo_name}.update_recipe"
+        recipes = Recipe.__table__
+        changes = recipe_data.model_dump(exclude={"ingredients"}, exclude_none=True)
+        if "name" in changes:
+            changes["name"] = normalize_name(changes["name"])
+        updated_recipe = (
+            update(recipes)
+            .where(recipes.c.id == recipe_id, recipes.c.deleted_at.is_(None))
+            .values(**changes, updated_at=func.now())
+            .returning(recipes.c.id)
+            .cte("updated_recipe")
+        )
+        query = select(updated_recipe.c.id).add_cte(
+            record_events(EventType.RECIPE_UPDATED, updated_recipe.c.id)
+        )
         try:
-            new_recipe = Recipe(
-                name=recipe_data.name,
-                cooking_time=recipe_data.cooking_time,
-                difficulty_level=recipe_data.difficulty_level,
-                portions=recipe_data.portions,
-                instructions=recipe_data.instructions,
-                user_id=recipe_data.user_id,
-                user=user,
-            )
-            new_recipe.recipe_ingredients = self.make_recipe_ingredients(
-                recipe_data.ingredients
-            )
-            return self.add_recipe(new_recipe)
+            updated = await self.db.scalar(query)
         except IntegrityError:
             raise ErrorException(
                 code=status.HTTP_409_CONFLICT,
                 message="Recipe name already exists",
                 kind=ErrorKind.CONFLICT,
-                source=f"{self.repo_name}.create_recipe",
+                source=source,
+            )
+        if updated is None:
+            raise ErrorException(
+                code=status.HTTP_404_NOT_FOUND,
+                message="Recipe not found",
+                kind=ErrorKind.NOT_FOUND,
+                source=source,
+            )
+        if recipe_data.ingredients is not None and await self.sync_recipe_ingredients(
+            recipe_id, recipe_data.ingredients, source
+        ):
+            await self.db.execute(
+                update(recipes)
+                .where(recipes.c.id == recipe_id)
+                .values(
+                    is_vegan=~has_non_vegan_ingredient(recipes.c.id),
+                    ingredient_names=recipe_ingredient_names(recipes.c.id),
+                )
+            )
+        await self.db.commit()
+        if "name" in changes:
+            recipe_names.invalidate()
+        return GetRecipeSchema.model_validate(await self.get_recipe(recipe_id))
+
+    async def sync_recipe_ingredients(
+        self, recipe_id: int, items: list[RecipeIngredientPayload], source: str
+    ) -> bool:
+        """
+        Diff the recipe's lines against ``items``; returns whether the set of
+        ingredients changed, as opposed to quantities only.
+        """
+        wanted = {item.ingredient_id: item.quantity for item in items}
+        if len(wanted) != len(items):
+            raise ErrorException(**self.duplicate_lines_error(source).model_dump())
+        lines = RecipeIngredient.__table__
+        current = dict(
+            (
+                await self.db.execute(
+                    select(lines.c.ingredient_id, lines.c.quantity).where(
+                        lines.c.recipe_id == recipe_id
+                    )
+                )
+            ).all()
+        )
+        added = [ing_id for ing_id in wanted if ing_id not in current]
+        removed = [ing_id for ing_id in current if ing_id not in wanted]
+        changed = [
+            ing_id
+            for ing_id, quantity in wanted.items()
+            if ing_id in current and current[ing_id] != quantity
+        ]
+        if added:
+            found = set(
+                await self.db.scalars(
+                    select(Ingredient.id)
+                    .where(Ingredient.id.in_(added))
+                    .with_for_update(read=True)
+                )
             )
+            missing_ids = [ing_id for ing_id in added if ing_id not in found]
+            if missing_ids:
+                raise ErrorException(
+                    code=status.HTTP_404_NOT_FOUND,
+                    message=f"Ingredients not found: {missing_ids}",
+                    kind=ErrorKind.NOT_FOUND,
+                    source=source,
+                )
+            await self.db.execute(
+                insert(lines),
+                [
+                    {
+                        "recipe_id": recipe_id,
+                        "ingredient_id": ing_id,
+                        "quantity": wanted[ing_id],
+                    }
+                    for ing_id in added
+                ],
+            )
+        if removed:
+            await self.db.execute(
+                delete(lines).where(
+                    lines.c.recipe_id == recipe_id,
+                    lines.c.ingredient_id.in_(removed),
+                )
+            )
+        if changed:
+            await self.db.execute(
+                update(lines)
+                .where(
+                    lines.c.recipe_id == recipe_id,
+                    lines.c.ingredient_id == bindparam("line_ingredient_id"),
+                )
+                .values(quantity=bindparam("line_quantity")),
+                [
+                    {"line_ingredient_id": ing_id, "line_quantity": wanted[ing_id]}
+                    for ing_id in changed
+                ],
+            )
+        return bool(added or removed)
 
-    def delete_recipe_by_id(self, recipe_id: int) -> DeleteRecipeSchema:
-        recipe = self.db.query(Recipe).filter(Recipe.id == recipe_id).first()
-        if not recipe:
+    async def delete_recipe_by_id(self, recipe_id: int) -> DeleteRecipeSchema:
+        """
+        Soft-delete the recipe in one statement: set ``deleted_at``, record
+        the tombstone and select the response row from the same snapshot.
+        The row and its lines are hard-deleted later by ``Purger``.
+        """
+        recipes = Recipe.__table__
+        deleted = (
+            update(recipes)
+            .where(recipes.c.id == recipe_id, recipes.c.deleted_at.is_(None))
+            .values(deleted_at=func.now(), updated_at=func.now())
+            .returning(recipes.c.id)
+            .cte("deleted_recipe")
+        )
+        tombstone = (
+            insert(Tombstone.__table__)
+            .from_select(
+                ["entity", "entity_id"],
+                select(literal(SyncEntity.RECIPE.value), deleted.c.id),
+            )
+            .cte("tombstone")
+        )
+        query = (
+            self.rows_query()
+            .where(Recipe.id.in_(select(deleted.c.id)))
+            .add_cte(tombstone, record_events(EventType.RECIPE_DELETED, deleted.c.id))
+        )
+        row = (await self.db.execute(query)).one_or_none()
+        if not row:
             raise ErrorException(
                 code=status.HTTP_404_NOT_FOUND,
                 message="Recipe not found",
                 kind=ErrorKind.NOT_FOUND,
                 source=f"{self.repo_name}.delete_recipe_by_id",
             )
-        response = DeleteRecipeSchema.model_validate(recipe)
-        self.db.delete(recipe)
-        self.db.commit()
-        return response
+        await self.db.commit()
+        recipe_names.invalidate()
+        return DeleteRecipeSchema.from_row(row)
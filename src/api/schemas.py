@@ -1,5 +1,24 @@
-from pydantic import BaseModel, ConfigDict
+from typing import Any, ClassVar
+from pydantic import BaseModel, ConfigDict, SerializerFunctionWrapHandler
+from pydantic import model_serializer
 
 
 class BaseSchema(BaseModel):
     model_config = ConfigDict(from_attributes=True)
+
+
+class ExpandableSchema(BaseSchema):
+    """
+    Schema with ``?include=`` expansions: an expansion field is left out of
+    the output unless it holds a value.
+    """
+
+    expansions: ClassVar[frozenset[str]] = frozenset()
+
+    @model_serializer(mode="wrap")
+    def drop_unexpanded(self, handler: SerializerFunctionWrapHandler) -> dict[str, Any]:
+        data = handler(self)
+        for name in self.expansions:
+            if getattr(self, name, None) is None:
+                data.pop(name, None)
+        return data
@@ -0,0 +1,7 @@
+from fastapi import Depends
+from src.core.dependencies import get_db
+from src.api.sync.services import SyncRepository
+
+
+def get_sync_repository(db=Depends(get_db)) -> SyncRepository:
+    return SyncRepository(db)
@@ -0,0 +1,28 @@
+from datetime import datetime
+from fastapi import APIRouter, Depends, Query, Response
+from src.api.common.responses import json_response
+from src.api.sync.dependencies import get_sync_repository
+from src.api.sync.schemas import SyncSchema
+from src.api.sync.services import SyncRepository
+from src.core.schemas import ErrorResponse
+
+router = APIRouter()
+
+
+@router.get(
+    "/",
+    response_model=SyncSchema,
+    responses={
+        422: {
+            "model": ErrorResponse,
+            "description": "Neither or both of since and cursor",
+        },
+        500: {"model": ErrorResponse, "description": "Internal server error"},
+    },
+)
+async def sync(
+    since: datetime | None = Query(None, examples=["2023-10-01T12:00:00Z"]),
+    cursor: int | None = Query(None, ge=0, examples=[7421]),
+    sync_repository: SyncRepository = Depends(get_sync_repository),
+) -> Response:
+    return json_response(await sync_repository.get_changes(since, cursor))
@@ -0,0 +1,23 @@
+from datetime import datetime
+from pydantic import Field
+from src.api.categories.schemas import GetCategorySchema
+from src.api.ingredients.schemas import GetIngredientSchema
+from src.api.recipes.schemas import GetRecipeSchema
+from src.api.schemas import BaseSchema
+from src.core.enums import SyncEntity
+
+
+class TombstoneSchema(BaseSchema):
+    entity: SyncEntity = Field(..., examples=["recipe"])
+    entity_id: int = Field(..., examples=[1])
+    deleted_at: datetime = Field(..., examples=["2023-10-01T12:00:00Z"])
+
+
+class SyncSchema(BaseSchema):
+    recipes: list[GetRecipeSchema] = Field(default_factory=list)
+    ingredients: list[GetIngredientSchema] = Field(default_factory=list)
+    categories: list[GetCategorySchema] = Field(default_factory=list)
+    tombstones: list[TombstoneSchema] = Field(default_factory=list)
+    synced_at: datetime = Field(..., examples=["2023-10-01T12:00:00Z"])
+    # Pass back as ``cursor`` on the next sync; may repeat rows already sent.
+    cursor: int = Field(..., examples=[7421])
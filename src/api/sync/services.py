@@ -0,0 +1,109 @@
+from datetime import datetime
+from functools import partial
+from fastapi import status
+from sqlalchemy import ColumnElement, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.api.categories.schemas import GetCategorySchema
+from src.api.categories.services import CategoryRepository
+from src.api.ingredients.schemas import GetIngredientSchema
+from src.api.ingredients.services import IngredientRepository
+from src.api.recipes.schemas import GetRecipeSchema
+from src.api.recipes.services import RecipeRepository
+from src.api.sync.schemas import SyncSchema, TombstoneSchema
+from src.core.enums import ErrorKind, LoadProfile
+from src.core.exceptions import ErrorException
+from src.db.base import SNAPSHOT_XMIN
+from src.db.models.categories import Category
+from src.db.models.ingredients import Ingredient
+from src.db.models.recipes import Recipe
+from src.db.models.tombstones import Tombstone
+
+
+def changed_since(model, since: datetime) -> ColumnElement[bool]:
+    # Two index-backed range conditions, combined by a bitmap OR.
+    return or_(model.created_at > since, model.updated_at > since)
+
+
+def written_since(model, cursor: int) -> ColumnElement[bool]:
+    return model.written_xid >= cursor
+
+
+class SyncRepository:
+    """
+    Changes since a previous sync, for offline clients.
+
+    A row's timestamps are taken when its transaction starts, which may be
+    long before it commits, so a ``since`` timestamp can skip rows that
+    were committed late. Each response therefore carries a ``cursor``: the
+    oldest transaction still running when the sync started (see
+    ``src.db.pantry``). The next sync passes it back and gets every row
+    whose ``written_xid`` is at least that, which may repeat rows from the
+    previous response; clients apply changes by id, so repeats are
+    harmless. ``since`` remains for the first sync and older clients.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @property
+    def repo_name(self) -> str:
+        return "SyncRepository"
+
+    async def get_changes(
+        self, since: datetime | None = None, cursor: int | None = None
+    ) -> SyncSchema:
+        """
+        Everything created, updated or deleted after ``since``, or written
+        by a transaction at or after ``cursor``.
+        """
+        if (since is None) == (cursor is None):
+            raise ErrorException(
+                code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                message="Pass exactly one of since or cursor",
+                kind=ErrorKind.VALIDATION,
+                source=f"{self.repo_name}.get_changes",
+            )
+        if cursor is None:
+            changed = partial(changed_since, since=since)
+            deleted = Tombstone.deleted_at > since
+        else:
+            changed = partial(written_since, cursor=cursor)
+            deleted = written_since(Tombstone, cursor)
+        # Taken before reading, in their own statement, so anything the
+        # reads miss is at or above the new cursor.
+        synced_at, next_cursor = (
+            await self.db.execute(select(func.now(), SNAPSHOT_XMIN))
+        ).one()
+        recipes = await self.db.scalars(
+            RecipeRepository(self.db)
+            .query(LoadProfile.LIST)
+            .where(changed(Recipe))
+            .order_by(Recipe.id)
+        )
+        ingredients = await self.db.scalars(
+            IngredientRepository(self.db)
+            .query(LoadProfile.LIST)
+            .where(changed(Ingredient))
+            .order_by(Ingredient.id)
+        )
+        categories = await self.db.scalars(
+            CategoryRepository(self.db)
+            .query(LoadProfile.LIST)
+            .where(changed(Category))
+            .order_by(Category.id)
+        )
+        tombstones = await self.db.scalars(
+            select(Tombstone)
+            .where(deleted)
+            .order_by(Tombstone.deleted_at, Tombstone.id)
+        )
+        return SyncSchema.model_construct(
+            recipes=[GetRecipeSchema.model_validate(row) for row in recipes],
+            ingredients=[
+                GetIngredientSchema.model_validate(row) for row in ingredients
+            ],
+            categories=[GetCategorySchema.model_validate(row) for row in categories],
+            tombstones=[TombstoneSchema.model_validate(row) for row in tombstones],
+            synced_at=synced_at,
+            cursor=next_cursor,
+        )
@@ -1,5 +1,6 @@
+from functools import partial
 from typing import Annotated
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Response
 from src.api.auth import services
 from src.api.users.schemas import (
     CreateUserSchema,
@@ -8,23 +9,41 @@ from src.api.users.schemas import (
 )
 from src.api.users.services import UserRepository
 from src.api.users.dependencies import get_user_repository
+from src.api.common.idempotency import Idempotency, get_idempotency
+from src.api.common.fields import SparseFields, items_include
+from src.api.common.responses import json_response
+from src.api.common.batch import batch_ids
+from src.api.common.schemas import BatchSchema, PageParams, PageSchema
 from src.core.schemas import ErrorResponse
 from src.db.models.users import User
 
 router = APIRouter()
 
+user_fields = SparseFields(GetUserSchema)
+
 
 @router.get(
     "/",
-    response_model=list[GetUserSchema],
+    response_model=PageSchema[GetUserSchema] | BatchSchema[GetUserSchema],
     responses={
+        422: {
+            "model": ErrorResponse,
+            "description": "Invalid pagination cursor, ids or fields",
+        },
         500: {"model": ErrorResponse, "description": "Internal server error"},
     },
 )
 async def get_users(
+    page: Annotated[PageParams, Query()],
+    ids: list[int] | None = Depends(batch_ids),
+    fields: set[str] | None = Depends(user_fields),
     user_repository: UserRepository = Depends(get_user_repository),
-) -> list[GetUserSchema]:
-    return user_repository.get_all_users()
+) -> Response:
+    if ids is not None:
+        users = await user_repository.get_users_by_ids(ids, fields)
+    else:
+        users = await user_repository.get_all_users(page, fields)
+    return json_response(users, include=items_include(fields))
 
 
 @router.get(
@@ -32,14 +51,17 @@ async def get_users(
     response_model=GetUserSchema,
     responses={
         404: {"model": ErrorResponse, "description": "User not found"},
+        422: {"model": ErrorResponse, "description": "Unknown fields"},
         500: {"model": ErrorResponse, "description": "Internal server error"},
     },
 )
 async def get_user(
-    user_id: int, user_repository: UserRepository = Depends(get_user_repository)
-):
-    user = user_repository.get_user_by_id(user_id)
-    return user
+    user_id: int,
+    fields: set[str] | None = Depends(user_fields),
+    user_repository: UserRepository = Depends(get_user_repository),
+) -> Response:
+    user = await user_repository.get_user_by_id(user_id, fields)
+    return json_response(user, include=fields)
 
 
 @router.post(
@@ -58,8 +80,9 @@ async def get_user(
 async def create_user(
     user: CreateUserSchema,
     user_repository: UserRepository = Depends(get_user_repository),
-) -> GetUserSchema:
-    return user_repository.create_user(user)
+    idempotency: Idempotency = Depends(get_idempotency),
+) -> Response:
+    return await idempotency.run(partial(user_repository.create_user, user))
 
 
 @router.put(
@@ -79,7 +102,7 @@ async def update_user(
     user: UpdateUserSchema,
     user_repository: UserRepository = Depends(get_user_repository),
 ) -> GetUserSchema:
-    return user_repository.update_user(user_id, user)
+    return await user_repository.update_user(user_id, user)
 
 
 @router.get("/me", response_model=GetUserSchema)
@@ -1,4 +1,6 @@
+from collections.abc import Mapping
 from datetime import datetime
+from typing import Any, Self
 from pydantic import Field, EmailStr
 from src.api.schemas import BaseSchema
 
@@ -25,3 +27,10 @@ class GetUserSchema(UserSchema):
     id: int = Field(..., examples=[1])
     created_at: datetime = Field(..., examples=["2023-10-01T12:00:00Z"])
     updated_at: datetime | None = Field(examples=["2023-10-01T12:00:00Z"], default=None)
+
+    @classmethod
+    def from_values(cls, values: Mapping[str, Any]) -> Self:
+        """
+        Build a possibly partial schema (sparse fieldsets) from loaded values.
+        """
+        return cls.model_construct(**values)
@@ -1,33 +1,79 @@
+from functools import partial
 from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import Select, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+from src.api.common.fields import make_item, pick
+from src.api.common.batch import build_batch
+from src.api.common.pagination import build_page, paginate
+from src.api.common.schemas import BatchSchema, PageParams, PageSchema
 from src.core.exceptions import ErrorException
-from src.core.enums import ErrorKind
+from src.core.enums import ErrorKind, EventType
 from src.api.users.schemas import (
     CreateUserSchema,
     GetUserSchema,
     UpdateUserSchema,
 )
+from src.db.batching import WriteBatcher, run_write
 from src.db.models.users import User
+from src.db.outbox import event, record_events
 from src.core.security import hash_password
 
 
 class UserRepository:
-    def __init__(self, db: Session):
+    # Sparse fieldsets (``?fields=``): response field -> column.
+    field_columns = {
+        "username": User.username,
+        "email": User.email,
+        "full_name": User.full_name,
+        "is_active": User.is_active,
+        "id": User.id,
+        "created_at": User.created_at,
+        "updated_at": User.updated_at,
+    }
+
+    def __init__(self, db: AsyncSession, batcher: WriteBatcher | None = None):
         self.db = db
+        self.batcher = batcher
 
     @property
     def repo_name(self) -> str:
         return "UserRepository"
 
-    def get_all_users(self) -> list[GetUserSchema]:
-        users = self.db.query(User).all()
-        return [GetUserSchema.model_validate(user) for user in users]
+    def query(self, fields: set[str] | None = None) -> Select:
+        if fields is None:
+            return select(User)
+        return select(User).options(
+            load_only(User.created_at, *pick(self.field_columns, fields))
+        )
+
+    async def get_all_users(
+        self, page: PageParams, fields: set[str] | None = None
+    ) -> PageSchema[GetUserSchema]:
+        query = paginate(self.query(fields), User, page)
+        users = (await self.db.scalars(query)).all()
+        return build_page(users, page, make_item(GetUserSchema, fields))
+
+    async def get_users_by_ids(
+        self, user_ids: list[int], fields: set[str] | None = None
+    ) -> BatchSchema[GetUserSchema]:
+        users = (
+            await self.db.scalars(self.query(fields).where(User.id.in_(user_ids)))
+        ).all()
+        return build_batch(user_ids, users, make_item(GetUserSchema, fields))
 
-    def get_user_by_id(self, user_id: int) -> GetUserSchema | None:
-        user = self.db.query(User).filter(User.id == user_id).first()
+    async def get_user_by_id(
+        self, user_id: int, fields: set[str] | None = None
+    ) -> GetUserSchema | None:
+        if fields is None:
+            user = await self.db.get(User, user_id)
+        else:
+            user = await self.db.scalar(self.query(fields).where(User.id == user_id))
         if user:
-            return GetUserSchema.model_validate(user)
+            return make_item(GetUserSchema, fields)(user)
         else:
             raise ErrorException(
                 code=status.HTTP_404_NOT_FOUND,
@@ -36,8 +82,8 @@ class UserRepository:
                 source=f"{self.repo_name}.get_user_by_id",
             )
 
-    def get_user_by_username(self, username: str) -> GetUserSchema | None:
-        user = self.db.query(User).filter(User.username == username).first()
+    async def get_user_by_username(self, username: str) -> GetUserSchema | None:
+        user = await self.db.scalar(select(User).where(User.username == username))
         if user:
             return GetUserSchema.model_validate(user)
         else:
@@ -48,40 +94,50 @@ class UserRepository:
                 source=f"{self.repo_name}.get_user_by_username",
             )
 
-    def add_user(self, user: User) -> GetUserSchema:
-        self.db.add(user)
-        self.db.commit()
-        self.db.refresh(user)
-        return GetUserSchema.model_validate(user)
+    async def create_user(self, user_data: CreateUserSchema) -> GetUserSchema:
+        """
+        Insert the user with ``ON CONFLICT DO NOTHING RETURNING``: one
+        statement on success, and no row (rather than an exception and a
+        rolled-back transaction) when the username or email is taken.
+        """
+        hashed_password = await run_in_threadpool(hash_password, user_data.password)
+        return await run_write(
+            self.db,
+            partial(self.insert_user, user_data, hashed_password),
+            self.batcher,
+        )
 
-    def create_user(self, user_data: CreateUserSchema) -> GetUserSchema:
-        try:
-            hashed_password = hash_password(user_data.password)
-            new_user = User(
+    async def insert_user(
+        self, user_data: CreateUserSchema, hashed_password: str, db: AsyncSession
+    ) -> GetUserSchema:
+        new = (
+            insert(User.__table__)
+            .values(
                 username=user_data.username,
                 email=user_data.email,
                 full_name=user_data.full_name,
                 is_active=user_data.is_active,
                 hashed_password=hashed_password,
             )
-            return self.add_user(new_user)
-        except IntegrityError:
+            .on_conflict_do_nothing()
+            .returning(*(col.label(name) for name, col in self.field_columns.items()))
+            .cte("new_user")
+        )
+        query = select(new).add_cte(record_events(EventType.USER_CREATED, new.c.id))
+        row = (await db.execute(query)).one_or_none()
+        if not row:
             raise ErrorException(
                 code=status.HTTP_409_CONFLICT,
                 message="Username or email already exists",
                 kind=ErrorKind.CONFLICT,
                 source=f"{self.repo_name}.create_user",
             )
-        except Exception:
-            raise ErrorException(
-                code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                message="Internal server error",
-                kind=ErrorKind.INTERNAL,
-                source=f"{self.repo_name}.create_user",
-            )
+        return GetUserSchema.model_validate(row)
 
-    def update_user(self, user_id: int, user_data: UpdateUserSchema) -> GetUserSchema:
-        user = self.db.query(User).filter(User.id == user_id).first()
+    async def update_user(
+        self, user_id: int, user_data: UpdateUserSchema
+    ) -> GetUserSchema:
+        user = await self.db.get(User, user_id)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         try:
@@ -93,8 +149,9 @@ class UserRepository:
                 user.full_name = user_data.full_name
             if user_data.is_active is not None:
                 user.is_active = user_data.is_active
-            self.db.commit()
-            self.db.refresh(user)
+            self.db.add(event(EventType.USER_UPDATED, user.id))
+            await self.db.commit()
+            await self.db.refresh(user)
             return GetUserSchema.model_validate(user)
         except IntegrityError:
             raise ErrorException(
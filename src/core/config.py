@@ -16,6 +16,28 @@ class Config(BaseConfig):
     SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
+    FAST_READ_PATH: bool = False
+    # Group commit for creates: queue them for up to WRITE_BATCH_MAX_WAIT_MS
+    # (or WRITE_BATCH_MAX_SIZE writes) and commit them in one transaction.
+    WRITE_BATCHING: bool = False
+    WRITE_BATCH_MAX_SIZE: int = 100
+    WRITE_BATCH_MAX_WAIT_MS: float = 5.0
+    # Background purge of soft-deleted recipes (once older than
+    # RECIPE_PURGE_RETENTION_SECONDS) and expired idempotency keys; an
+    # interval of 0 disables it.
+    PURGE_INTERVAL_SECONDS: float = 60.0
+    PURGE_BATCH_SIZE: int = 1000
+    RECIPE_PURGE_RETENTION_SECONDS: float = 0.0
+    IDEMPOTENCY_KEY_TTL_SECONDS: int = 86400
+    # Outbox dispatch: poll for due events every OUTBOX_POLL_INTERVAL_SECONDS
+    # and deliver them OUTBOX_BATCH_SIZE at a time; 0 disables it.
+    OUTBOX_POLL_INTERVAL_SECONDS: float = 1.0
+    OUTBOX_BATCH_SIZE: int = 500
+    # How far behind the database the in-process pantry search index may be.
+    PANTRY_INDEX_MAX_STALENESS_SECONDS: float = 1.0
+    # Per-process cache of autocomplete answers, keyed by prefix and limit.
+    AUTOCOMPLETE_CACHE_SIZE: int = 10_000
+    AUTOCOMPLETE_CACHE_TTL_SECONDS: float = 10.0
 
 
 def get_config(env_state):
@@ -1,17 +1,19 @@
 import httpx
 from fastapi import Request
 from src.db.postgresql import get_db as get_database
-from contextlib import contextmanager
+from contextlib import asynccontextmanager
 
 
 def get_http_client(request: Request) -> httpx.AsyncClient:
     return request.app.state.http
 
 
-def get_db():
-    yield from get_database()
+async def get_db():
+    async for db in get_database():
+        yield db
 
 
-@contextmanager
-def get_db_context():
-    yield from get_database()
+@asynccontextmanager
+async def get_db_context():
+    async for db in get_database():
+        yield db
@@ -6,3 +6,31 @@ class ErrorKind(StrEnum):
     INTERNAL = "InternalError"
     CONFLICT = "ConflictError"
     VALIDATION = "ValidationError"
+
+
+class LoadProfile(StrEnum):
+    LIST = "list"
+    DETAIL = "detail"
+
+
+class PageOrder(StrEnum):
+    ID = "id"
+    CREATED_AT = "created_at"
+
+
+class SyncEntity(StrEnum):
+    RECIPE = "recipe"
+    INGREDIENT = "ingredient"
+    CATEGORY = "category"
+
+
+class EventType(StrEnum):
+    USER_CREATED = "user.created"
+    USER_UPDATED = "user.updated"
+    CATEGORY_CREATED = "category.created"
+    CATEGORY_UPDATED = "category.updated"
+    INGREDIENT_CREATED = "ingredient.created"
+    INGREDIENT_UPDATED = "ingredient.updated"
+    RECIPE_CREATED = "recipe.created"
+    RECIPE_UPDATED = "recipe.updated"
+    RECIPE_DELETED = "recipe.deleted"
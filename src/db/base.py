@@ -2,6 +2,31 @@ from datetime import datetime
 from sqlalchemy import DateTime
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 from sqlalchemy.sql import func
+from sqlalchemy.types import UserDefinedType
+
+
+def normalize_name(value: str) -> str:
+    """
+    Canonical form of the unique ``name`` columns; shared by the model
+    setters and by writers that bypass the ORM.
+    """
+    return value.lower()
+
+
+class XID8(UserDefinedType):
+    """
+    Postgres' 64-bit transaction id, which unlike ``xid`` never wraps
+    around; asyncpg reads and binds it as ``int``.
+    """
+
+    cache_ok = True
+
+    def get_col_spec(self) -> str:
+        return "XID8"
+
+
+# Every transaction older than this had finished when the snapshot was taken.
+SNAPSHOT_XMIN = func.pg_snapshot_xmin(func.pg_current_snapshot())
 
 
 class Base(DeclarativeBase):
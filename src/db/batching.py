@@ -0,0 +1,128 @@
+"""
+Group commit for create requests.
+
+Under bursty write traffic each request committing its own transaction is
+bound by WAL flush latency. ``WriteBatcher`` queues writes for up to
+``max_wait`` seconds (or until ``max_batch_size`` are waiting) and runs them
+in one transaction, each inside its own savepoint so a failing write (say, a
+name conflict) is rolled back without affecting the rest of the batch.
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from contextvars import ContextVar
+from typing import TypeVar
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.core.logging import logger
+
+T = TypeVar("T")
+Write = Callable[[AsyncSession], Awaitable[T]]
+
+# Set by request-level code (``Idempotency``) to wrap the write that
+# ``run_write`` runs next, so its own statements share the write's
+# transaction whether that is the request's or a group commit.
+write_wrapper: ContextVar[Callable[[Write], Write] | None] = ContextVar(
+    "write_wrapper", default=None
+)
+
+
+class WriteBatcher:
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        max_batch_size: int = 100,
+        max_wait: float = 0.005,
+    ):
+        self.session_factory = session_factory
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.queue: asyncio.Queue[tuple[Write, asyncio.Future] | None] = asyncio.Queue()
+        self.task: asyncio.Task | None = None
+
+    async def submit(self, write: Write[T]) -> T:
+        """
+        Run ``write`` in the next batch and return its result once the batch
+        has committed; exceptions raised by ``write`` are re-raised here.
+        """
+        if self.task is None:
+            self.task = asyncio.create_task(self.run())
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((write, future))
+        return await future
+
+    async def close(self) -> None:
+        """
+        Commit whatever is queued and stop the background task.
+        """
+        if self.task is not None:
+            await self.queue.put(None)
+            await self.task
+            self.task = None
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self.queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = loop.time() + self.max_wait
+            closing = False
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except TimeoutError:
+                    break
+                if item is None:
+                    closing = True
+                    break
+                batch.append(item)
+            await self.flush(batch)
+            if closing:
+                return
+
+    async def flush(self, batch: list[tuple[Write, asyncio.Future]]) -> None:
+        results: list[tuple[asyncio.Future, object]] = []
+        try:
+            async with self.session_factory() as db:
+                for write, future in batch:
+                    if future.cancelled():
+                        continue
+                    try:
+                        async with db.begin_nested():
+                            result = await write(db)
+                    except Exception as exc:
+                        if not future.done():
+                            future.set_exception(exc)
+                    else:
+                        results.append((future, result))
+                await db.commit()
+        except Exception as exc:
+            logger.error(f"Write batch of {len(batch)} failed to commit: {exc}")
+            for future, _ in results:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for future, result in results:
+            if not future.done():
+                future.set_result(result)
+
+
+async def run_write(
+    db: AsyncSession, write: Write[T], batcher: WriteBatcher | None = None
+) -> T:
+    """
+    Run ``write`` and commit: on ``db`` when batching is off, otherwise as
+    part of the batcher's next group commit.
+    """
+    wrap = write_wrapper.get()
+    if wrap is not None:
+        write = wrap(write)
+    if batcher is not None:
+        return await batcher.submit(write)
+    result = await write(db)
+    await db.commit()
+    return result
@@ -0,0 +1,97 @@
+"""
+Compressed bitmaps of integer ids, in the style of Roaring bitmaps.
+
+Ids are split into chunks of ``CHUNK_SIZE`` by their high bits. A chunk
+with few ids keeps them as a set of offsets; past ``SPARSE_LIMIT`` it
+becomes a Python ``int`` used as a bitmap, so set algebra on it runs in C
+a machine word at a time. Sparse members of a large id space stay small,
+and dense ones cost at most ``CHUNK_SIZE / 8`` bytes per chunk.
+"""
+
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+
+CHUNK_BITS = 16
+CHUNK_SIZE = 1 << CHUNK_BITS
+OFFSET_MASK = CHUNK_SIZE - 1
+# About where a set of offsets outgrows the bitmap it stands for.
+SPARSE_LIMIT = 128
+
+
+class Bitmap:
+    __slots__ = ("chunks",)
+
+    def __init__(self, ids: Iterable[int] = ()):
+        self.chunks: dict[int, set[int] | int] = {}
+        grouped: defaultdict[int, set[int]] = defaultdict(set)
+        for id_ in ids:
+            grouped[id_ >> CHUNK_BITS].add(id_ & OFFSET_MASK)
+        for key, chunk in grouped.items():
+            self.chunks[key] = chunk if len(chunk) <= SPARSE_LIMIT else to_int(chunk)
+
+    def __len__(self) -> int:
+        return sum(
+            len(chunk) if isinstance(chunk, set) else chunk.bit_count()
+            for chunk in self.chunks.values()
+        )
+
+    def __contains__(self, id_: int) -> bool:
+        chunk = self.chunks.get(id_ >> CHUNK_BITS)
+        if chunk is None:
+            return False
+        if isinstance(chunk, set):
+            return id_ & OFFSET_MASK in chunk
+        return bool(chunk >> (id_ & OFFSET_MASK) & 1)
+
+    def add(self, id_: int) -> None:
+        key, offset = id_ >> CHUNK_BITS, id_ & OFFSET_MASK
+        chunk = self.chunks.setdefault(key, set())
+        if isinstance(chunk, set):
+            chunk.add(offset)
+            if len(chunk) > SPARSE_LIMIT:
+                self.chunks[key] = to_int(chunk)
+        else:
+            self.chunks[key] = chunk | 1 << offset
+
+    def discard(self, id_: int) -> None:
+        key, offset = id_ >> CHUNK_BITS, id_ & OFFSET_MASK
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            return
+        if isinstance(chunk, set):
+            chunk.discard(offset)
+        else:
+            chunk &= ~(1 << offset)
+            # Shrinking back to a set (with some hysteresis) keeps deletes
+            # from leaving dense bitmaps behind for nearly empty chunks.
+            if chunk.bit_count() <= SPARSE_LIMIT // 2:
+                chunk = set(offsets(chunk))
+            self.chunks[key] = chunk
+        if not chunk:
+            del self.chunks[key]
+
+    def chunk(self, key: int) -> int:
+        """
+        Chunk ``key`` as an ``int`` bitmap of offsets (0 when empty).
+        """
+        chunk = self.chunks.get(key, 0)
+        return to_int(chunk) if isinstance(chunk, set) else chunk
+
+
+def to_int(offsets: Iterable[int]) -> int:
+    # Setting bits in a buffer is linear; OR-ing shifted ints into a growing
+    # int would copy it once per offset.
+    buffer = bytearray(CHUNK_SIZE // 8)
+    for offset in offsets:
+        buffer[offset >> 3] |= 1 << (offset & 7)
+    return int.from_bytes(buffer, "little")
+
+
+def offsets(bits: int) -> Iterator[int]:
+    """
+    Set bit positions of ``bits``, highest first.
+    """
+    while bits:
+        offset = bits.bit_length() - 1
+        yield offset
+        bits ^= 1 << offset
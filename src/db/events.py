@@ -0,0 +1,37 @@
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from src.db.models.categories import Category
+from src.db.models.ingredients import Ingredient
+from src.db.models.recipes import Recipe, RecipeIngredient
+
+SYNCED_MODELS = (Recipe, Ingredient, Category)
+# Many-to-many collections whose changes also touch the rows on the far side.
+SECONDARY_COLLECTIONS = {Ingredient: "categories", Category: "ingredients"}
+
+
+@event.listens_for(Session, "before_flush")
+def bump_updated_at(session: Session, flush_context, instances) -> None:
+    """
+    Bump ``updated_at`` on parents whose association rows change
+    (``recipe_ingredients``, ``ingredient_category``), which a plain column
+    ``onupdate`` never sees, so delta sync picks them up.
+    """
+    touched = set()
+    for obj in session.dirty:
+        if not isinstance(obj, SYNCED_MODELS):
+            continue
+        if session.is_modified(obj, include_collections=True):
+            touched.add(obj)
+        collection = SECONDARY_COLLECTIONS.get(type(obj))
+        if collection:
+            history = inspect(obj).attrs[collection].history
+            touched.update(history.added, history.deleted)
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, RecipeIngredient):
+            recipe = inspect(obj).attrs.recipe.loaded_value
+            if isinstance(recipe, Recipe):
+                touched.add(recipe)
+    for obj in touched:
+        if obj not in session.new and obj not in session.deleted:
+            obj.updated_at = func.now()
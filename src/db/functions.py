@@ -0,0 +1,19 @@
+from sqlalchemy import ColumnElement, func, literal_column
+from sqlalchemy.dialects.postgresql import JSON
+
+
+def json_list(**columns: ColumnElement) -> ColumnElement:
+    """
+    ``coalesce(json_agg(json_build_object(...)), '[]')`` over ``columns``.
+
+    Meant for correlated scalar subqueries that fold child rows into a JSON
+    array, so a parent and its children come back in a single row.
+    """
+    pairs = []
+    for key, column in columns.items():
+        pairs.extend((literal_column(f"'{key}'"), column))
+    return func.coalesce(
+        func.json_agg(func.json_build_object(*pairs)),
+        literal_column("'[]'::json"),
+        type_=JSON,
+    )
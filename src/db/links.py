@@ -0,0 +1,77 @@
+"""
+Set-based writes to the ``ingredient_category`` association table.
+
+The ORM bumps ``updated_at`` on both sides of a changed collection (see
+``src.db.events``). These statements do the same in SQL, so delta sync still
+sees links written without loading either collection, and record an outbox
+``*.updated`` event for every ingredient and category involved.
+"""
+
+from sqlalchemy import CTE, ColumnElement, Select, delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from src.core.enums import EventType
+from src.db.models.categories import Category
+from src.db.models.ingredients import Ingredient, IngredientCategory
+from src.db.outbox import record_events
+
+links = IngredientCategory.__table__
+
+
+def add_links(pairs: Select) -> Select:
+    """
+    Insert the ``(ingredient_id, category_id)`` rows selected by ``pairs``,
+    skipping existing links; selects the number of links added.
+    """
+    added = (
+        insert(links)
+        .from_select(["ingredient_id", "category_id"], pairs)
+        .on_conflict_do_nothing()
+        .returning(links.c.ingredient_id, links.c.category_id)
+        .cte("added_links")
+    )
+    return touch_linked(added)
+
+
+def remove_links(*criteria: ColumnElement[bool]) -> Select:
+    """
+    Delete the links matching ``criteria``; selects the number removed.
+    """
+    removed = (
+        delete(links)
+        .where(*criteria)
+        .returning(links.c.ingredient_id, links.c.category_id)
+        .cte("removed_links")
+    )
+    return touch_linked(removed)
+
+
+def touch_linked(changed: CTE) -> Select:
+    # Rows created earlier in the same transaction carry created_at = now()
+    # and are already new to delta sync, so they are left alone.
+    ingredients = (
+        update(Ingredient)
+        .where(
+            Ingredient.id.in_(select(changed.c.ingredient_id)),
+            Ingredient.created_at < func.now(),
+        )
+        .values(updated_at=func.now())
+        .cte("touched_ingredients")
+    )
+    categories = (
+        update(Category)
+        .where(
+            Category.id.in_(select(changed.c.category_id)),
+            Category.created_at < func.now(),
+        )
+        .values(updated_at=func.now())
+        .cte("touched_categories")
+    )
+    events = (
+        record_events(EventType.INGREDIENT_UPDATED, changed.c.ingredient_id, True),
+        record_events(EventType.CATEGORY_UPDATED, changed.c.category_id, True),
+    )
+    return (
+        select(func.count())
+        .select_from(changed)
+        .add_cte(ingredients, categories, *events)
+    )
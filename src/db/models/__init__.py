@@ -1,2 +1,8 @@
 from src.db.models.users import User  # noqa: F401
 from src.db.models.ingredients import Ingredient  # noqa: F401
+from src.db.models.categories import Category  # noqa: F401
+from src.db.models.recipes import Recipe  # noqa: F401
+from src.db.models.tombstones import Tombstone  # noqa: F401
+from src.db.models.idempotency_keys import IdempotencyKey  # noqa: F401
+from src.db.models.outbox import OutboxEvent  # noqa: F401
+from src.db import events  # noqa: F401
@@ -1,7 +1,7 @@
 from typing import TYPE_CHECKING
-from src.db.base import Base, TimestampMixin
-from sqlalchemy import String
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from src.db.base import XID8, Base, TimestampMixin, normalize_name
+from sqlalchemy import Index, String, func
+from sqlalchemy.orm import Mapped, mapped_column, query_expression, relationship
 
 if TYPE_CHECKING:
     from src.db.models.ingredients import Ingredient
@@ -9,16 +9,42 @@ if TYPE_CHECKING:
 
 class Category(Base, TimestampMixin):
     __tablename__ = "categories"
+    __table_args__ = (
+        Index("ix_categories_created_at_id", "created_at", "id"),
+        Index("ix_categories_updated_at", "updated_at"),
+        Index("ix_categories_written_xid", "written_xid"),
+        Index(
+            "ix_categories_name_pattern",
+            "name",
+            postgresql_ops={"name": "text_pattern_ops"},
+        ),
+        # Fuzzy autocomplete; gin_trgm_ops comes from pg_trgm.
+        Index(
+            "ix_categories_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     _name: Mapped[str] = mapped_column(
         String(100), unique=True, nullable=False, name="name"
     )
+    # See ``Recipe.written_xid``.
+    written_xid: Mapped[int | None] = mapped_column(
+        XID8,
+        server_default=func.pg_current_xact_id(),
+        onupdate=func.pg_current_xact_id(),
+        deferred=True,
+    )
     ingredients: Mapped[list["Ingredient"]] = relationship(
         "Ingredient",
         secondary="ingredient_category",
         back_populates="categories",
     )
+    # Populated per query with ``with_expression`` on ``?include=ingredient_count``.
+    ingredient_count: Mapped[int | None] = query_expression()
 
     @property
     def name(self) -> str:
@@ -26,4 +52,4 @@ class Category(Base, TimestampMixin):
 
     @name.setter
     def name(self, value: str) -> None:
-        self._name = value.lower()
+        self._name = normalize_name(value)
@@ -1,6 +1,6 @@
 from typing import TYPE_CHECKING
-from src.db.base import Base, TimestampMixin
-from sqlalchemy import String, ForeignKey
+from src.db.base import XID8, Base, TimestampMixin, normalize_name
+from sqlalchemy import Index, String, ForeignKey, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 if TYPE_CHECKING:
@@ -10,11 +10,35 @@ if TYPE_CHECKING:
 
 class Ingredient(Base, TimestampMixin):
     __tablename__ = "ingredients"
+    __table_args__ = (
+        Index("ix_ingredients_created_at_id", "created_at", "id"),
+        Index("ix_ingredients_updated_at", "updated_at"),
+        Index("ix_ingredients_written_xid", "written_xid"),
+        Index(
+            "ix_ingredients_name_pattern",
+            "name",
+            postgresql_ops={"name": "text_pattern_ops"},
+        ),
+        # Fuzzy autocomplete; gin_trgm_ops comes from pg_trgm.
+        Index(
+            "ix_ingredients_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     _name: Mapped[str] = mapped_column(
         String(100), unique=True, nullable=False, name="name"
     )
+    # See ``Recipe.written_xid``.
+    written_xid: Mapped[int | None] = mapped_column(
+        XID8,
+        server_default=func.pg_current_xact_id(),
+        onupdate=func.pg_current_xact_id(),
+        deferred=True,
+    )
     is_vegan: Mapped[bool] = mapped_column(nullable=False, default=False)
     categories: Mapped[list["Category"]] = relationship(
         "Category",
@@ -39,7 +63,7 @@ class Ingredient(Base, TimestampMixin):
 
     @name.setter
     def name(self, value: str) -> None:
-        self._name = value.lower()
+        self._name = normalize_name(value)
 
     @property
     def category_ids(self) -> list[int]:
@@ -48,6 +72,15 @@ class Ingredient(Base, TimestampMixin):
 
 class IngredientCategory(Base):
     __tablename__ = "ingredient_category"
+    # The primary key leads with ingredient_id; this serves per-category
+    # counts and ordered first-N ingredient lookups.
+    __table_args__ = (
+        Index(
+            "ix_ingredient_category_category_id_ingredient_id",
+            "category_id",
+            "ingredient_id",
+        ),
+    )
 
     ingredient_id: Mapped[int] = mapped_column(
         ForeignKey("ingredients.id"), primary_key=True
@@ -1,6 +1,18 @@
+from datetime import datetime
 from typing import TYPE_CHECKING
-from src.db.base import Base, TimestampMixin
-from sqlalchemy import String, ForeignKey, Enum as sqlenum
+from src.db.base import XID8, Base, TimestampMixin, normalize_name
+from sqlalchemy import (
+    Computed,
+    DateTime,
+    Index,
+    String,
+    ForeignKey,
+    Text,
+    Enum as sqlenum,
+    func,
+    text,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.ext.associationproxy import association_proxy
 from src.db.models.users import User
@@ -10,13 +22,85 @@ if TYPE_CHECKING:
     from src.db.models.ingredients import Ingredient
 
 
+# Soft-deleted recipes keep their row until the purger removes it; live
+# queries and the name uniqueness only cover the rest.
+LIVE = text("deleted_at IS NULL")
+
+# Text search configuration of ``Recipe.search_vector``; queries must use the
+# same one to match it.
+SEARCH_CONFIG = "english"
+SEARCH_DOCUMENT = " || ".join(
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', {column}), '{weight}')"
+    for column, weight in (
+        ("name", "A"),
+        ("coalesce(ingredient_names, '')", "B"),
+        ("instructions", "C"),
+    )
+)
+
+
 class Recipe(Base, TimestampMixin):
     __tablename__ = "recipes"
+    __table_args__ = (
+        Index("ix_recipes_created_at_id", "created_at", "id", postgresql_where=LIVE),
+        Index("ix_recipes_updated_at", "updated_at"),
+        Index("ix_recipes_written_xid", "written_xid"),
+        # Composite indexes for the list filters: an equality column first,
+        # then the sort or range column, then ``id`` for the keyset.
+        Index(
+            "ix_recipes_user_id_created_at_id",
+            "user_id",
+            "created_at",
+            "id",
+            postgresql_where=LIVE,
+        ),
+        Index(
+            "ix_recipes_difficulty_level_cooking_time_id",
+            "difficulty_level",
+            "cooking_time",
+            "id",
+            postgresql_where=LIVE,
+        ),
+        Index(
+            "ix_recipes_cooking_time_id", "cooking_time", "id", postgresql_where=LIVE
+        ),
+        Index(
+            "ix_recipes_is_vegan_created_at_id",
+            "is_vegan",
+            "created_at",
+            "id",
+            postgresql_where=LIVE,
+        ),
+        Index("uq_recipes_name", "name", unique=True, postgresql_where=LIVE),
+        Index(
+            "ix_recipes_deleted_at",
+            "deleted_at",
+            postgresql_where=text("deleted_at IS NOT NULL"),
+        ),
+        Index(
+            "ix_recipes_name_pattern",
+            "name",
+            postgresql_ops={"name": "text_pattern_ops"},
+            postgresql_where=LIVE,
+        ),
+        # Fuzzy autocomplete; gin_trgm_ops comes from pg_trgm.
+        Index(
+            "ix_recipes_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+            postgresql_where=LIVE,
+        ),
+        Index(
+            "ix_recipes_search_vector",
+            "search_vector",
+            postgresql_using="gin",
+            postgresql_where=LIVE,
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    _name: Mapped[str] = mapped_column(
-        String(183), unique=True, nullable=False, name="name"
-    )
+    _name: Mapped[str] = mapped_column(String(183), nullable=False, name="name")
     cooking_time: Mapped[int] = mapped_column(nullable=False)
     difficulty_level: Mapped[DifficultyLevel] = mapped_column(
         sqlenum(DifficultyLevel), nullable=False
@@ -37,6 +121,25 @@ class Recipe(Base, TimestampMixin):
     )
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
     user: Mapped["User"] = relationship(back_populates="recipes")
+    deleted_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    # True when no ingredient is non-vegan; kept up to date by the writes
+    # through ``src.db.vegan``. No default, so a write path that forgets it
+    # fails instead of storing a wrong flag.
+    is_vegan: Mapped[bool] = mapped_column(nullable=False)
+    # Copy of the ingredient names for search, written with the recipe's
+    # lines and refreshed on ingredient renames (see ``src.db.search``).
+    ingredient_names: Mapped[str | None] = mapped_column(Text, deferred=True)
+    # Transaction that last wrote the row, so readers can catch up in commit
+    # order (see ``src.db.pantry``); NULL for rows older than the column.
+    written_xid: Mapped[int | None] = mapped_column(
+        XID8,
+        server_default=func.pg_current_xact_id(),
+        onupdate=func.pg_current_xact_id(),
+        deferred=True,
+    )
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR, Computed(SEARCH_DOCUMENT, persisted=True), deferred=True
+    )
     quantity = association_proxy(
         target_collection="recipe_ingredients", attr="quantity"
     )
@@ -47,7 +150,7 @@ class Recipe(Base, TimestampMixin):
 
     @name.setter
     def name(self, value: str) -> None:
-        self._name = value.lower()
+        self._name = normalize_name(value)
 
     @property
     def ingredient_ids(self) -> list[int]:
@@ -60,10 +163,6 @@ class Recipe(Base, TimestampMixin):
             for assoc in self.recipe_ingredients
         ]
 
-    @property
-    def is_vegan(self) -> bool:
-        return all(ingredient.is_vegan for ingredient in self.ingredients)
-
 
 class RecipeIngredient(Base):
     __tablename__ = "recipe_ingredients"
@@ -0,0 +1,28 @@
+from datetime import datetime
+from sqlalchemy import DateTime, Index, String
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+from src.db.base import XID8, Base
+
+
+class Tombstone(Base):
+    """
+    Record of a deleted row, kept so delta-sync clients learn about deletions.
+    """
+
+    __tablename__ = "tombstones"
+    __table_args__ = (
+        Index("ix_tombstones_deleted_at", "deleted_at"),
+        Index("ix_tombstones_written_xid", "written_xid"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    entity: Mapped[str] = mapped_column(String(20), nullable=False)
+    entity_id: Mapped[int] = mapped_column(nullable=False)
+    deleted_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    # See ``Recipe.written_xid``.
+    written_xid: Mapped[int | None] = mapped_column(
+        XID8, server_default=func.pg_current_xact_id()
+    )
@@ -0,0 +1,175 @@
+"""
+Transactional outbox.
+
+Repositories record an ``OutboxEvent`` in the same transaction as the write
+it describes, so an event exists exactly when its write committed. The
+``OutboxDispatcher`` drains the table in batches after the fact and hands
+each event to the handlers subscribed to its type. Delivery is at least
+once: an event is deleted only after every handler succeeded, and a failed
+event is retried later with exponential backoff, so handlers must be
+idempotent. Handlers get the dispatching connection, so database work they
+do commits together with the event's deletion.
+"""
+
+import asyncio
+from collections import defaultdict
+from collections.abc import Awaitable, Callable
+from datetime import timedelta
+from sqlalchemy import (
+    CTE,
+    ColumnElement,
+    Row,
+    any_,
+    delete,
+    func,
+    literal,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, BIGINT, insert
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+from src.core.enums import EventType
+from src.core.logging import logger
+from src.db.models.outbox import OutboxEvent
+
+outbox = OutboxEvent.__table__
+
+Handler = Callable[[AsyncConnection, Row], Awaitable[None]]
+handlers: defaultdict[str, list[Handler]] = defaultdict(list)
+
+MAX_RETRY_DELAY = timedelta(hours=1)
+
+
+def subscribe(*event_types: EventType) -> Callable[[Handler], Handler]:
+    """
+    Register an ``async def handler(connection, event)`` for the given event
+    types.
+    """
+
+    def register(handler: Handler) -> Handler:
+        for event_type in event_types:
+            handlers[event_type].append(handler)
+        return handler
+
+    return register
+
+
+def event(event_type: EventType, entity_id: int) -> OutboxEvent:
+    """
+    Event for an ORM write; add it to the session before committing.
+    """
+    return OutboxEvent(event_type=event_type, entity_id=entity_id)
+
+
+def record_events(
+    event_type: EventType, entity_id: ColumnElement, distinct: bool = False
+) -> CTE:
+    """
+    Data-modifying CTE recording one event per ``entity_id`` (typically
+    the id column of another CTE's ``RETURNING``), for Core writes that
+    should stay a single statement.
+    """
+    entity_ids = select(literal(event_type.value), entity_id)
+    if distinct:
+        entity_ids = entity_ids.distinct()
+    return (
+        insert(outbox)
+        .from_select(["event_type", "entity_id"], entity_ids)
+        .cte(f"{event_type.replace('.', '_')}_events")
+    )
+
+
+async def dispatch_events(
+    connection: AsyncConnection,
+    batch_size: int,
+    retry_delay: timedelta = timedelta(seconds=1),
+) -> int:
+    """
+    Deliver up to ``batch_size`` due events; returns how many were taken.
+
+    ``SKIP LOCKED`` lets several dispatchers (one per app worker) share the
+    table without delivering the same event twice at the same time.
+    """
+    rows = (
+        await connection.execute(
+            select(outbox)
+            .where(outbox.c.available_at <= func.now())
+            .order_by(outbox.c.available_at, outbox.c.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+    ).all()
+    delivered, failed = [], []
+    for row in rows:
+        try:
+            # A failed handler only rolls back its own event's work.
+            async with connection.begin_nested():
+                for handler in handlers.get(row.event_type, ()):
+                    await handler(connection, row)
+        except Exception as e:
+            logger.error(f"Outbox event {row.id} ({row.event_type}) failed: {e}")
+            failed.append(row.id)
+        else:
+            delivered.append(row.id)
+    if delivered:
+        await connection.execute(
+            delete(outbox).where(outbox.c.id == any_(literal(delivered, ARRAY(BIGINT))))
+        )
+    if failed:
+        backoff = func.least(
+            retry_delay.total_seconds() * func.power(2, outbox.c.attempts),
+            MAX_RETRY_DELAY.total_seconds(),
+        ) * literal(timedelta(seconds=1))
+        await connection.execute(
+            update(outbox)
+            .where(outbox.c.id == any_(literal(failed, ARRAY(BIGINT))))
+            .values(
+                attempts=outbox.c.attempts + 1,
+                available_at=func.now() + backoff,
+            )
+        )
+    return len(rows)
+
+
+class OutboxDispatcher:
+    def __init__(
+        self, engine: AsyncEngine, interval: float = 1.0, batch_size: int = 500
+    ):
+        self.engine = engine
+        self.interval = interval
+        self.batch_size = batch_size
+        self.task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self.task is None:
+            self.task = asyncio.create_task(self.run())
+
+    async def close(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    async def drain(self) -> int:
+        """
+        Dispatch batch after batch, each in its own transaction, until a
+        short batch says nothing is due.
+        """
+        total = 0
+        while True:
+            async with self.engine.begin() as connection:
+                taken = await dispatch_events(connection, self.batch_size)
+            total += taken
+            if taken < self.batch_size:
+                return total
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self.drain()
+            except Exception as e:
+                logger.error(f"Outbox dispatch failed: {e}")
+            await asyncio.sleep(self.interval)
@@ -0,0 +1,257 @@
+"""
+In-process index for "cook with what I have" pantry search.
+
+The index keeps a ``Bitmap`` of live recipe ids per ingredient and per
+ingredient count. A query adds the bitmaps of the pantry's ingredients into
+a bit-sliced counter, one id chunk at a time, so the counter holds for every
+recipe how many of its ingredients the pantry covers. Comparing that with
+the recipe's ingredient count gives how many it misses, for a whole chunk
+of recipes per big-int operation instead of one set comparison per recipe.
+
+Every worker process has its own index. It is loaded on start-up and then
+caught up at most every ``max_staleness`` seconds, so a write made by any
+worker shows up within that delay. Catching up goes by transaction id, not
+timestamp: a row's timestamps are taken when its transaction starts, which
+may be long before it commits. Each sync notes the oldest transaction still
+running (the xmin of its snapshot); every write it could not see comes from
+that one or a later one, so the next sync re-reads the recipes and
+tombstones whose ``written_xid`` is at least that.
+"""
+
+import asyncio
+from collections import defaultdict
+from collections.abc import Collection
+from time import monotonic
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from src.core.enums import SyncEntity
+from src.core.logging import logger
+from src.db.base import SNAPSHOT_XMIN
+from src.db.bitmaps import CHUNK_BITS, OFFSET_MASK, Bitmap, offsets
+from src.db.models.recipes import Recipe, RecipeIngredient
+from src.db.models.tombstones import Tombstone
+
+LOAD_BATCH_SIZE = 10_000
+
+recipes = Recipe.__table__
+lines = RecipeIngredient.__table__
+
+
+def add_bits(counter: list[int], bits: int) -> None:
+    """
+    Add one to every position set in ``bits`` of the bit-sliced ``counter``
+    (least significant slice first), rippling the carry upwards.
+    """
+    for index, slice_ in enumerate(counter):
+        counter[index] = slice_ ^ bits
+        bits &= slice_
+        if not bits:
+            return
+    if bits:
+        counter.append(bits)
+
+
+def equal_bits(counter: list[int], count: int) -> int:
+    """
+    Positions whose ``counter`` value is ``count`` (which must be positive).
+    """
+    if count >> len(counter):
+        return 0
+    bits = -1
+    for index, slice_ in enumerate(counter):
+        bits &= slice_ if count >> index & 1 else ~slice_
+    return bits
+
+
+class PantryIndex:
+    def __init__(self, max_staleness: float = 1.0):
+        self.max_staleness = max_staleness
+        self.recipes: dict[int, tuple[int, ...]] = {}
+        self.by_ingredient: dict[int, Bitmap] = {}
+        self.by_size: defaultdict[int, Bitmap] = defaultdict(Bitmap)
+        self.watermark: int | None = None
+        self.checked_at = float("-inf")
+        self.lock = asyncio.Lock()
+        self.task: asyncio.Task | None = None
+
+    def start(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+        """
+        Load the index in the background, so the first search does not.
+        """
+        if self.task is None:
+            self.task = asyncio.create_task(self.warm_up(session_factory))
+
+    async def close(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    async def warm_up(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+        try:
+            async with session_factory() as db:
+                await self.sync(db)
+        except Exception as e:
+            logger.error(f"Loading the pantry index failed: {e}")
+
+    def build(self, loaded: dict[int, list[int]]) -> None:
+        """
+        Replace the contents with ``loaded`` (recipe id -> ingredient ids),
+        building each bitmap in one pass rather than id by id.
+        """
+        by_ingredient: defaultdict[int, list[int]] = defaultdict(list)
+        by_size: defaultdict[int, list[int]] = defaultdict(list)
+        for recipe_id, ingredient_ids in loaded.items():
+            for ingredient_id in ingredient_ids:
+                by_ingredient[ingredient_id].append(recipe_id)
+            by_size[len(ingredient_ids)].append(recipe_id)
+        self.recipes = {
+            recipe_id: tuple(ingredient_ids)
+            for recipe_id, ingredient_ids in loaded.items()
+        }
+        self.by_ingredient = {key: Bitmap(ids) for key, ids in by_ingredient.items()}
+        self.by_size = defaultdict(
+            Bitmap, {size: Bitmap(ids) for size, ids in by_size.items()}
+        )
+
+    def put(self, recipe_id: int, ingredient_ids: Collection[int]) -> None:
+        self.remove(recipe_id)
+        if not ingredient_ids:
+            return
+        self.recipes[recipe_id] = tuple(ingredient_ids)
+        for ingredient_id in ingredient_ids:
+            self.by_ingredient.setdefault(ingredient_id, Bitmap()).add(recipe_id)
+        self.by_size[len(ingredient_ids)].add(recipe_id)
+
+    def remove(self, recipe_id: int) -> None:
+        ingredient_ids = self.recipes.pop(recipe_id, None)
+        if ingredient_ids is None:
+            return
+        for ingredient_id in ingredient_ids:
+            bitmap = self.by_ingredient[ingredient_id]
+            bitmap.discard(recipe_id)
+            if not bitmap.chunks:
+                del self.by_ingredient[ingredient_id]
+        self.by_size[len(ingredient_ids)].discard(recipe_id)
+
+    def match(self, pantry: Collection[int], max_missing: int) -> list[dict[int, int]]:
+        """
+        Recipes using at least one pantry ingredient and missing at most
+        ``max_missing``: for each missing count, the matching offsets of
+        every id chunk as an ``int`` bitmap.
+        """
+        bitmaps = [self.by_ingredient[i] for i in pantry if i in self.by_ingredient]
+        keys = set().union(*(bitmap.chunks for bitmap in bitmaps))
+        matches: list[dict[int, int]] = [{} for _ in range(max_missing + 1)]
+        for key in keys:
+            counter: list[int] = []
+            for bitmap in bitmaps:
+                add_bits(counter, bitmap.chunk(key))
+            covered: dict[int, int] = {}
+            for size, sized in self.by_size.items():
+                candidates = sized.chunk(key)
+                if not candidates:
+                    continue
+                for missing in range(min(max_missing, size - 1) + 1):
+                    count = size - missing
+                    if count not in covered:
+                        covered[count] = equal_bits(counter, count)
+                    if bits := candidates & covered[count]:
+                        matches[missing][key] = matches[missing].get(key, 0) | bits
+        return matches
+
+    def search(
+        self,
+        pantry: Collection[int],
+        max_missing: int,
+        limit: int,
+        after: tuple[int, int] | None = None,
+    ) -> list[tuple[int, int]]:
+        """
+        Up to ``limit`` ``(missing, recipe_id)`` pairs, fewest missing first
+        and newest first within that, after the ``after`` pair if given.
+        """
+        found = []
+        for missing, chunks in enumerate(self.match(pantry, max_missing)):
+            if after is not None and missing < after[0]:
+                continue
+            for key in sorted(chunks, reverse=True):
+                bits = chunks[key]
+                if after is not None and missing == after[0]:
+                    after_key, after_offset = (
+                        after[1] >> CHUNK_BITS,
+                        after[1] & OFFSET_MASK,
+                    )
+                    if key > after_key:
+                        continue
+                    if key == after_key:
+                        bits &= (1 << after_offset) - 1
+                for offset in offsets(bits):
+                    found.append((missing, key << CHUNK_BITS | offset))
+                    if len(found) == limit:
+                        return found
+        return found
+
+    async def sync(self, db: AsyncSession) -> None:
+        """
+        Load or catch up the index, unless it did so in the last
+        ``max_staleness`` seconds.
+        """
+        if monotonic() - self.checked_at < self.max_staleness:
+            return
+        async with self.lock:
+            if monotonic() - self.checked_at < self.max_staleness:
+                return
+            if self.watermark is None:
+                await self.load(db)
+            else:
+                await self.catch_up(db)
+            self.checked_at = monotonic()
+
+    async def load(self, db: AsyncSession) -> None:
+        # Taken before reading, in its own statement, so anything the read
+        # misses is at or above it.
+        watermark = await db.scalar(select(SNAPSHOT_XMIN))
+        query = (
+            select(lines.c.recipe_id, lines.c.ingredient_id)
+            .join(recipes, recipes.c.id == lines.c.recipe_id)
+            .where(recipes.c.deleted_at.is_(None))
+            .execution_options(yield_per=LOAD_BATCH_SIZE)
+        )
+        loaded: defaultdict[int, list[int]] = defaultdict(list)
+        async for recipe_id, ingredient_id in await db.stream(query):
+            loaded[recipe_id].append(ingredient_id)
+        self.build(loaded)
+        self.watermark = watermark
+        logger.info(f"Loaded the pantry index with {len(self.recipes)} recipes")
+
+    async def catch_up(self, db: AsyncSession) -> None:
+        watermark = await db.scalar(select(SNAPSHOT_XMIN))
+        ingredient_ids = (
+            select(func.array_agg(lines.c.ingredient_id))
+            .where(lines.c.recipe_id == recipes.c.id)
+            .scalar_subquery()
+        )
+        changed = await db.execute(
+            select(recipes.c.id, recipes.c.deleted_at, ingredient_ids).where(
+                recipes.c.written_xid >= self.watermark
+            )
+        )
+        for recipe_id, deleted_at, ingredient_ids in changed:
+            if deleted_at is None:
+                self.put(recipe_id, ingredient_ids or ())
+            else:
+                self.remove(recipe_id)
+        # Recipes purged before the index saw them soft-deleted.
+        deleted = await db.scalars(
+            select(Tombstone.entity_id).where(
+                Tombstone.entity == SyncEntity.RECIPE,
+                Tombstone.written_xid >= self.watermark,
+            )
+        )
+        for recipe_id in deleted:
+            self.remove(recipe_id)
+        self.watermark = watermark
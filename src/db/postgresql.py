@@ -1,19 +1,59 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from datetime import timedelta
+from functools import partial
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from src.core.config import config
+from src.db.batching import WriteBatcher
+from src.db import search  # noqa: F401  (registers its outbox handlers)
+from src.db.outbox import OutboxDispatcher
+from src.db.pantry import PantryIndex
+from src.db.purge import Purger, purge_idempotency_keys, purge_recipes
 
 database_url = (
-    f"postgresql+psycopg2://{config.POSTGRES_USER}:{config.POSTGRES_PASSWORD}"
+    f"postgresql+asyncpg://{config.POSTGRES_USER}:{config.POSTGRES_PASSWORD}"
     f"@{config.POSTGRES_HOST}:{config.POSTGRES_PORT}/{config.POSTGRES_DB}"
 )
 
-engine = create_engine(database_url, pool_pre_ping=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+engine = create_async_engine(database_url, pool_pre_ping=True)
+SessionLocal = async_sessionmaker(
+    bind=engine, autoflush=False, expire_on_commit=False, class_=AsyncSession
+)
+write_batcher = (
+    WriteBatcher(
+        SessionLocal,
+        max_batch_size=config.WRITE_BATCH_MAX_SIZE,
+        max_wait=config.WRITE_BATCH_MAX_WAIT_MS / 1000,
+    )
+    if config.WRITE_BATCHING
+    else None
+)
+purger = (
+    Purger(
+        engine,
+        jobs={
+            "deleted recipes": partial(
+                purge_recipes,
+                retention=timedelta(seconds=config.RECIPE_PURGE_RETENTION_SECONDS),
+            ),
+            "expired idempotency keys": purge_idempotency_keys,
+        },
+        interval=config.PURGE_INTERVAL_SECONDS,
+        batch_size=config.PURGE_BATCH_SIZE,
+    )
+    if config.PURGE_INTERVAL_SECONDS > 0
+    else None
+)
+outbox_dispatcher = (
+    OutboxDispatcher(
+        engine,
+        interval=config.OUTBOX_POLL_INTERVAL_SECONDS,
+        batch_size=config.OUTBOX_BATCH_SIZE,
+    )
+    if config.OUTBOX_POLL_INTERVAL_SECONDS > 0
+    else None
+)
+pantry_index = PantryIndex(max_staleness=config.PANTRY_INDEX_MAX_STALENESS_SECONDS)
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
@@ -0,0 +1,118 @@
+"""
+Background clean-up of rows the request path leaves behind.
+
+``DELETE /recipes/{id}`` only sets ``deleted_at`` and idempotency keys simply
+expire; ``Purger`` removes those rows later, in set-based batches that each
+commit on their own so locks stay short and requests never pay for it.
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from datetime import timedelta
+from sqlalchemy import delete, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+from src.core.logging import logger
+from src.db.models.idempotency_keys import IdempotencyKey
+from src.db.models.recipes import Recipe, RecipeIngredient
+
+# (connection, batch_size) -> number of rows purged
+PurgeJob = Callable[[AsyncConnection, int], Awaitable[int]]
+
+
+async def purge_recipes(
+    connection: AsyncConnection, batch_size: int, retention: timedelta
+) -> int:
+    """
+    Hard-delete up to ``batch_size`` recipes soft-deleted more than
+    ``retention`` ago, with their lines, in one statement.
+    """
+    recipes = Recipe.__table__
+    lines = RecipeIngredient.__table__
+    # SKIP LOCKED lets several purgers (one per app worker) split the work.
+    doomed = (
+        select(recipes.c.id)
+        .where(recipes.c.deleted_at < func.now() - retention)
+        .order_by(recipes.c.deleted_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .cte("doomed")
+    )
+    purged_lines = (
+        delete(lines)
+        .where(lines.c.recipe_id.in_(select(doomed.c.id)))
+        .cte("purged_lines")
+    )
+    purged = (
+        delete(recipes)
+        .where(recipes.c.id.in_(select(doomed.c.id)))
+        .returning(recipes.c.id)
+        .cte("purged_recipes")
+    )
+    query = select(func.count()).select_from(purged).add_cte(purged_lines)
+    return await connection.scalar(query)
+
+
+async def purge_idempotency_keys(connection: AsyncConnection, batch_size: int) -> int:
+    """
+    Delete up to ``batch_size`` expired idempotency keys.
+    """
+    keys = IdempotencyKey.__table__
+    expired = (
+        select(keys.c.scope, keys.c.key)
+        .where(keys.c.expires_at <= func.now())
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    query = delete(keys).where(tuple_(keys.c.scope, keys.c.key).in_(expired))
+    return (await connection.execute(query)).rowcount
+
+
+class Purger:
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        jobs: dict[str, PurgeJob],
+        interval: float = 60.0,
+        batch_size: int = 1000,
+    ):
+        self.engine = engine
+        self.jobs = jobs
+        self.interval = interval
+        self.batch_size = batch_size
+        self.task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self.task is None:
+            self.task = asyncio.create_task(self.run())
+
+    async def close(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    async def purge(self, job: PurgeJob) -> int:
+        """
+        Run ``job`` batch after batch until a short batch says nothing is left.
+        """
+        total = 0
+        while True:
+            async with self.engine.begin() as connection:
+                purged = await job(connection, self.batch_size)
+            total += purged
+            if purged < self.batch_size:
+                return total
+
+    async def run(self) -> None:
+        while True:
+            for name, job in self.jobs.items():
+                try:
+                    purged = await self.purge(job)
+                    if purged:
+                        logger.info(f"Purged {purged} {name}")
+                except Exception as e:
+                    logger.error(f"Purging {name} failed: {e}")
+            await asyncio.sleep(self.interval)
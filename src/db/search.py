@@ -0,0 +1,65 @@
+"""
+Upkeep of the recipe full-text search document.
+
+``recipes.search_vector`` is generated from the recipe's own columns, so the
+ingredient names it covers are copied into ``recipes.ingredient_names``.
+Recipe writes fill that copy in the statement that writes the lines, with
+``ingredient_names``; an ingredient rename reaches the recipes using it
+through the outbox handler below, shortly after it commits.
+"""
+
+from sqlalchemy import (
+    ColumnElement,
+    Row,
+    ScalarSelect,
+    Update,
+    func,
+    literal,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncConnection
+from src.core.enums import EventType
+from src.db.models.ingredients import Ingredient
+from src.db.models.recipes import Recipe, RecipeIngredient
+from src.db.outbox import subscribe
+
+recipes = Recipe.__table__
+lines = RecipeIngredient.__table__
+ingredients = Ingredient.__table__
+
+
+def join_names(name: ColumnElement[str]) -> ColumnElement[str]:
+    """
+    ``string_agg`` of ``name`` as stored in ``recipes.ingredient_names``:
+    space separated, in code point order, so Python's ``sorted`` agrees.
+    """
+    return func.string_agg(name, aggregate_order_by(literal(" "), name.collate("C")))
+
+
+def recipe_ingredient_names(recipe_id: ColumnElement[int]) -> ScalarSelect:
+    return (
+        select(join_names(ingredients.c.name))
+        .select_from(lines.join(ingredients))
+        .where(lines.c.recipe_id == recipe_id)
+        .scalar_subquery()
+    )
+
+
+def refresh_ingredient_names(*criteria: ColumnElement[bool]) -> Update:
+    names = recipe_ingredient_names(recipes.c.id)
+    # Rewriting an unchanged row would still rebuild its vector and index
+    # entries, so only rows whose names differ are touched. updated_at is
+    # kept: the names are derived data, not a change to the recipe.
+    return (
+        update(recipes)
+        .where(*criteria, recipes.c.ingredient_names.is_distinct_from(names))
+        .values(ingredient_names=names, updated_at=recipes.c.updated_at)
+    )
+
+
+@subscribe(EventType.INGREDIENT_UPDATED)
+async def refresh_ingredient_recipes(connection: AsyncConnection, event: Row) -> None:
+    using = select(lines.c.recipe_id).where(lines.c.ingredient_id == event.entity_id)
+    await connection.execute(refresh_ingredient_names(recipes.c.id.in_(using)))
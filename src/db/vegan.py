@@ -0,0 +1,70 @@
+"""
+Upkeep of ``recipes.is_vegan``.
+
+A recipe is vegan when none of its ingredients is non-vegan, so also when it
+has none. Recipe writes set the flag from the ingredients they read ``FOR
+SHARE``; writes that flip ``ingredients.is_vegan`` then refresh the recipes
+using those ingredients with one set-based UPDATE. The share lock conflicts
+with the ingredient update's row lock, so whichever transaction comes second
+waits for the other to commit and sees its write.
+"""
+
+from sqlalchemy import (
+    ColumnElement,
+    Exists,
+    Select,
+    Update,
+    exists,
+    func,
+    select,
+    update,
+)
+from src.core.enums import EventType
+from src.db.models.ingredients import Ingredient
+from src.db.models.recipes import Recipe, RecipeIngredient
+from src.db.outbox import record_events
+
+recipes = Recipe.__table__
+lines = RecipeIngredient.__table__
+ingredients = Ingredient.__table__
+
+
+def has_non_vegan_ingredient(recipe_id: ColumnElement[int]) -> Exists:
+    return exists().where(
+        lines.c.recipe_id == recipe_id,
+        lines.c.ingredient_id == ingredients.c.id,
+        ingredients.c.is_vegan.is_(False),
+    )
+
+
+def refresh_vegan(*criteria: ColumnElement[bool]) -> Update:
+    """
+    Recompute ``is_vegan`` for the recipes matching ``criteria``, writing
+    (and bumping ``updated_at`` for delta sync) only rows whose flag
+    changes.
+    """
+    is_vegan = ~has_non_vegan_ingredient(recipes.c.id)
+    return (
+        update(recipes)
+        .where(*criteria, recipes.c.is_vegan != is_vegan)
+        .values(is_vegan=is_vegan, updated_at=func.now())
+    )
+
+
+def refresh_recipes_using(ingredient_ids: Select | list[int]) -> Select:
+    """
+    Refresh the live recipes using any of ``ingredient_ids`` and record a
+    ``recipe.updated`` event for each one that changed; selects how many
+    did.
+    """
+    using = select(lines.c.recipe_id).where(lines.c.ingredient_id.in_(ingredient_ids))
+    refreshed = (
+        refresh_vegan(recipes.c.id.in_(using), recipes.c.deleted_at.is_(None))
+        .returning(recipes.c.id)
+        .cte("vegan_refreshed")
+    )
+    return (
+        select(func.count())
+        .select_from(refreshed)
+        .add_cte(record_events(EventType.RECIPE_UPDATED, refreshed.c.id))
+    )
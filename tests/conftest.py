@@ -1,12 +1,12 @@
 from __future__ import annotations
-from typing import Generator
+from typing import AsyncGenerator, Generator
 from uuid import uuid4
 
 import pytest
-from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.engine import Engine
-from sqlalchemy.orm import sessionmaker, Session
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
 from alembic.config import Config
 from alembic import command
 from testcontainers.postgres import PostgresContainer
@@ -14,9 +14,17 @@ from testcontainers.postgres import PostgresContainer
 from main import app as fastapi_app
 
 
+@pytest.fixture(scope="session")
+def anyio_backend() -> str:
+    return "asyncio"
+
+
 @pytest.fixture()
-def client() -> Generator[TestClient, None, None]:
-    with TestClient(fastapi_app) as c:
+async def client() -> AsyncGenerator[AsyncClient, None]:
+    transport = ASGITransport(app=fastapi_app)
+    async with AsyncClient(
+        transport=transport, base_url="http://test", follow_redirects=True
+    ) as c:
         yield c
 
 
@@ -37,51 +45,59 @@ def pg_url(_pg_container) -> str:
 
 
 @pytest.fixture(scope="session")
-def engine(pg_url: str):
-    engine = create_engine(pg_url, pool_pre_ping=True, future=True)
-
+def engine(pg_url: str) -> AsyncEngine:
+    # Alembic keeps running on the sync psycopg2 driver; the app uses asyncpg.
     cfg = Config("./alembic.ini")
     cfg.set_main_option("sqlalchemy.url", pg_url)
     cfg.set_main_option("script_location", "alembic")
 
     command.upgrade(cfg, "head")
 
-    return engine
-
-
-@pytest.fixture(scope="session")
-def session_factory(engine: Engine):
-    return sessionmaker(
-        bind=engine,
-        expire_on_commit=False,
-        autoflush=False,
-        autocommit=False,
-        class_=Session,
-    )
+    async_url = pg_url.replace("+psycopg2", "+asyncpg")
+    return create_async_engine(async_url, poolclass=NullPool)
 
 
 @pytest.fixture()
-def db(session_factory) -> Generator[Session, None, None]:
+async def db(engine: AsyncEngine) -> AsyncGenerator[AsyncSession, None]:
     """
     Per-test DB session wrapped in a transaction.
     Everything is rolled back after each test for isolation & speed.
     """
-    connection = session_factory.kw["bind"].connect()
-    trans = connection.begin()
-    try:
-        session: Session = session_factory(bind=connection)
-        yield session
-    finally:
-        session.close()
-        trans.rollback()
-        connection.close()
+    async with engine.connect() as connection:
+        trans = await connection.begin()
+        session = AsyncSession(
+            bind=connection,
+            expire_on_commit=False,
+            autoflush=False,
+            join_transaction_mode="create_savepoint",
+        )
+        try:
+            yield session
+        finally:
+            await session.close()
+            await trans.rollback()
+
+
+@pytest.fixture()
+def query_counter(engine: AsyncEngine) -> Generator[list[str], None, None]:
+    """
+    Collects every SQL statement executed while the test runs.
+    """
+    statements: list[str] = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _record)
+    yield statements
+    event.remove(engine.sync_engine, "before_cursor_execute", _record)
 
 
 @pytest.fixture(autouse=True)
-def override_get_db(db: Session):
+def override_get_db(db: AsyncSession):
     from src.core.dependencies import get_db as app_get_db
 
-    def _override():
+    async def _override():
         yield db
 
     fastapi_app.dependency_overrides[app_get_db] = _override
@@ -90,7 +106,7 @@ def override_get_db(db: Session):
 
 
 @pytest.fixture()
-def user(db: Session):
+async def user(db: AsyncSession):
     from src.db.models.users import User
     from src.core.security import hash_password
     from tests.factories import make_user_payload
@@ -105,7 +121,7 @@ def user(db: Session):
         hashed_password=hashed_password,
     )
     db.add(row)
-    db.flush()
+    await db.flush()
     return row
 
 
@@ -115,7 +131,7 @@ def user_factory(db):
     from src.core.security import hash_password
     from tests.factories import make_user_payload
 
-    def _create(**overrides):
+    async def _create(**overrides):
         payload = make_user_payload(**overrides)
         row = User(
             username=payload.username,
@@ -125,28 +141,28 @@ def user_factory(db):
             hashed_password=hash_password(payload.password),
         )
         db.add(row)
-        db.flush()
+        await db.flush()
         return row
 
     return _create
 
 
 @pytest.fixture()
-def ingredient(db: Session, category_factory):
+async def ingredient(db: AsyncSession, category_factory):
     from src.db.models.ingredients import Ingredient
     from tests.factories import make_ingredient_payload
 
-    categories = [category_factory(), category_factory()]
+    categories = [await category_factory(), await category_factory()]
     categories_ids = [cat.id for cat in categories]
     categories_names = [cat.name for cat in categories]
     payload = make_ingredient_payload(
         categories_ids=categories_ids, categories_names=categories_names
     )
     ingredient = Ingredient(name=payload.name, is_vegan=payload.is_vegan)
-    categories = [category_factory(), category_factory()]
+    categories = [await category_factory(), await category_factory()]
     ingredient.categories = categories
     db.add(ingredient)
-    db.flush()
+    await db.flush()
     return ingredient
 
 
@@ -155,8 +171,8 @@ def ingredient_factory(db, category_factory):
     from src.db.models.ingredients import Ingredient
     from tests.factories import make_ingredient_payload
 
-    def _create(**overrides):
-        categories = [category_factory() for _ in range(2)]
+    async def _create(**overrides):
+        categories = [await category_factory() for _ in range(2)]
         categories_ids = [cat.id for cat in categories]
         categories_names = [cat.name for cat in categories]
 
@@ -170,18 +186,18 @@ def ingredient_factory(db, category_factory):
             name=payload.name, is_vegan=payload.is_vegan, categories=categories
         )
         db.add(ingredient)
-        db.flush()
+        await db.flush()
         return ingredient
 
     return _create
 
 
 @pytest.fixture()
-def recipe(db: Session, user, ingredient_factory):
+async def recipe(db: AsyncSession, user, ingredient_factory):
     from src.db.models.recipes import Recipe, RecipeIngredient
     from src.api.recipes.enums import DifficultyLevel
 
-    ingredients = [ingredient_factory(), ingredient_factory()]
+    ingredients = [await ingredient_factory(), await ingredient_factory()]
     recipe = Recipe(
         name=f"recipe-{uuid4().hex[:6]}",
         cooking_time=30,
@@ -190,26 +206,29 @@ def recipe(db: Session, user, ingredient_factory):
         instructions="Mix everything",
         user=user,
         user_id=user.id,
+        is_vegan=all(ingredient.is_vegan for ingredient in ingredients),
     )
     recipe.recipe_ingredients = [
         RecipeIngredient(ingredient=ingredient, quantity=qty)
         for ingredient, qty in zip(ingredients, ["200 g", "1 cup"], strict=True)
     ]
     db.add(recipe)
-    db.flush()
+    await db.flush()
+    await db.refresh(recipe, ["ingredients"])
     return recipe
 
 
 @pytest.fixture()
-def recipe_factory(db: Session, user_factory, ingredient_factory):
+def recipe_factory(db: AsyncSession, user_factory, ingredient_factory):
     from src.db.models.recipes import Recipe, RecipeIngredient
     from src.api.recipes.enums import DifficultyLevel
 
-    def _create(**overrides):
-        user = overrides.pop("user", user_factory())
-        ingredients = overrides.pop(
-            "ingredients", [ingredient_factory(), ingredient_factory()]
-        )
+    async def _create(**overrides):
+        user = overrides.pop("user", None) or await user_factory()
+        ingredients = overrides.pop("ingredients", None) or [
+            await ingredient_factory(),
+            await ingredient_factory(),
+        ]
         quantities = overrides.pop(
             "quantities", ["1 unit" for _ in range(len(ingredients))]
         )
@@ -221,6 +240,7 @@ def recipe_factory(db: Session, user_factory, ingredient_factory):
             "instructions": overrides.pop("instructions", "Mix well"),
             "user": user,
             "user_id": user.id,
+            "is_vegan": all(ingredient.is_vegan for ingredient in ingredients),
         }
         data.update(overrides)
         recipe = Recipe(**data)
@@ -229,14 +249,36 @@ def recipe_factory(db: Session, user_factory, ingredient_factory):
             for ingredient, qty in zip(ingredients, quantities, strict=True)
         ]
         db.add(recipe)
-        db.flush()
+        await db.flush()
+        await db.refresh(recipe, ["ingredients"])
         return recipe
 
     return _create
 
 
 @pytest.fixture()
-def category(db: Session):
+def recipe_via_api(client: AsyncClient, user):
+    """
+    Creates a recipe of ``user`` from ``ingredients`` through ``POST
+    /recipes`` and returns the response body.
+    """
+    from tests.factories import make_recipe_payload
+
+    async def _create(*ingredients, **overrides) -> dict:
+        payload = make_recipe_payload(
+            user_id=user.id,
+            ingredient_ids=[ingredient.id for ingredient in ingredients],
+            **overrides,
+        )
+        resp = await client.post("/recipes", json=payload.model_dump(mode="json"))
+        assert resp.status_code == 201, resp.json()
+        return resp.json()
+
+    return _create
+
+
+@pytest.fixture()
+async def category(db: AsyncSession):
     from src.db.models.categories import Category
     from tests.factories import make_category_payload
 
@@ -245,7 +287,7 @@ def category(db: Session):
         name=payload.name,
     )
     db.add(row)
-    db.flush()
+    await db.flush()
     return row
 
 
@@ -254,13 +296,13 @@ def category_factory(db):
     from src.db.models.categories import Category
     from tests.factories import make_category_payload
 
-    def _create(**overrides):
+    async def _create(**overrides):
         payload = make_category_payload(**overrides)
         row = Category(
             name=payload.name,
         )
         db.add(row)
-        db.flush()
+        await db.flush()
         return row
 
     return _create
@@ -0,0 +1,101 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+import pytest
+from httpx import AsyncClient
+from src.api.common.autocomplete import successor
+from src.api.ingredients.services import ingredient_names
+from src.api.recipes.services import recipe_names
+
+
+@pytest.mark.anyio
+async def test_successor():
+    assert successor("tom") == "ton"
+    assert successor("a\ud7ff") == "a\ue000"
+
+
+@pytest.mark.anyio
+async def test_autocomplete_ingredients(
+    client: AsyncClient, ingredient_factory, query_counter
+):
+    prefix = f"zq{uuid4().hex[:6]}"
+    for suffix in ["tomato", "basil", "carrot"]:
+        await ingredient_factory(name=f"{prefix} {suffix}")
+    await ingredient_factory(name=f"{prefix[:-1]}x other")
+    ingredient_names.cache.clear()
+
+    resp = await client.get(
+        "/ingredients/autocomplete", params={"prefix": prefix.upper(), "limit": 2}
+    )
+    assert resp.status_code == 200
+    items = resp.json()["items"]
+    assert [item["name"] for item in items] == [
+        f"{prefix} basil".capitalize(),
+        f"{prefix} carrot".capitalize(),
+    ]
+    assert not any(item["fuzzy"] for item in items)
+
+    # The same prefix is answered from the cache.
+    query_counter.clear()
+    resp = await client.get(
+        "/ingredients/autocomplete", params={"prefix": prefix, "limit": 2}
+    )
+    assert resp.json()["items"] == items
+    assert not [s for s in query_counter if "SAVEPOINT" not in s]
+
+
+@pytest.mark.anyio
+async def test_autocomplete_validates_params(client: AsyncClient):
+    resp = await client.get("/categories/autocomplete", params={"prefix": ""})
+    assert resp.status_code == 422
+    resp = await client.get(
+        "/categories/autocomplete", params={"prefix": "a", "limit": 1000}
+    )
+    assert resp.status_code == 422
+
+
+@pytest.mark.anyio
+async def test_autocomplete_recipes_skips_deleted(
+    client: AsyncClient, db, recipe_factory
+):
+    prefix = f"zq{uuid4().hex[:6]}"
+    live = await recipe_factory(name=f"{prefix} soup")
+    deleted = await recipe_factory(name=f"{prefix} stew")
+    deleted.deleted_at = datetime.now(timezone.utc)
+    await db.flush()
+    recipe_names.cache.clear()
+
+    resp = await client.get("/recipes/autocomplete", params={"prefix": prefix})
+    assert [item["id"] for item in resp.json()["items"]] == [live.id]
+
+
+@pytest.mark.anyio
+async def test_autocomplete_fuzzy(client: AsyncClient, ingredient_factory):
+    name = f"zq{uuid4().hex[:6]} tomato"
+    ingredient = await ingredient_factory(name=name)
+    ingredient_names.cache.clear()
+
+    typo = name.replace("tomato", "tomatp")
+    resp = await client.get("/ingredients/autocomplete", params={"prefix": typo})
+    assert resp.json()["items"] == [
+        {"id": ingredient.id, "name": name.capitalize(), "fuzzy": True}
+    ]
+
+
+@pytest.mark.anyio
+async def test_autocomplete_cache_follows_writes(client: AsyncClient, category):
+    prefix = f"zq{uuid4().hex[:6]}"
+    params = {"prefix": prefix}
+    assert (await client.get("/categories/autocomplete", params=params)).json() == {
+        "items": []
+    }
+
+    resp = await client.post("/categories", json={"name": f"{prefix} herbs"})
+    assert resp.status_code == 201
+    created = resp.json()["id"]
+    resp = await client.get("/categories/autocomplete", params=params)
+    assert [item["id"] for item in resp.json()["items"]] == [created]
+
+    resp = await client.put(f"/categories/{category.id}", json={"name": f"{prefix} x"})
+    assert resp.status_code == 200
+    resp = await client.get("/categories/autocomplete", params=params)
+    assert [item["id"] for item in resp.json()["items"]] == [created, category.id]
@@ -0,0 +1,46 @@
+import asyncio
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.api.categories.schemas import CreateCategorySchema, GetCategorySchema
+from src.api.categories.services import CategoryRepository
+from src.core.exceptions import ErrorException
+from src.db.batching import WriteBatcher
+from src.db.models.categories import Category
+
+
+@pytest.mark.anyio
+async def test_write_batcher_group_commits(db: AsyncSession, category: Category):
+    connection = await db.connection()
+    sessions: list[AsyncSession] = []
+
+    def session_factory() -> AsyncSession:
+        session = AsyncSession(
+            bind=connection,
+            expire_on_commit=False,
+            join_transaction_mode="create_savepoint",
+        )
+        sessions.append(session)
+        return session
+
+    batcher = WriteBatcher(session_factory, max_batch_size=10, max_wait=0.05)
+    repository = CategoryRepository(db, batcher=batcher)
+    names = ["batched-a", category.name, "batched-b"]
+    results = await asyncio.gather(
+        *(
+            repository.create_category(CreateCategorySchema(name=name))
+            for name in names
+        ),
+        return_exceptions=True,
+    )
+    await batcher.close()
+
+    assert len(sessions) == 1
+    created, conflict, other = results
+    assert isinstance(created, GetCategorySchema)
+    assert isinstance(other, GetCategorySchema)
+    assert isinstance(conflict, ErrorException)
+    assert conflict.code == 409
+    # The conflict's savepoint is rolled back on its own; the batch commits.
+    repository = CategoryRepository(db)
+    batch = await repository.get_categories_by_ids([created.id, other.id])
+    assert [item.name for item in batch.items] == ["batched-a", "batched-b"]
@@ -1,13 +1,15 @@
 import pytest
+from src.api.common.schemas import PageParams
+from src.api.categories.services import CategoryRepository
 from src.db.models.categories import Category
 from tests.factories import make_category_payload
-from fastapi.testclient import TestClient
+from httpx import AsyncClient
 
 
 @pytest.mark.anyio
-def test_create_category(client: TestClient):
+async def test_create_category(client: AsyncClient):
     payload = make_category_payload()
-    resp = client.post("/categories", json=payload.model_dump())
+    resp = await client.post("/categories", json=payload.model_dump())
     assert resp.status_code == 201
     data = resp.json()
     assert data["name"] == payload.name.capitalize()
@@ -15,8 +17,14 @@ def test_create_category(client: TestClient):
 
 
 @pytest.mark.anyio
-def test_get_category(client: TestClient, category: Category):
-    resp = client.get(f"/categories/{category.id}")
+async def test_create_category_conflict(client: AsyncClient, category: Category):
+    resp = await client.post("/categories", json={"name": category.name.upper()})
+    assert resp.status_code == 409
+
+
+@pytest.mark.anyio
+async def test_get_category(client: AsyncClient, category: Category):
+    resp = await client.get(f"/categories/{category.id}")
     assert resp.status_code == 200
     data = resp.json()
     assert data["id"] == category.id
@@ -24,21 +32,165 @@ def test_get_category(client: TestClient, category: Category):
 
 
 @pytest.mark.anyio
-def test_list_categories(client: TestClient, category_factory: callable):
-    c1 = category_factory()
-    c2 = category_factory()
-    resp = client.get("/categories")
+async def test_list_categories(client: AsyncClient, category_factory: callable):
+    c1 = await category_factory()
+    c2 = await category_factory()
+    resp = await client.get("/categories")
     assert resp.status_code == 200
-    assert len(resp.json()) == 2
-    ids = {c["id"] for c in resp.json()}
+    items = resp.json()["items"]
+    assert len(items) == 2
+    ids = {c["id"] for c in items}
     assert ids == {c1.id, c2.id}
 
 
 @pytest.mark.anyio
-def test_update_category(client: TestClient, category: Category):
+async def test_list_categories_by_ids(client: AsyncClient, category_factory: callable):
+    c1 = await category_factory()
+    c2 = await category_factory()
+
+    resp = await client.get("/categories", params={"ids": f"{c2.id},{c1.id},0"})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert [item["id"] for item in data["items"]] == [c2.id, c1.id]
+    assert data["missing_ids"] == [0]
+
+
+@pytest.mark.anyio
+async def test_get_category_include_controls_embedding(
+    client: AsyncClient, ingredient_factory: callable
+):
+    ingredient = await ingredient_factory()
+    category = ingredient.categories[0]
+
+    resp = await client.get(f"/categories/{category.id}")
+    assert resp.json()["ingredients"] == [
+        {"id": ingredient.id, "name": ingredient.name}
+    ]
+
+    resp = await client.get(f"/categories/{category.id}", params={"include": ""})
+    assert resp.status_code == 200
+    assert "ingredients" not in resp.json()
+    assert resp.json()["id"] == category.id
+
+
+@pytest.mark.anyio
+async def test_list_categories_ingredient_count_only(
+    client: AsyncClient, db, category_factory: callable
+):
+    from src.db.models.ingredients import Ingredient
+
+    busy = await category_factory()
+    empty = await category_factory()
+    for n in range(3):
+        db.add(
+            Ingredient(name=f"count-{busy.id}-{n}", is_vegan=True, categories=[busy])
+        )
+    await db.flush()
+
+    resp = await client.get(
+        "/categories",
+        params={"ids": f"{busy.id},{empty.id}", "include": "ingredient_count"},
+    )
+    assert resp.status_code == 200
+    items = resp.json()["items"]
+    assert [item["ingredient_count"] for item in items] == [3, 0]
+    assert all("ingredients" not in item for item in items)
+
+
+@pytest.mark.anyio
+async def test_get_category_first_ingredients_with_cursor(
+    client: AsyncClient, db, category: Category
+):
+    from src.db.models.ingredients import Ingredient
+
+    ingredients = [
+        Ingredient(
+            name=f"first-{category.id}-{n}", is_vegan=True, categories=[category]
+        )
+        for n in range(5)
+    ]
+    db.add_all(ingredients)
+    await db.flush()
+    expected = [{"id": i.id, "name": i.name} for i in ingredients]
+
+    resp = await client.get(
+        f"/categories/{category.id}", params={"ingredients_limit": 2}
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["ingredients"] == expected[:2]
+
+    resp = await client.get(
+        f"/categories/{category.id}/ingredients",
+        params={"cursor": data["ingredients_next_cursor"]},
+    )
+    assert resp.status_code == 200
+    assert resp.json() == {"items": expected[2:], "next_cursor": None}
+
+    resp = await client.get("/categories/0/ingredients")
+    assert resp.status_code == 404
+
+
+@pytest.mark.anyio
+async def test_update_category(client: AsyncClient, category: Category):
     new_payload = make_category_payload()
-    resp = client.put(f"/categories/{category.id}", json=new_payload.model_dump())
+    resp = await client.put(f"/categories/{category.id}", json=new_payload.model_dump())
     assert resp.status_code == 200
     data = resp.json()
     assert data["id"] == category.id
     assert data["name"] == new_payload.name.capitalize()
+
+
+@pytest.mark.anyio
+async def test_add_category_ingredients(
+    client: AsyncClient, category: Category, ingredient_factory: callable
+):
+    ingredients = [await ingredient_factory() for _ in range(3)]
+    ids = [ingredient.id for ingredient in ingredients]
+
+    resp = await client.post(
+        f"/categories/{category.id}/ingredients", json={"ids": ids}
+    )
+    assert resp.status_code == 200
+    assert resp.json() == {"added": 3, "ingredient_count": 3}
+
+    resp = await client.post(
+        f"/categories/{category.id}/ingredients", json={"ids": ids[:2]}
+    )
+    assert resp.status_code == 200
+    assert resp.json() == {"added": 0, "ingredient_count": 3}
+
+    resp = await client.get(f"/categories/{category.id}")
+    assert sorted(i["id"] for i in resp.json()["ingredients"]) == sorted(ids)
+
+    resp = await client.post(
+        f"/categories/{category.id}/ingredients", json={"ids": [ids[0], 0]}
+    )
+    assert resp.status_code == 404
+    assert resp.json()["message"] == "Ingredients not found: [0]"
+
+    resp = await client.post("/categories/0/ingredients", json={"ids": ids})
+    assert resp.status_code == 404
+
+
+@pytest.mark.anyio
+async def test_fast_read_path_matches_orm_path(db, category_factory):
+    first = await category_factory()
+    await category_factory()
+    orm = CategoryRepository(db)
+    fast = CategoryRepository(db, fast_reads=True)
+
+    orm_page = await orm.get_all_categories(PageParams())
+    fast_page = await fast.get_all_categories(PageParams())
+    assert fast_page.model_dump(by_alias=True) == orm_page.model_dump(by_alias=True)
+
+    orm_category = await orm.get_category_by_id(first.id)
+    fast_category = await fast.get_category_by_id(first.id)
+    assert fast_category.model_dump(by_alias=True) == orm_category.model_dump(
+        by_alias=True
+    )
+
+    include = frozenset({"ingredients", "ingredient_count"})
+    orm_page = await orm.get_all_categories(PageParams(), None, include, 1)
+    fast_page = await fast.get_all_categories(PageParams(), None, include, 1)
+    assert fast_page.model_dump(by_alias=True) == orm_page.model_dump(by_alias=True)
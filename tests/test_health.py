@@ -1,5 +1,9 @@
-def test_health_sync(client):
-    resp = client.get("/health")
+import pytest
+
+
+@pytest.mark.anyio
+async def test_health_sync(client):
+    resp = await client.get("/health")
     assert resp.status_code == 200
     data = resp.json()
     assert data == {"status": "ok"}
@@ -0,0 +1,180 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import func, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from main import app
+from src.api.auth.services import create_access_token
+from src.api.categories.dependencies import get_category_repository
+from src.api.categories.services import CategoryRepository
+from src.api.users import services as users_services
+from src.db.batching import WriteBatcher
+from src.db.models.idempotency_keys import IdempotencyKey
+from src.db.purge import purge_idempotency_keys
+from tests.factories import (
+    make_category_payload,
+    make_recipe_payload,
+    make_user_payload,
+)
+
+
+@pytest.mark.anyio
+async def test_retry_replays_stored_response(
+    client: AsyncClient, query_counter: list[str]
+):
+    payload = make_user_payload().model_dump()
+    headers = {"Idempotency-Key": "create-user-1"}
+
+    first = await client.post("/users", json=payload, headers=headers)
+    assert first.status_code == 201
+    assert "Idempotent-Replayed" not in first.headers
+
+    query_counter.clear()
+    retry = await client.post("/users", json=payload, headers=headers)
+    assert retry.status_code == 201
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.content == first.content
+    assert len([q for q in query_counter if "SAVEPOINT" not in q]) == 1
+
+    other = {**payload, "full_name": "Someone Else"}
+    resp = await client.post("/users", json=other, headers=headers)
+    assert resp.status_code == 422
+
+
+@pytest.mark.anyio
+async def test_replay_skips_password_hash(client: AsyncClient, monkeypatch):
+    hashed = []
+
+    def fake_hash(password: str) -> str:
+        hashed.append(password)
+        return "hashed"
+
+    monkeypatch.setattr(users_services, "hash_password", fake_hash)
+    payload = make_user_payload().model_dump()
+    headers = {"Idempotency-Key": "create-user-hash"}
+
+    first = await client.post("/users", json=payload, headers=headers)
+    assert first.status_code == 201
+    assert len(hashed) == 1
+    retry = await client.post("/users", json=payload, headers=headers)
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert len(hashed) == 1
+
+
+@pytest.mark.anyio
+async def test_failed_request_releases_key(client: AsyncClient, category, db):
+    headers = {"Idempotency-Key": "create-category-1"}
+    resp = await client.post(
+        "/categories", json={"name": category.name}, headers=headers
+    )
+    assert resp.status_code == 409
+    assert await db.scalar(select(func.count()).select_from(IdempotencyKey)) == 0
+
+    payload = make_category_payload().model_dump()
+    resp = await client.post("/categories", json=payload, headers=headers)
+    assert resp.status_code == 201
+
+
+@pytest.mark.anyio
+async def test_keys_are_scoped_per_user(client: AsyncClient, user):
+    headers = {"Idempotency-Key": "shared-key"}
+    token = create_access_token(user.username)
+    scoped = {**headers, "Authorization": f"Bearer {token}"}
+
+    first = await client.post(
+        "/categories", json=make_category_payload().model_dump(), headers=headers
+    )
+    second = await client.post(
+        "/categories", json=make_category_payload().model_dump(), headers=scoped
+    )
+    assert first.status_code == second.status_code == 201
+    assert first.json()["id"] != second.json()["id"]
+
+
+@pytest.mark.anyio
+async def test_anonymous_keys_are_scoped_per_client(client: AsyncClient):
+    headers = {"Idempotency-Key": "anonymous-key"}
+    transport = ASGITransport(app=app, client=("10.0.0.2", 4321))
+    async with AsyncClient(
+        transport=transport, base_url="http://test", follow_redirects=True
+    ) as other:
+        first = await client.post(
+            "/categories", json=make_category_payload().model_dump(), headers=headers
+        )
+        second = await other.post(
+            "/categories", json=make_category_payload().model_dump(), headers=headers
+        )
+    assert first.status_code == second.status_code == 201
+    assert first.json()["id"] != second.json()["id"]
+
+
+@pytest.mark.anyio
+async def test_response_is_stored_with_the_batched_write(
+    client: AsyncClient, db: AsyncSession
+):
+    connection = await db.connection()
+    batcher = WriteBatcher(
+        lambda: AsyncSession(
+            bind=connection,
+            expire_on_commit=False,
+            join_transaction_mode="create_savepoint",
+        )
+    )
+    app.dependency_overrides[get_category_repository] = lambda: CategoryRepository(
+        db, batcher=batcher
+    )
+    headers = {"Idempotency-Key": "batched-key"}
+    payload = make_category_payload().model_dump()
+    first = await client.post("/categories", json=payload, headers=headers)
+    assert first.status_code == 201
+
+    # Written by the same (sub)transaction as the category, the stored
+    # response commits exactly when the category does.
+    category_xmin = await db.scalar(
+        text("SELECT xmin::text FROM categories WHERE id = :id"),
+        {"id": first.json()["id"]},
+    )
+    key_xmin = await db.scalar(
+        text("SELECT xmin::text FROM idempotency_keys WHERE key = 'batched-key'")
+    )
+    assert category_xmin == key_xmin
+
+    retry = await client.post("/categories", json=payload, headers=headers)
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.content == first.content
+    await batcher.close()
+
+
+@pytest.mark.anyio
+async def test_expired_keys_are_reused_and_purged(client: AsyncClient, db):
+    headers = {"Idempotency-Key": "create-category-2"}
+    first = await client.post(
+        "/categories", json=make_category_payload().model_dump(), headers=headers
+    )
+    expire = update(IdempotencyKey).values(expires_at=func.now())
+    await db.execute(expire)
+
+    second = await client.post(
+        "/categories", json=make_category_payload().model_dump(), headers=headers
+    )
+    assert second.status_code == 201
+    assert second.json()["id"] != first.json()["id"]
+
+    connection = await db.connection()
+    assert await purge_idempotency_keys(connection, 100) == 0
+    await db.execute(expire)
+    assert await purge_idempotency_keys(connection, 100) == 1
+
+
+@pytest.mark.anyio
+async def test_bulk_create_with_key(client: AsyncClient, user, ingredient_factory):
+    ingredient = await ingredient_factory()
+    payload = make_recipe_payload(user_id=user.id, ingredient_ids=[ingredient.id])
+    body = [payload.model_dump(mode="json")]
+    headers = {"Idempotency-Key": "create-recipes-1"}
+
+    first = await client.post("/recipes/bulk", json=body, headers=headers)
+    assert first.status_code == 200
+    assert first.json()["created"] == 1
+    retry = await client.post("/recipes/bulk", json=body, headers=headers)
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.content == first.content
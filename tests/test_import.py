@@ -0,0 +1,80 @@
+import json
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.db.imports import import_files
+from src.db.models.ingredients import Ingredient
+from src.db.models.recipes import Recipe
+
+
+@pytest.mark.anyio
+async def test_import_files(client: AsyncClient, db: AsyncSession, category, tmp_path):
+    categories = tmp_path / "categories.csv"
+    categories.write_text(f"name\nImport-Veggies\n{category.name.upper()}\n")
+    ingredients = tmp_path / "ingredients.ndjson"
+    ingredients.write_text(
+        "\n".join(
+            json.dumps(record)
+            for record in [
+                {"name": "Import-Leek", "is_vegan": True, "categories": []},
+                {
+                    "name": "Import-Kale",
+                    "is_vegan": False,
+                    "categories": ["import-veggies", category.name],
+                },
+                {"name": "IMPORT-KALE", "is_vegan": True, "categories": ["Import-New"]},
+            ]
+        )
+    )
+
+    connection = await db.connection()
+    stats = await import_files(connection, categories, ingredients)
+    assert (stats.rows, stats.categories, stats.ingredients, stats.links) == (
+        5,
+        2,
+        2,
+        3,
+    )
+
+    kale_id = await db.scalar(
+        select(Ingredient.id).where(Ingredient._name == "import-kale")
+    )
+    resp = await client.get(f"/ingredients/{kale_id}")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["is_vegan"] is True
+    assert sorted(c["name"].lower() for c in data["categories"]) == sorted(
+        ["import-new", "import-veggies", category.name]
+    )
+
+    # Re-running the same files is a no-op.
+    stats = await import_files(connection, categories, ingredients)
+    assert (stats.categories, stats.ingredients, stats.links) == (0, 0, 0)
+
+
+@pytest.mark.anyio
+async def test_import_refreshes_recipes(
+    db: AsyncSession, ingredient_factory, recipe_factory, tmp_path
+):
+    flipped = await ingredient_factory(is_vegan=False)
+    unchanged = await ingredient_factory(is_vegan=False)
+    recipe = await recipe_factory(ingredients=[flipped])
+    other = await recipe_factory(ingredients=[unchanged])
+    ingredients = tmp_path / "ingredients.ndjson"
+    ingredients.write_text(
+        json.dumps({"name": flipped.name, "is_vegan": True, "categories": []})
+    )
+
+    stats = await import_files(await db.connection(), ingredients=ingredients)
+    assert stats.ingredients == 1
+    flags = dict(
+        (
+            await db.execute(
+                select(Recipe.id, Recipe.is_vegan).where(
+                    Recipe.id.in_([recipe.id, other.id])
+                )
+            )
+        ).all()
+    )
+    assert flags == {recipe.id: True, other.id: False}
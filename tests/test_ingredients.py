@@ -1,20 +1,22 @@
 import pytest
+from src.api.common.schemas import PageParams
+from src.api.ingredients.services import IngredientRepository
 from src.db.models.ingredients import Ingredient
 from tests.factories import make_ingredient_payload
-from fastapi.testclient import TestClient
+from httpx import AsyncClient
 
 
 @pytest.mark.anyio
-def test_create_ingredient(client: TestClient, category_factory: callable):
-    c1 = category_factory()
-    c2 = category_factory()
+async def test_create_ingredient(client: AsyncClient, category_factory: callable):
+    c1 = await category_factory()
+    c2 = await category_factory()
     categories_ids = [c1.id, c2.id]
     categories_names = [c1.name, c2.name]
     payload = make_ingredient_payload(
         categories_ids=categories_ids, categories_names=categories_names
     )
 
-    resp = client.post("/ingredients", json=payload.model_dump())
+    resp = await client.post("/ingredients", json=payload.model_dump())
     assert resp.status_code == 201
     data = resp.json()
     assert data["name"] == payload.name.capitalize()
@@ -24,8 +26,8 @@ def test_create_ingredient(client: TestClient, category_factory: callable):
 
 
 @pytest.mark.anyio
-def test_get_ingredient(client: TestClient, ingredient: Ingredient):
-    resp = client.get(f"/ingredients/{ingredient.id}")
+async def test_get_ingredient(client: AsyncClient, ingredient: Ingredient):
+    resp = await client.get(f"/ingredients/{ingredient.id}")
     assert resp.status_code == 200
     data = resp.json()
 
@@ -36,28 +38,62 @@ def test_get_ingredient(client: TestClient, ingredient: Ingredient):
 
 
 @pytest.mark.anyio
-def test_list_ingredients(client: TestClient, ingredient_factory: callable):
-    i1 = ingredient_factory()
-    i2 = ingredient_factory()
-    resp = client.get("/ingredients")
+async def test_get_ingredient_sparse_fields(
+    client: AsyncClient, ingredient: Ingredient
+):
+    resp = await client.get(
+        f"/ingredients/{ingredient.id}", params={"fields": "name,categories"}
+    )
+    assert resp.status_code == 200
+    assert resp.json() == {
+        "name": ingredient.name.capitalize(),
+        "categories": [{"id": c.id, "name": c.name} for c in ingredient.categories],
+    }
+
+
+@pytest.mark.anyio
+async def test_list_ingredients(client: AsyncClient, ingredient_factory: callable):
+    i1 = await ingredient_factory()
+    i2 = await ingredient_factory()
+    resp = await client.get("/ingredients")
     assert resp.status_code == 200
-    assert len(resp.json()) == 2
-    ids = {i["id"] for i in resp.json()}
+    items = resp.json()["items"]
+    assert len(items) == 2
+    ids = {i["id"] for i in items}
     assert ids == {i1.id, i2.id}
 
 
 @pytest.mark.anyio
-def test_update_ingredient(
-    client: TestClient, ingredient: Ingredient, category_factory: callable
+async def test_list_ingredients_by_ids(
+    client: AsyncClient, ingredient_factory: callable
+):
+    i1 = await ingredient_factory()
+    i2 = await ingredient_factory()
+
+    resp = await client.get("/ingredients", params={"ids": f"{i2.id},0,{i1.id}"})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert [item["id"] for item in data["items"]] == [i2.id, i1.id]
+    assert data["items"][1]["categories"] == [
+        {"id": c.id, "name": c.name} for c in i1.categories
+    ]
+    assert data["missing_ids"] == [0]
+
+
+@pytest.mark.anyio
+async def test_update_ingredient(
+    client: AsyncClient, ingredient: Ingredient, category_factory: callable
 ):
-    c1 = category_factory()
-    c2 = category_factory()
+    c1 = await category_factory()
+    c2 = await category_factory()
     categories_ids = [c1.id, c2.id]
     categories_names = [c1.name, c2.name]
     new_payload = make_ingredient_payload(
         categories_ids=categories_ids, categories_names=categories_names
     )
-    resp = client.put(f"/ingredients/{ingredient.id}", json=new_payload.model_dump())
+    resp = await client.put(
+        f"/ingredients/{ingredient.id}", json=new_payload.model_dump()
+    )
     assert resp.status_code == 200
     data = resp.json()
     assert data["id"] == ingredient.id
@@ -67,3 +103,90 @@ def test_update_ingredient(
         {"id": cat.id, "name": cat.name} for cat in new_payload.categories
     ]
     assert data["categories"] == expected_categories
+
+
+@pytest.mark.anyio
+async def test_add_and_remove_ingredient_categories(
+    client: AsyncClient, ingredient: Ingredient, category_factory: callable
+):
+    existing = [cat.id for cat in ingredient.categories]
+    new = await category_factory()
+
+    resp = await client.post(
+        f"/ingredients/{ingredient.id}/categories",
+        json={"ids": [new.id, existing[0], new.id]},
+    )
+    assert resp.status_code == 200
+    assert sorted(c["id"] for c in resp.json()["categories"]) == sorted(
+        [*existing, new.id]
+    )
+
+    resp = await client.request(
+        "DELETE",
+        f"/ingredients/{ingredient.id}/categories",
+        json={"ids": [existing[0], new.id]},
+    )
+    assert resp.status_code == 200
+    assert [c["id"] for c in resp.json()["categories"]] == [existing[1]]
+
+    resp = await client.post(
+        f"/ingredients/{ingredient.id}/categories", json={"ids": [new.id, 0]}
+    )
+    assert resp.status_code == 404
+    assert "[0]" in resp.json()["message"]
+
+    resp = await client.post("/ingredients/0/categories", json={"ids": [new.id]})
+    assert resp.status_code == 404
+
+    resp = await client.post(
+        f"/ingredients/{ingredient.id}/categories", json={"ids": []}
+    )
+    assert resp.status_code == 422
+
+
+@pytest.mark.anyio
+async def test_resolve_ingredients(
+    client: AsyncClient, ingredient: Ingredient, query_counter: list[str]
+):
+    names = ["Resolve-Leek", ingredient.name.upper(), "resolve-leek", "Resolve-Kale"]
+
+    query_counter.clear()
+    resp = await client.post("/ingredients/resolve", json={"names": names})
+    assert resp.status_code == 200
+    assert len([q for q in query_counter if "SAVEPOINT" not in q]) == 2
+    data = resp.json()
+    assert data["created"] == 2
+    assert [(item["name"], item["created"]) for item in data["items"]] == [
+        ("Resolve-leek", True),
+        (ingredient.name.capitalize(), False),
+        ("Resolve-kale", True),
+    ]
+    assert data["items"][1]["id"] == ingredient.id
+
+    resp = await client.post("/ingredients/resolve", json={"names": names})
+    again = resp.json()
+    assert again["created"] == 0
+    assert [item["id"] for item in again["items"]] == [
+        item["id"] for item in data["items"]
+    ]
+
+    resp = await client.post("/ingredients/resolve", json={"names": []})
+    assert resp.status_code == 422
+
+
+@pytest.mark.anyio
+async def test_fast_read_path_matches_orm_path(db, ingredient_factory):
+    first = await ingredient_factory()
+    await ingredient_factory()
+    orm = IngredientRepository(db)
+    fast = IngredientRepository(db, fast_reads=True)
+
+    orm_page = await orm.get_all_ingredients(PageParams())
+    fast_page = await fast.get_all_ingredients(PageParams())
+    assert fast_page.model_dump(by_alias=True) == orm_page.model_dump(by_alias=True)
+
+    orm_ingredient = await orm.get_ingredient_by_id(first.id)
+    fast_ingredient = await fast.get_ingredient_by_id(first.id)
+    assert fast_ingredient.model_dump(by_alias=True) == orm_ingredient.model_dump(
+        by_alias=True
+    )
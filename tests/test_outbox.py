@@ -0,0 +1,79 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select
+from src.core.enums import EventType
+from src.db.models.outbox import OutboxEvent
+from src.db.outbox import dispatch_events, handlers, subscribe
+from tests.factories import make_recipe_payload
+
+
+@pytest.fixture
+def subscriber():
+    delivered = []
+
+    @subscribe(EventType.RECIPE_CREATED)
+    async def handler(connection, event):
+        delivered.append(event.entity_id)
+
+    yield delivered
+    handlers[EventType.RECIPE_CREATED].remove(handler)
+
+
+async def recipe_events(db, event_type: EventType) -> list[OutboxEvent]:
+    query = select(OutboxEvent).where(OutboxEvent.event_type == event_type)
+    return list(await db.scalars(query.execution_options(populate_existing=True)))
+
+
+@pytest.mark.anyio
+async def test_write_records_event_in_same_statement(
+    client: AsyncClient, db, user, ingredient_factory, query_counter
+):
+    ingredient = await ingredient_factory()
+    payload = make_recipe_payload(user_id=user.id, ingredient_ids=[ingredient.id])
+
+    query_counter.clear()
+    resp = await client.post("/recipes", json=payload.model_dump(mode="json"))
+    assert resp.status_code == 201
+    assert len([q for q in query_counter if "SAVEPOINT" not in q]) == 1
+
+    recipe_id = resp.json()["id"]
+    events = await recipe_events(db, EventType.RECIPE_CREATED)
+    assert [event.entity_id for event in events] == [recipe_id]
+
+    assert (await client.delete(f"/recipes/{recipe_id}")).status_code == 200
+    events = await recipe_events(db, EventType.RECIPE_DELETED)
+    assert [event.entity_id for event in events] == [recipe_id]
+
+
+@pytest.mark.anyio
+async def test_dispatch_delivers_and_deletes_events(
+    db, ingredient_factory, recipe_via_api, subscriber
+):
+    recipe = await recipe_via_api(await ingredient_factory())
+
+    connection = await db.connection()
+    assert await dispatch_events(connection, 100) >= 1
+    assert subscriber == [recipe["id"]]
+    assert await db.scalar(select(func.count()).select_from(OutboxEvent)) == 0
+
+
+@pytest.mark.anyio
+async def test_failed_event_is_retried_later(db, ingredient_factory, recipe_via_api):
+    @subscribe(EventType.RECIPE_CREATED)
+    async def failing(connection, event):
+        raise RuntimeError("boom")
+
+    await recipe_via_api(await ingredient_factory())
+    try:
+        connection = await db.connection()
+        await dispatch_events(connection, 100)
+    finally:
+        handlers[EventType.RECIPE_CREATED].remove(failing)
+
+    (event,) = await recipe_events(db, EventType.RECIPE_CREATED)
+    assert event.attempts == 1
+    retry_at = select(OutboxEvent.available_at > func.now()).where(
+        OutboxEvent.id == event.id
+    )
+    assert await db.scalar(retry_at)
+    assert await dispatch_events(connection, 100) == 0
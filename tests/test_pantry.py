@@ -0,0 +1,141 @@
+from datetime import timedelta
+from uuid import uuid4
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from main import app
+from src.api.recipes.enums import DifficultyLevel
+from src.api.recipes.dependencies import get_recipe_repository
+from src.api.recipes.schemas import PantrySearchSchema
+from src.api.recipes.services import RecipeRepository
+from src.db.bitmaps import SPARSE_LIMIT, Bitmap
+from src.db.models.ingredients import Ingredient
+from src.db.models.recipes import Recipe, RecipeIngredient
+from src.db.models.users import User
+from src.db.pantry import PantryIndex
+from tests.factories import make_user_payload
+
+
+@pytest.mark.anyio
+async def test_bitmap_switches_container_with_density():
+    ids = range(70_000, 70_000 + 2 * SPARSE_LIMIT)
+    bitmap = Bitmap(ids)
+    assert isinstance(bitmap.chunks[1], int)
+    assert len(bitmap) == len(ids) and 70_001 in bitmap and 5 not in bitmap
+
+    for id_ in ids[3:]:
+        bitmap.discard(id_)
+    assert bitmap.chunks[1] == {70_000 & 0xFFFF, 70_001 & 0xFFFF, 70_002 & 0xFFFF}
+    for id_ in ids[:3]:
+        bitmap.discard(id_)
+    assert not bitmap.chunks
+
+
+@pytest.fixture
+def own_pantry_index(db):
+    """
+    Serve requests from a repository with its own pantry index instead of
+    the process-wide one, which may have been loaded by another test.
+    """
+    app.dependency_overrides[get_recipe_repository] = lambda: RecipeRepository(db)
+
+
+@pytest.mark.anyio
+async def test_pantry_search(
+    client: AsyncClient, ingredient_factory, recipe_via_api, own_pantry_index
+):
+    a, b, c, d = [await ingredient_factory() for _ in range(4)]
+    full, missing_one, missing_two, _, deleted = [
+        (await recipe_via_api(*ingredients))["id"]
+        for ingredients in [(a, b), (a, b, c), (a, c, d), (c, d), (a,)]
+    ]
+    await client.delete(f"/recipes/{deleted}")
+
+    body = {"ingredient_ids": [a.id, b.id], "limit": 2}
+    resp = await client.post("/recipes/pantry-search", json=body)
+    assert resp.status_code == 200
+    page = resp.json()
+    assert [(item["id"], item["missing"]) for item in page["items"]] == [
+        (full, 0),
+        (missing_one, 1),
+    ]
+    assert page["items"][1]["missing_ingredient_ids"] == [c.id]
+
+    body["cursor"] = page["next_cursor"]
+    page = (await client.post("/recipes/pantry-search", json=body)).json()
+    assert [item["id"] for item in page["items"]] == [missing_two]
+    assert page["items"][0]["missing_ingredient_ids"] == sorted([c.id, d.id])
+    assert page["next_cursor"] is None
+
+    body = {"ingredient_ids": [a.id, b.id], "max_missing": 0}
+    page = (await client.post("/recipes/pantry-search", json=body)).json()
+    assert [item["id"] for item in page["items"]] == [full]
+
+
+@pytest.mark.anyio
+async def test_pantry_index_catches_up(
+    client: AsyncClient, db, ingredient_factory, recipe_via_api
+):
+    a, b = await ingredient_factory(), await ingredient_factory()
+    first = (await recipe_via_api(a, b))["id"]
+    index = PantryIndex(max_staleness=0)
+    repository = RecipeRepository(db, pantry_index=index)
+    params = PantrySearchSchema(ingredient_ids=[a.id, b.id])
+
+    page = await repository.pantry_search(params)
+    assert [item.id for item in page.items] == [first]
+
+    second = (await recipe_via_api(a))["id"]
+    await client.delete(f"/recipes/{first}")
+    page = await repository.pantry_search(params)
+    assert [item.id for item in page.items] == [second]
+    assert first not in index.recipes
+
+
+@pytest.mark.anyio
+async def test_pantry_index_sees_late_commits(engine):
+    index = PantryIndex(max_staleness=0)
+    async with (
+        AsyncSession(engine) as reader,
+        AsyncSession(engine, expire_on_commit=False) as writer,
+    ):
+        payload = make_user_payload()
+        user = User(
+            username=payload.username,
+            email=payload.email,
+            full_name=payload.full_name,
+            hashed_password="x",
+        )
+        ingredient = Ingredient(name=f"late-{uuid4().hex[:6]}", is_vegan=True)
+        recipe = Recipe(
+            name=f"late-{uuid4().hex[:6]}",
+            cooking_time=10,
+            difficulty_level=DifficultyLevel.EASY,
+            portions=1,
+            instructions="Wait",
+            user=user,
+            is_vegan=True,
+            recipe_ingredients=[RecipeIngredient(ingredient=ingredient, quantity="1")],
+            # As if its transaction had started long before it commits.
+            created_at=func.now() - timedelta(hours=1),
+        )
+        try:
+            await index.sync(reader)
+            writer.add(recipe)
+            await writer.flush()
+            # Caught up while the writing transaction is still open.
+            await index.sync(reader)
+            assert recipe.id not in index.recipes
+
+            await writer.commit()
+            await index.sync(reader)
+            assert index.recipes[recipe.id] == (ingredient.id,)
+        finally:
+            await writer.rollback()
+            await writer.execute(
+                delete(RecipeIngredient).where(RecipeIngredient.recipe_id == recipe.id)
+            )
+            for row in (recipe, ingredient, user):
+                await writer.delete(row)
+            await writer.commit()
@@ -1,16 +1,24 @@
+import json
+from datetime import timedelta
 import pytest
-from fastapi.testclient import TestClient
-from src.db.models.recipes import Recipe
+from sqlalchemy import func, select, text, update
+from src.api.common.pagination import paginate
+from src.api.recipes.schemas import RecipeListParams
+from src.api.recipes.services import RecipeRepository
+from httpx import AsyncClient
+from src.db.models.recipes import Recipe, RecipeIngredient
+from src.db.outbox import dispatch_events
+from src.db.purge import purge_recipes
 from tests.factories import make_recipe_payload
 
 
 @pytest.mark.anyio
-def test_create_recipe(client: TestClient, user, ingredient_factory):
-    ingredients = [ingredient_factory(), ingredient_factory()]
+async def test_create_recipe(client: AsyncClient, user, ingredient_factory):
+    ingredients = [await ingredient_factory(), await ingredient_factory()]
     ingredient_ids = [ingredient.id for ingredient in ingredients]
     payload = make_recipe_payload(user_id=user.id, ingredient_ids=ingredient_ids)
 
-    resp = client.post("/recipes", json=payload.model_dump(mode="json"))
+    resp = await client.post("/recipes", json=payload.model_dump(mode="json"))
     assert resp.status_code == 201
     data = resp.json()
     assert data["name"] == payload.name.capitalize()
@@ -24,8 +32,145 @@ def test_create_recipe(client: TestClient, user, ingredient_factory):
 
 
 @pytest.mark.anyio
-def test_get_recipe(client: TestClient, recipe: Recipe):
-    resp = client.get(f"/recipes/{recipe.id}")
+async def test_create_recipe_single_statement(
+    client: AsyncClient, user, ingredient_factory, recipe, query_counter
+):
+    ingredients = [await ingredient_factory(), await ingredient_factory()]
+    ingredient_ids = [ingredient.id for ingredient in ingredients]
+    payload = make_recipe_payload(user_id=user.id, ingredient_ids=ingredient_ids)
+
+    query_counter.clear()
+    resp = await client.post("/recipes", json=payload.model_dump(mode="json"))
+    assert resp.status_code == 201
+    statements = [q for q in query_counter if "SAVEPOINT" not in q]
+    assert len(statements) == 1
+    resp = await client.get(f"/recipes/{resp.json()['id']}")
+    assert resp.json()["ingredients"] == [
+        line.model_dump() for line in payload.ingredients
+    ]
+
+    cases = [
+        (payload.model_copy(update={"name": recipe.name}), 409),
+        (payload.model_copy(update={"user_id": 999_999}), 404),
+        (make_recipe_payload(user_id=user.id, ingredient_ids=[999_999]), 404),
+        (
+            make_recipe_payload(
+                user_id=user.id, ingredient_ids=[ingredient_ids[0]] * 2
+            ),
+            422,
+        ),
+    ]
+    for body, code in cases:
+        resp = await client.post("/recipes", json=body.model_dump(mode="json"))
+        assert resp.status_code == code, resp.json()
+
+
+@pytest.mark.anyio
+async def test_create_recipes_bulk(
+    client: AsyncClient, user, ingredient_factory, recipe, query_counter
+):
+    ingredients = [await ingredient_factory(), await ingredient_factory()]
+    ingredient_ids = [ingredient.id for ingredient in ingredients]
+    payloads = [
+        make_recipe_payload(user_id=user.id, ingredient_ids=ingredient_ids),
+        make_recipe_payload(user_id=user.id, ingredient_ids=ingredient_ids),
+        make_recipe_payload(
+            user_id=user.id, ingredient_ids=[ingredient_ids[0]]
+        ).model_copy(update={"name": recipe.name.upper()}),
+        make_recipe_payload(user_id=user.id, ingredient_ids=[999_999]),
+        make_recipe_payload(user_id=999_999, ingredient_ids=ingredient_ids),
+    ]
+
+    query_counter.clear()
+    resp = await client.post(
+        "/recipes/bulk", json=[p.model_dump(mode="json") for p in payloads]
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+    assert (data["created"], data["failed"]) == (2, 3)
+    # users, ingredients, one multi-row recipe insert and one lines insert
+    statements = [q for q in query_counter if "SAVEPOINT" not in q]
+    assert len(statements) == 4
+
+    results = data["results"]
+    assert [r["index"] for r in results] == [0, 1, 2, 3, 4]
+    assert [r["error"]["code"] for r in results[2:]] == [409, 404, 404]
+    for result, payload in zip(results[:2], payloads, strict=False):
+        assert result["error"] is None
+        assert result["recipe"]["name"] == payload.name.capitalize()
+        assert result["recipe"]["ingredients"] == [
+            line.model_dump() for line in payload.ingredients
+        ]
+        resp = await client.get(f"/recipes/{result['recipe']['id']}")
+        assert resp.status_code == 200
+        assert resp.json() == result["recipe"]
+
+    resp = await client.post("/recipes/bulk", json=[])
+    assert resp.status_code == 422
+
+
+@pytest.mark.anyio
+async def test_update_recipe_diffs_ingredients(
+    client: AsyncClient, recipe_factory, ingredient_factory, query_counter
+):
+    ingredients = [await ingredient_factory() for _ in range(4)]
+    recipe = await recipe_factory(ingredients=ingredients[:3])
+    lines = [
+        {"ingredient_id": ingredient.id, "quantity": "1 unit"}
+        for ingredient in ingredients[:3]
+    ]
+    lines[1]["quantity"] = "2 units"
+
+    query_counter.clear()
+    resp = await client.patch(
+        f"/recipes/{recipe.id}", json={"portions": 6, "ingredients": lines}
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["portions"] == 6
+    assert data["name"] == recipe.name.capitalize()
+    assert data["ingredients"] == lines
+    writes = [
+        q.split("\n")[0]
+        for q in query_counter
+        if q.startswith(("WITH", "INSERT", "UPDATE", "DELETE"))
+    ]
+    assert len(writes) == 2
+    assert writes[1].startswith("UPDATE recipe_ingredients SET quantity")
+
+    # Drop one line, add another and rename.
+    lines = [lines[0], {"ingredient_id": ingredients[3].id, "quantity": "1 pinch"}]
+    resp = await client.patch(
+        f"/recipes/{recipe.id}", json={"name": "Renamed", "ingredients": lines}
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["name"] == "Renamed"
+    assert sorted(data["ingredients"], key=lambda line: line["ingredient_id"]) == lines
+
+    # Omitting ingredients leaves them alone.
+    resp = await client.patch(f"/recipes/{recipe.id}", json={"cooking_time": 5})
+    assert resp.status_code == 200
+    assert len(resp.json()["ingredients"]) == 2
+
+
+@pytest.mark.anyio
+async def test_update_recipe_errors(client: AsyncClient, recipe_factory):
+    recipe, other = await recipe_factory(), await recipe_factory()
+    resp = await client.patch("/recipes/999999", json={"portions": 2})
+    assert resp.status_code == 404
+    resp = await client.patch(
+        f"/recipes/{recipe.id}",
+        json={"ingredients": [{"ingredient_id": 999_999, "quantity": "1 g"}]},
+    )
+    assert resp.status_code == 404
+    resp = await client.patch(f"/recipes/{recipe.id}", json={"name": other.name})
+    assert resp.status_code == 409
+
+
+@pytest.mark.anyio
+async def test_get_recipe(client: AsyncClient, recipe: Recipe):
+    resp = await client.get(f"/recipes/{recipe.id}")
     assert resp.status_code == 200
     data = resp.json()
     assert data["id"] == recipe.id
@@ -35,39 +180,463 @@ def test_get_recipe(client: TestClient, recipe: Recipe):
 
 
 @pytest.mark.anyio
-def test_list_recipes(client: TestClient, recipe_factory):
-    r1 = recipe_factory()
-    r2 = recipe_factory()
+async def test_get_recipe_sparse_fields(client: AsyncClient, recipe: Recipe):
+    resp = await client.get(f"/recipes/{recipe.id}", params={"fields": "id,is_vegan"})
+    assert resp.status_code == 200
+    assert resp.json() == {"id": recipe.id, "is_vegan": recipe.is_vegan}
+
+    resp = await client.get(f"/recipes/{recipe.id}", params={"fields": "id,secret"})
+    assert resp.status_code == 422
+
 
-    resp = client.get("/recipes")
+@pytest.mark.anyio
+async def test_list_recipes_sparse_fields(client: AsyncClient, recipe_factory):
+    recipes = [await recipe_factory() for _ in range(3)]
+
+    resp = await client.get("/recipes", params={"fields": "id,name", "limit": 2})
     assert resp.status_code == 200
     data = resp.json()
+    assert data["items"] == [
+        {"id": r.id, "name": r.name.capitalize()} for r in recipes[:2]
+    ]
+
+    resp = await client.get(
+        "/recipes",
+        params={"fields": "id,ingredients", "cursor": data["next_cursor"]},
+    )
+    assert resp.json()["items"] == [
+        {"id": recipes[2].id, "ingredients": recipes[2].recipe_ingredients_payload}
+    ]
+
+
+@pytest.mark.anyio
+async def test_list_recipes(client: AsyncClient, recipe_factory):
+    r1 = await recipe_factory()
+    r2 = await recipe_factory()
+
+    resp = await client.get("/recipes")
+    assert resp.status_code == 200
+    data = resp.json()["items"]
     ids = {item["id"] for item in data}
     assert ids == {r1.id, r2.id}
     assert all("is_vegan" in item for item in data)
 
 
 @pytest.mark.anyio
-def test_get_user_recipes(client: TestClient, recipe_factory, user_factory):
-    user = user_factory()
-    recipe_factory(user=user)
-    recipe_factory(user=user)
+async def test_list_recipes_paginates_by_created_at(
+    client: AsyncClient, recipe_factory
+):
+    recipes = [await recipe_factory() for _ in range(3)]
+    params = {"limit": 2, "order_by": "created_at"}
+    seen = []
+    cursor = None
+    while True:
+        if cursor is not None:
+            params["cursor"] = cursor
+        resp = await client.get("/recipes", params=params)
+        assert resp.status_code == 200
+        page = resp.json()
+        seen.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == [recipe.id for recipe in recipes]
 
-    resp = client.get(f"/recipes/user/{user.id}")
+
+@pytest.mark.anyio
+async def test_list_recipes_query_count_is_constant(
+    client: AsyncClient, recipe_factory, query_counter
+):
+    await recipe_factory()
+    query_counter.clear()
+    assert (await client.get("/recipes")).status_code == 200
+    single = len(query_counter)
+
+    await recipe_factory()
+    await recipe_factory()
+    query_counter.clear()
+    assert (await client.get("/recipes")).status_code == 200
+    assert len(query_counter) == single
+
+
+@pytest.mark.anyio
+async def test_list_recipes_by_ids(client: AsyncClient, recipe_factory, query_counter):
+    r1 = await recipe_factory()
+    r2 = await recipe_factory()
+    r3 = await recipe_factory()
+    missing = r3.id + 1000
+
+    query_counter.clear()
+    ids = f"{r3.id},{missing},{r1.id},{r3.id}"
+    resp = await client.get("/recipes", params={"ids": ids})
     assert resp.status_code == 200
     data = resp.json()
+    assert [item["id"] for item in data["items"]] == [r3.id, r1.id]
+    assert data["items"][0]["ingredients"] == r3.recipe_ingredients_payload
+    assert data["missing_ids"] == [missing]
+    assert r2.id not in [item["id"] for item in data["items"]]
+    # one IN query for recipes plus one per eager-loaded relationship
+    assert len(query_counter) == 2
+
+    resp = await client.get("/recipes", params={"ids": "1,abc"})
+    assert resp.status_code == 422
+
+
+@pytest.mark.anyio
+async def test_list_recipes_include_expands_relationships(
+    client: AsyncClient, recipe_factory, query_counter
+):
+    await recipe_factory()
+    query_counter.clear()
+    params = {"include": "user,ingredients.categories"}
+    assert (await client.get("/recipes", params=params)).status_code == 200
+    single = len(query_counter)
+
+    recipes = [await recipe_factory(), await recipe_factory()]
+    query_counter.clear()
+    resp = await client.get("/recipes", params=params)
+    assert resp.status_code == 200
+    # one query per relationship level, however many rows are expanded
+    assert len(query_counter) == single
+
+    item = resp.json()["items"][-1]
+    recipe = recipes[-1]
+    assert item["user"] == {
+        "id": recipe.user.id,
+        "username": recipe.user.username,
+        "full_name": recipe.user.full_name,
+    }
+    line = item["ingredients"][0]
+    ingredient = recipe.recipe_ingredients[0].ingredient
+    assert line["name"] == ingredient.name.capitalize()
+    assert line["categories"] == [
+        {"id": c.id, "name": c.name} for c in ingredient.categories
+    ]
+
+    plain = (await client.get(f"/recipes/{recipe.id}")).json()
+    assert "user" not in plain
+    assert set(plain["ingredients"][0]) == {"ingredient_id", "quantity"}
+
+    resp = await client.get("/recipes", params={"include": "instructions"})
+    assert resp.status_code == 422
+
+
+@pytest.mark.anyio
+async def test_include_user_without_full_name(client: AsyncClient, db, recipe: Recipe):
+    recipe.user.full_name = None
+    await db.flush()
+    resp = await client.get(f"/recipes/{recipe.id}", params={"include": "user"})
+    assert resp.status_code == 200
+    assert resp.json()["user"] == {
+        "id": recipe.user.id,
+        "username": recipe.user.username,
+        "full_name": None,
+    }
+
+
+@pytest.mark.anyio
+async def test_get_user_recipes(client: AsyncClient, recipe_factory, user_factory):
+    user = await user_factory()
+    await recipe_factory(user=user)
+    await recipe_factory(user=user)
+
+    resp = await client.get(f"/recipes/user/{user.id}")
+    assert resp.status_code == 200
+    data = resp.json()["items"]
     assert len(data) == 2
     assert all(item["user_id"] == user.id for item in data)
 
 
 @pytest.mark.anyio
-def test_delete_recipe(client: TestClient, recipe: Recipe):
-    resp = client.delete(f"/recipes/{recipe.id}")
+async def test_export_recipes_streams_ndjson(
+    client: AsyncClient, recipe_factory, user_factory
+):
+    user = await user_factory()
+    r1 = await recipe_factory(user=user)
+    r2 = await recipe_factory(user=user)
+    await recipe_factory()
+
+    resp = await client.get("/recipes/export", params={"user_id": user.id})
     assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    assert [line["id"] for line in lines] == [r1.id, r2.id]
+    assert lines[0]["ingredients"] == r1.recipe_ingredients_payload
+
+
+@pytest.mark.anyio
+async def test_delete_recipe(
+    client: AsyncClient, recipe: Recipe, user, query_counter: list[str]
+):
+    query_counter.clear()
+    resp = await client.delete(f"/recipes/{recipe.id}")
+    assert resp.status_code == 200
+    assert len([q for q in query_counter if "SAVEPOINT" not in q]) == 1
     data = resp.json()
     assert data["id"] == recipe.id
     assert data["ingredients"] == recipe.recipe_ingredients_payload
     assert data["is_vegan"] == recipe.is_vegan
 
-    follow_up = client.get(f"/recipes/{recipe.id}")
+    follow_up = await client.get(f"/recipes/{recipe.id}")
     assert follow_up.status_code == 404
+    assert (await client.delete(f"/recipes/{recipe.id}")).status_code == 404
+    resp = await client.patch(f"/recipes/{recipe.id}", json={"portions": 3})
+    assert resp.status_code == 404
+    resp = await client.get("/recipes", params={"limit": 100})
+    assert recipe.id not in [item["id"] for item in resp.json()["items"]]
+
+    # The name is free again while the deleted row waits for the purger.
+    payload = make_recipe_payload(
+        user_id=user.id,
+        ingredient_ids=[line.ingredient_id for line in recipe.recipe_ingredients],
+    ).model_copy(update={"name": recipe.name})
+    resp = await client.post("/recipes", json=payload.model_dump(mode="json"))
+    assert resp.status_code == 201
+
+
+@pytest.mark.anyio
+async def test_purge_deleted_recipes(client: AsyncClient, db, recipe_factory):
+    deleted, kept = await recipe_factory(), await recipe_factory()
+    assert (await client.delete(f"/recipes/{deleted.id}")).status_code == 200
+
+    connection = await db.connection()
+    assert await purge_recipes(connection, 100, timedelta(hours=1)) == 0
+    await db.execute(
+        update(Recipe)
+        .where(Recipe.id == deleted.id)
+        .values(deleted_at=func.now() - timedelta(hours=2))
+    )
+    assert await purge_recipes(connection, 100, timedelta(hours=1)) == 1
+    remaining = await db.scalars(
+        select(Recipe.id).where(Recipe.id.in_([deleted.id, kept.id]))
+    )
+    assert remaining.all() == [kept.id]
+    lines = await db.scalar(
+        select(func.count()).where(RecipeIngredient.recipe_id == deleted.id)
+    )
+    assert lines == 0
+
+
+@pytest.mark.anyio
+async def test_fast_read_path_matches_orm_path(db, recipe_factory):
+    first = await recipe_factory()
+    await recipe_factory()
+    orm = RecipeRepository(db)
+    fast = RecipeRepository(db, fast_reads=True)
+
+    orm_page = await orm.get_all_recipes(RecipeListParams())
+    fast_page = await fast.get_all_recipes(RecipeListParams())
+    assert fast_page.model_dump(by_alias=True) == orm_page.model_dump(by_alias=True)
+
+    orm_recipe = await orm.get_recipe_by_id(first.id)
+    fast_recipe = await fast.get_recipe_by_id(first.id)
+    assert fast_recipe.model_dump(by_alias=True) == orm_recipe.model_dump(by_alias=True)
+
+    fields = {"id", "name", "is_vegan"}
+    orm_page = await orm.get_all_recipes(RecipeListParams(), fields)
+    fast_page = await fast.get_all_recipes(RecipeListParams(), fields)
+    include = {"items": {"__all__": fields}}
+    assert fast_page.model_dump(include=include) == orm_page.model_dump(include=include)
+
+
+@pytest.mark.anyio
+async def test_search_recipes(client: AsyncClient, ingredient_factory, recipe_via_api):
+    spinach = await ingredient_factory(name="spinach")
+    other = await ingredient_factory()
+
+    async def create(name: str, instructions: str, ingredient) -> int:
+        recipe = await recipe_via_api(ingredient, name=name, instructions=instructions)
+        return recipe["id"]
+
+    in_name = await create("spinach pie", "Bake until golden.", other)
+    in_ingredients = await create("green pie", "Bake until golden.", spinach)
+    in_instructions = await create("pasta", "Stir in the spinach leaves.", other)
+    deleted = await create("spinach soup", "Simmer.", spinach)
+    await create("lemon tart", "Chill overnight.", other)
+    await client.delete(f"/recipes/{deleted}")
+
+    resp = await client.get("/recipes/search", params={"q": "spinach", "limit": 2})
+    assert resp.status_code == 200
+    page = resp.json()
+    assert [hit["id"] for hit in page["items"]] == [in_name, in_ingredients]
+    assert page["items"][0]["name"] == "Spinach pie"
+    assert page["next_cursor"] is not None
+
+    resp = await client.get(
+        "/recipes/search",
+        params={"q": "spinach", "limit": 2, "cursor": page["next_cursor"]},
+    )
+    page = resp.json()
+    assert [hit["id"] for hit in page["items"]] == [in_instructions]
+    assert "<b>spinach</b>" in page["items"][0]["headline"]
+    assert page["next_cursor"] is None
+
+    resp = await client.get("/recipes/search", params={"q": "pie -green"})
+    assert [hit["id"] for hit in resp.json()["items"]] == [in_name]
+
+    resp = await client.get("/recipes/search", params={"q": "pie", "cursor": "?"})
+    assert resp.status_code == 422
+
+
+@pytest.mark.anyio
+async def test_ingredient_names_follow_writes(
+    client: AsyncClient, db, user, ingredient_factory, recipe_via_api
+):
+    zucchini = await ingredient_factory(name="zucchini")
+    endive = await ingredient_factory(name="écorce")
+    leek = await ingredient_factory(name="leek")
+
+    async def stored(recipe_id: int) -> tuple:
+        row = await db.execute(
+            select(Recipe.ingredient_names, Recipe.updated_at).where(
+                Recipe.id == recipe_id
+            )
+        )
+        return row.one()
+
+    single = (await recipe_via_api(zucchini, endive))["id"]
+    payload = make_recipe_payload(
+        user_id=user.id, ingredient_ids=[endive.id, zucchini.id]
+    )
+    resp = await client.post("/recipes/bulk", json=[payload.model_dump(mode="json")])
+    bulk = resp.json()["results"][0]["recipe"]["id"]
+    # Both writers order names by code point, without waiting for the outbox.
+    assert (await stored(single))[0] == "zucchini écorce"
+    assert (await stored(bulk))[0] == "zucchini écorce"
+
+    body = {"ingredients": [{"ingredient_id": leek.id, "quantity": "1"}]}
+    resp = await client.patch(f"/recipes/{single}", json=body)
+    assert resp.status_code == 200
+    assert (await stored(single))[0] == "leek"
+
+    # A rename reaches the recipes through the outbox and is not an edit of
+    # the recipes themselves.
+    _, updated_at = await stored(bulk)
+    resp = await client.put(f"/ingredients/{zucchini.id}", json={"name": "squash"})
+    assert resp.status_code == 200
+    await dispatch_events(await db.connection(), 100)
+    db.expire_all()
+    assert await stored(bulk) == ("squash écorce", updated_at)
+
+
+@pytest.mark.anyio
+async def test_list_recipes_filters_and_sorts(
+    client: AsyncClient, user, recipe_factory, ingredient_factory
+):
+    vegan = await ingredient_factory(is_vegan=True)
+    quick = await recipe_factory(
+        user=user, cooking_time=10, portions=2, ingredients=[vegan]
+    )
+    slow = await recipe_factory(user=user, cooking_time=50, portions=4)
+    quicker = await recipe_factory(user=user, cooking_time=5, portions=6)
+    await recipe_factory(cooking_time=5, difficulty_level="HARD")
+
+    params = {"user_id": user.id, "order_by": "cooking_time", "limit": 2}
+    page = (await client.get("/recipes", params=params)).json()
+    assert [item["id"] for item in page["items"]] == [quicker.id, quick.id]
+    params["cursor"] = page["next_cursor"]
+    page = (await client.get("/recipes", params=params)).json()
+    assert [item["id"] for item in page["items"]] == [slow.id]
+
+    params = {"difficulty_level": "EASY", "max_cooking_time": 10, "min_portions": 3}
+    page = (await client.get("/recipes", params=params)).json()
+    assert [item["id"] for item in page["items"]] == [quicker.id]
+
+    params = {"vegan": "true", "fields": "id,name"}
+    page = (await client.get("/recipes", params=params)).json()
+    assert page["items"] == [{"id": quick.id, "name": quick.name.capitalize()}]
+
+    params = {"max_portions": 2, "order_by": "cooking_time", "fields": "id"}
+    page = (await client.get("/recipes", params=params)).json()
+    assert page["items"] == [{"id": quick.id}]
+
+    resp = await client.get("/recipes", params={"order_by": "portions"})
+    assert resp.status_code == 422
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    ("params", "index"),
+    [
+        ({"order_by": "cooking_time"}, "ix_recipes_cooking_time_id"),
+        (
+            {"vegan": True, "order_by": "created_at"},
+            "ix_recipes_is_vegan_created_at_id",
+        ),
+        (
+            {"user_id": 1, "order_by": "created_at"},
+            "ix_recipes_user_id_created_at_id",
+        ),
+        (
+            {
+                "difficulty_level": "EASY",
+                "max_cooking_time": 30,
+                "order_by": "cooking_time",
+            },
+            "ix_recipes_difficulty_level_cooking_time_id",
+        ),
+    ],
+)
+async def test_list_recipes_filters_use_indexes(db, user, params, index):
+    await db.execute(
+        text(
+            "INSERT INTO recipes (name, cooking_time, difficulty_level, portions,"
+            " instructions, user_id, is_vegan)"
+            " SELECT 'plan-' || n, n % 120 + 1,"
+            " (ARRAY['EASY', 'MEDIUM', 'HARD'])[n % 3 + 1]::difficultylevel,"
+            " n % 8 + 1, 'Stir', :user_id, n % 20 = 0"
+            " FROM generate_series(1, 5000) AS n"
+        ),
+        {"user_id": user.id},
+    )
+    await db.execute(text("ANALYZE recipes"))
+    page = RecipeListParams(**params)
+    query = paginate(RecipeRepository.filter(select(Recipe.id), page), Recipe, page)
+    sql = query.where(Recipe.deleted_at.is_(None)).compile(
+        db.bind, compile_kwargs={"literal_binds": True}
+    )
+    plan = (await db.scalars(text(f"EXPLAIN {sql}"))).all()
+    assert index in "\n".join(plan)
+
+
+@pytest.mark.anyio
+async def test_is_vegan_follows_ingredients(
+    client: AsyncClient, db, ingredient_factory, recipe_via_api
+):
+    leek, kale = [await ingredient_factory(is_vegan=True) for _ in range(2)]
+    feta = await ingredient_factory(is_vegan=False)
+
+    async def is_vegan(recipe_id: int) -> bool:
+        return (await client.get(f"/recipes/{recipe_id}")).json()["is_vegan"]
+
+    both, leek_only, with_feta = (
+        await recipe_via_api(leek, kale),
+        await recipe_via_api(leek),
+        await recipe_via_api(leek, feta),
+    )
+    assert [both["is_vegan"], leek_only["is_vegan"], with_feta["is_vegan"]] == [
+        True,
+        True,
+        False,
+    ]
+
+    await db.execute(update(Recipe).values(updated_at=func.now() - timedelta(days=1)))
+    resp = await client.put(f"/ingredients/{kale.id}", json={"is_vegan": False})
+    assert resp.status_code == 200
+    assert [await is_vegan(both["id"]), await is_vegan(leek_only["id"])] == [
+        False,
+        True,
+    ]
+    touched = await db.scalars(
+        select(Recipe.id).where(Recipe.updated_at > func.now() - timedelta(hours=1))
+    )
+    assert set(touched) == {both["id"]}
+
+    lines = [{"ingredient_id": leek.id, "quantity": "1"}]
+    resp = await client.patch(f"/recipes/{both['id']}", json={"ingredients": lines})
+    assert resp.json()["is_vegan"] is True
+
+    page = (await client.get("/recipes", params={"vegan": "true"})).json()
+    assert sorted(item["id"] for item in page["items"]) == sorted(
+        [both["id"], leek_only["id"]]
+    )
@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta
+from uuid import uuid4
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.api.sync.services import SyncRepository
+from src.db.models.categories import Category
+from src.db.models.ingredients import Ingredient
+from src.db.models.recipes import Recipe, RecipeIngredient
+
+
+@pytest.mark.anyio
+async def test_sync_returns_changes_since(client: AsyncClient, recipe: Recipe):
+    since = (datetime.now().astimezone() - timedelta(hours=1)).isoformat()
+    resp = await client.get("/sync", params={"since": since})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert recipe.id in [item["id"] for item in data["recipes"]]
+    ingredient_ids = {item["id"] for item in data["ingredients"]}
+    assert set(recipe.ingredient_ids) <= ingredient_ids
+    assert data["tombstones"] == []
+
+    # The test transaction is still open, so its rows are sent again.
+    sent = {item["id"] for item in data["recipes"]}
+    resp = await client.get("/sync", params={"cursor": data["cursor"]})
+    assert resp.status_code == 200
+    assert {item["id"] for item in resp.json()["recipes"]} <= sent
+
+
+@pytest.mark.anyio
+async def test_sync_needs_since_or_cursor(client: AsyncClient):
+    assert (await client.get("/sync")).status_code == 422
+    params = {"since": datetime.now().astimezone().isoformat(), "cursor": 1}
+    assert (await client.get("/sync", params=params)).status_code == 422
+
+
+@pytest.mark.anyio
+async def test_sync_reports_deleted_recipes(client: AsyncClient, recipe: Recipe):
+    since = (datetime.now().astimezone() - timedelta(hours=1)).isoformat()
+    assert (await client.delete(f"/recipes/{recipe.id}")).status_code == 200
+
+    resp = await client.get("/sync", params={"since": since})
+    data = resp.json()
+    assert recipe.id not in [item["id"] for item in data["recipes"]]
+    assert [(t["entity"], t["entity_id"]) for t in data["tombstones"]] == [
+        ("recipe", recipe.id)
+    ]
+
+
+@pytest.mark.anyio
+async def test_association_changes_bump_parent_updated_at(
+    db, recipe: Recipe, ingredient_factory, category: Category
+):
+    assert recipe.updated_at is None
+    extra = await ingredient_factory()
+    recipe.recipe_ingredients.append(
+        RecipeIngredient(ingredient=extra, quantity="1 pinch")
+    )
+    await db.flush()
+    await db.refresh(recipe, ["updated_at"])
+    assert recipe.updated_at is not None
+
+    assert category.updated_at is None
+    extra.categories.append(category)
+    await db.flush()
+    await db.refresh(extra, ["updated_at"])
+    await db.refresh(category, ["updated_at"])
+    assert extra.updated_at is not None
+    assert category.updated_at is not None
+
+
+@pytest.mark.anyio
+async def test_sync_sees_late_commits(engine):
+    async with (
+        AsyncSession(engine) as reader,
+        AsyncSession(engine, expire_on_commit=False) as writer,
+    ):
+        repository = SyncRepository(reader)
+        ingredient = Ingredient(
+            name=f"late-{uuid4().hex[:6]}",
+            # As if its transaction had started long before it commits.
+            created_at=func.now() - timedelta(hours=1),
+        )
+        try:
+            first = await repository.get_changes(since=datetime.now().astimezone())
+            writer.add(ingredient)
+            await writer.flush()
+            # Synced while the writing transaction is still open.
+            second = await repository.get_changes(cursor=first.cursor)
+            assert ingredient.id not in [item.id for item in second.ingredients]
+
+            await writer.commit()
+            late = await repository.get_changes(since=second.synced_at)
+            assert ingredient.id not in [item.id for item in late.ingredients]
+            third = await repository.get_changes(cursor=second.cursor)
+            assert ingredient.id in [item.id for item in third.ingredients]
+        finally:
+            await writer.rollback()
+            await writer.delete(ingredient)
+            await writer.commit()
@@ -1,13 +1,13 @@
 import pytest
 from src.db.models.users import User
 from tests.factories import make_user_payload
-from fastapi.testclient import TestClient
+from httpx import AsyncClient
 
 
 @pytest.mark.anyio
-def test_create_user(client: TestClient):
+async def test_create_user(client: AsyncClient):
     payload = make_user_payload()
-    resp = client.post("/users", json=payload.model_dump())
+    resp = await client.post("/users", json=payload.model_dump())
     assert resp.status_code == 201
     data = resp.json()
     assert data["email"] == payload.email
@@ -16,8 +16,19 @@ def test_create_user(client: TestClient):
 
 
 @pytest.mark.anyio
-def test_get_user(client: TestClient, user: User):
-    resp = client.get(f"/users/{user.id}")
+async def test_create_user_conflict(client: AsyncClient, user: User):
+    payload = make_user_payload().model_copy(update={"username": user.username})
+    resp = await client.post("/users", json=payload.model_dump())
+    assert resp.status_code == 409
+
+    # The conflict does not poison the transaction.
+    resp = await client.post("/users", json=make_user_payload().model_dump())
+    assert resp.status_code == 201
+
+
+@pytest.mark.anyio
+async def test_get_user(client: AsyncClient, user: User):
+    resp = await client.get(f"/users/{user.id}")
     assert resp.status_code == 200
     data = resp.json()
     assert data["id"] == user.id
@@ -26,20 +37,73 @@ def test_get_user(client: TestClient, user: User):
 
 
 @pytest.mark.anyio
-def test_list_users(client: TestClient, user_factory: callable):
-    u1 = user_factory()
-    u2 = user_factory()
-    resp = client.get("/users")
+async def test_get_user_sparse_fields(client: AsyncClient, user: User):
+    resp = await client.get(f"/users/{user.id}", params={"fields": "id,username"})
+    assert resp.status_code == 200
+    assert resp.json() == {"id": user.id, "username": user.username}
+
+    resp = await client.get("/users", params={"fields": "email"})
     assert resp.status_code == 200
-    assert len(resp.json()) == 2
-    ids = {u["id"] for u in resp.json()}
+    assert resp.json()["items"] == [{"email": user.email}]
+
+    resp = await client.get("/users", params={"fields": "hashed_password"})
+    assert resp.status_code == 422
+
+
+@pytest.mark.anyio
+async def test_list_users(client: AsyncClient, user_factory: callable):
+    u1 = await user_factory()
+    u2 = await user_factory()
+    resp = await client.get("/users")
+    assert resp.status_code == 200
+    items = resp.json()["items"]
+    assert len(items) == 2
+    ids = {u["id"] for u in items}
     assert ids == {u1.id, u2.id}
 
 
 @pytest.mark.anyio
-def test_update_user(client: TestClient, user: User):
+async def test_list_users_by_ids(client: AsyncClient, user_factory: callable):
+    u1 = await user_factory()
+    u2 = await user_factory()
+
+    resp = await client.get("/users", params={"ids": f"{u2.id},{u1.id}"})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert [item["id"] for item in data["items"]] == [u2.id, u1.id]
+    assert data["missing_ids"] == []
+
+
+@pytest.mark.anyio
+async def test_list_users_paginates_by_cursor(
+    client: AsyncClient, user_factory: callable
+):
+    users = [await user_factory() for _ in range(3)]
+    first = await client.get("/users", params={"limit": 2})
+    assert first.status_code == 200
+    page = first.json()
+    assert [u["id"] for u in page["items"]] == [users[0].id, users[1].id]
+    assert page["next_cursor"] is not None
+
+    second = await client.get(
+        "/users", params={"limit": 2, "cursor": page["next_cursor"]}
+    )
+    assert second.status_code == 200
+    page = second.json()
+    assert [u["id"] for u in page["items"]] == [users[2].id]
+    assert page["next_cursor"] is None
+
+
+@pytest.mark.anyio
+async def test_list_users_rejects_invalid_cursor(client: AsyncClient):
+    resp = await client.get("/users", params={"cursor": "not-a-cursor"})
+    assert resp.status_code == 422
+
+
+@pytest.mark.anyio
+async def test_update_user(client: AsyncClient, user: User):
     new_payload = make_user_payload()
-    resp = client.put(f"/users/{user.id}", json=new_payload.model_dump())
+    resp = await client.put(f"/users/{user.id}", json=new_payload.model_dump())
     assert resp.status_code == 200
     data = resp.json()
     assert data["id"] == user.id